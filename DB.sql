@@ -36,8 +36,12 @@ CREATE TABLE IF NOT EXISTS PRODUCT (
     meeting_zip_code VARCHAR(20),
     meeting_address VARCHAR(255),
     meeting_detail VARCHAR(255),
+    meeting_lat DECIMAL(9, 6),  -- 거래 장소 위도 (지도 좌표 또는 우편번호 구역 대표 좌표)
+    meeting_lng DECIMAL(9, 6),
+    geohash VARCHAR(12),  -- 거래 장소 geohash (내 주변 검색 범위 조회용)
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     is_sold TINYINT(1) DEFAULT 0,
+    comment_count INT NOT NULL DEFAULT 0,  -- 댓글 수 (댓글 등록 트랜잭션에서 함께 증가)
     FOREIGN KEY (SELLER_ID) REFERENCES USER(USER_ID) ON DELETE CASCADE
 );
 
@@ -112,15 +116,68 @@ CREATE TABLE IF NOT EXISTS CHAT_MESSAGE (
     FOREIGN KEY (SENDER_ID) REFERENCES USER(USER_ID) ON DELETE CASCADE
 );
 
+-- CHATBOT_MESSAGE 테이블 (챗봇 대화 기록, 워커 간 공유)
+CREATE TABLE IF NOT EXISTS CHATBOT_MESSAGE (
+    MESSAGE_ID BIGINT AUTO_INCREMENT PRIMARY KEY,
+    SESSION_ID VARCHAR(255) NOT NULL,
+    message TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_chatbot_message_session (SESSION_ID, MESSAGE_ID)
+);
+
+-- PRODUCT_FACET_COUNT 테이블 (상품 목록 필터별 상품 수, 상품 등록/판매/삭제 시 함께 갱신)
+CREATE TABLE IF NOT EXISTS PRODUCT_FACET_COUNT (
+    category VARCHAR(50) NOT NULL,
+    price_bucket VARCHAR(20) NOT NULL,
+    delivery_method VARCHAR(50) NOT NULL,
+    is_sold TINYINT(1) NOT NULL,
+    product_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, price_bucket, delivery_method, is_sold)
+);
+
+-- PRODUCT_SIMILAR 테이블 (비슷한 상품 추천, 'flask compute-similar-products' 배치 작업 결과)
+CREATE TABLE IF NOT EXISTS PRODUCT_SIMILAR (
+    PRODUCT_ID INT PRIMARY KEY,
+    similar_products JSON NOT NULL,  -- [[PRODUCT_ID, 점수], ...] 점수 내림차순
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (PRODUCT_ID) REFERENCES PRODUCT(PRODUCT_ID) ON DELETE CASCADE
+);
+
+-- PRODUCT_TREND_SCORE 테이블 (인기 상품 시간 감쇠 점수, 워커들이 주기적으로 증가분을 합친다)
+CREATE TABLE IF NOT EXISTS PRODUCT_TREND_SCORE (
+    PRODUCT_ID INT PRIMARY KEY,
+    score DOUBLE NOT NULL,  -- updated_at 시각 기준 점수 (반감기마다 절반으로 감쇠)
+    updated_at DATETIME NOT NULL,
+    FOREIGN KEY (PRODUCT_ID) REFERENCES PRODUCT(PRODUCT_ID) ON DELETE CASCADE
+);
+
+-- PRODUCT_VIEW_STATS 테이블 (상품 조회수/순 방문자, 워커들이 주기적으로 증가분을 저장)
+CREATE TABLE IF NOT EXISTS PRODUCT_VIEW_STATS (
+    PRODUCT_ID INT PRIMARY KEY,
+    view_count BIGINT NOT NULL DEFAULT 0,
+    unique_viewers INT NOT NULL DEFAULT 0,  -- viewer_sketch로 추정한 순 방문자 수
+    viewer_sketch VARBINARY(1024),  -- HyperLogLog 레지스터 (1024개 × 1바이트)
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (PRODUCT_ID) REFERENCES PRODUCT(PRODUCT_ID) ON DELETE CASCADE
+);
+
 -- 인덱스 생성
 CREATE INDEX idx_product_seller_id ON PRODUCT(SELLER_ID);
 CREATE INDEX idx_product_is_sold ON PRODUCT(is_sold);
 CREATE INDEX idx_product_category ON PRODUCT(category);
+CREATE INDEX idx_product_sold_category_created ON PRODUCT(is_sold, category, created_at);  -- 자연어 검색 조건 (판매중 + 카테고리 + 최신순)
+CREATE FULLTEXT INDEX ft_product_name_description ON PRODUCT(product_name, description) WITH PARSER ngram;  -- 상품 검색 (/api/search)
+CREATE INDEX idx_product_sold_created ON PRODUCT(is_sold, created_at);  -- 상품 목록 (/api/products/browse 최신순)
+CREATE INDEX idx_product_sold_delivery_created ON PRODUCT(is_sold, delivery_method, created_at);  -- 배송방법 필터
+CREATE INDEX idx_product_sold_price ON PRODUCT(is_sold, price);  -- 가격대 필터/가격순
+CREATE INDEX idx_product_sold_geohash ON PRODUCT(is_sold, geohash, meeting_lat, meeting_lng);  -- 내 주변 상품 (/api/products/nearby)
 CREATE INDEX idx_qna_user_id ON QNA(USER_ID);
+CREATE INDEX idx_qna_active_created ON QNA(is_active, created_at);  -- 게시판 목록 (커서 페이지네이션)
+CREATE FULLTEXT INDEX ft_qna_title_question_answer ON QNA(title, question, answer) WITH PARSER ngram;  -- 게시판 검색 (/api/board/search)
 CREATE INDEX idx_transaction_product_id ON TRANSACTION(PRODUCT_ID);
 CREATE INDEX idx_transaction_buyer_id ON TRANSACTION(BUYER_ID);
 CREATE INDEX idx_review_transaction_id ON REVIEW(TRANSACTION_ID);
-CREATE INDEX idx_comments_product_id ON COMMENTS(PRODUCT_ID);
+CREATE INDEX idx_comments_product_created ON COMMENTS(PRODUCT_ID, created_at, COMMENT_ID);  -- 상품 댓글 커서 페이지네이션
 CREATE INDEX idx_comments_user_id ON COMMENTS(USER_ID);
 CREATE INDEX idx_chat_room_product_id ON CHAT_ROOM(PRODUCT_ID);
 CREATE INDEX idx_chat_room_seller_id ON CHAT_ROOM(SELLER_ID);
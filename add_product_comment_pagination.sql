@@ -0,0 +1,13 @@
+USE web_db;
+
+-- 상품 댓글 커서 페이지네이션 ((created_at, COMMENT_ID) 내림차순으로 한 페이지씩 읽는다)
+-- PRODUCT_ID로 시작하므로 외래 키 인덱스 역할도 하고 기존 idx_comments_product_id는 필요 없다
+CREATE INDEX idx_comments_product_created ON COMMENTS(PRODUCT_ID, created_at, COMMENT_ID);
+DROP INDEX idx_comments_product_id ON COMMENTS;
+
+-- 상품별 댓글 수 (상세 페이지 헤더에서 COUNT 없이 표시)
+ALTER TABLE PRODUCT ADD COLUMN comment_count INT NOT NULL DEFAULT 0 AFTER is_sold;
+UPDATE PRODUCT p
+LEFT JOIN (SELECT PRODUCT_ID, COUNT(*) AS comment_count FROM COMMENTS GROUP BY PRODUCT_ID) c
+    ON c.PRODUCT_ID = p.PRODUCT_ID
+SET p.comment_count = COALESCE(c.comment_count, 0);
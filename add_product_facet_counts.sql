@@ -0,0 +1,34 @@
+USE web_db;
+
+-- 상품 목록 필터별 상품 수 (카테고리 × 가격대 × 배송방법 × 판매여부)
+-- 앱이 상품 등록/판매/삭제 트랜잭션 안에서 함께 갱신한다
+CREATE TABLE IF NOT EXISTS PRODUCT_FACET_COUNT (
+    category VARCHAR(50) NOT NULL,
+    price_bucket VARCHAR(20) NOT NULL,
+    delivery_method VARCHAR(50) NOT NULL,
+    is_sold TINYINT(1) NOT NULL,
+    product_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, price_bucket, delivery_method, is_sold)
+);
+
+-- /api/products/browse 다중 필터용 복합 인덱스
+CREATE INDEX idx_product_sold_created ON PRODUCT(is_sold, created_at);
+CREATE INDEX idx_product_sold_delivery_created ON PRODUCT(is_sold, delivery_method, created_at);
+CREATE INDEX idx_product_sold_price ON PRODUCT(is_sold, price);
+
+-- 기존 상품으로 초기값 계산 (가격대 경계는 product_facets.PRICE_BUCKETS와 같아야 한다)
+-- 이후 보정은 'flask rebuild-facet-counts'
+DELETE FROM PRODUCT_FACET_COUNT;
+INSERT INTO PRODUCT_FACET_COUNT (category, price_bucket, delivery_method, is_sold, product_count)
+SELECT COALESCE(NULLIF(category, ''), '기타'),
+       CASE WHEN price < 10000 THEN 'under_10k'
+            WHEN price < 50000 THEN '10k_50k'
+            WHEN price < 100000 THEN '50k_100k'
+            WHEN price < 300000 THEN '100k_300k'
+            WHEN price < 1000000 THEN '300k_1m'
+            ELSE 'over_1m' END,
+       COALESCE(delivery_method, ''),
+       COALESCE(is_sold, 0),
+       COUNT(*)
+FROM PRODUCT
+GROUP BY 1, 2, 3, 4;
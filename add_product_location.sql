@@ -0,0 +1,11 @@
+USE web_db;
+
+-- 거래 장소 좌표와 geohash (내 주변 상품 검색 /api/products/nearby)
+-- 기존 상품은 'flask backfill-product-locations'로 우편번호 구역 대표 좌표를 채운다
+ALTER TABLE PRODUCT
+    ADD COLUMN meeting_lat DECIMAL(9, 6) AFTER meeting_detail,
+    ADD COLUMN meeting_lng DECIMAL(9, 6) AFTER meeting_lat,
+    ADD COLUMN geohash VARCHAR(12) AFTER meeting_lng;
+
+-- geohash 접두어 범위를 읽고 위경도 조건까지 인덱스 안에서 거른다
+CREATE INDEX idx_product_sold_geohash ON PRODUCT(is_sold, geohash, meeting_lat, meeting_lng);
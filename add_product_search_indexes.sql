@@ -0,0 +1,8 @@
+USE web_db;
+
+-- 자연어 검색 조건(판매중 + 카테고리 + 최신순)용 복합 인덱스
+CREATE INDEX idx_product_sold_category_created ON PRODUCT(is_sold, category, created_at);
+
+-- 상품명/설명 FULLTEXT 검색용 ngram 인덱스 (/api/search, 자연어 검색 기본 검색)
+-- 한글은 ngram_token_size(기본 2) 단위로 색인된다
+CREATE FULLTEXT INDEX ft_product_name_description ON PRODUCT(product_name, description) WITH PARSER ngram;
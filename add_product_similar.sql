@@ -0,0 +1,9 @@
+USE web_db;
+
+-- 비슷한 상품 추천 결과 ('flask compute-similar-products' 배치 작업이 채운다)
+CREATE TABLE IF NOT EXISTS PRODUCT_SIMILAR (
+    PRODUCT_ID INT PRIMARY KEY,
+    similar_products JSON NOT NULL,  -- [[PRODUCT_ID, 점수], ...] 점수 내림차순
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (PRODUCT_ID) REFERENCES PRODUCT(PRODUCT_ID) ON DELETE CASCADE
+);
@@ -0,0 +1,10 @@
+USE web_db;
+
+-- 인기 상품 시간 감쇠 점수 (/api/products/trending)
+-- 조회/채팅/댓글 이벤트는 각 워커 메모리에 모았다가 TRENDING_SNAPSHOT_SECONDS마다 증가분만 합친다
+CREATE TABLE IF NOT EXISTS PRODUCT_TREND_SCORE (
+    PRODUCT_ID INT PRIMARY KEY,
+    score DOUBLE NOT NULL,  -- updated_at 시각 기준 점수 (반감기마다 절반으로 감쇠)
+    updated_at DATETIME NOT NULL,
+    FOREIGN KEY (PRODUCT_ID) REFERENCES PRODUCT(PRODUCT_ID) ON DELETE CASCADE
+);
@@ -0,0 +1,12 @@
+USE web_db;
+
+-- 상품 조회수/순 방문자 (마이페이지 내 상품 목록)
+-- 조회는 각 워커 메모리에 모았다가 PRODUCT_VIEW_FLUSH_SECONDS마다 여러 행 upsert로 저장한다
+CREATE TABLE IF NOT EXISTS PRODUCT_VIEW_STATS (
+    PRODUCT_ID INT PRIMARY KEY,
+    view_count BIGINT NOT NULL DEFAULT 0,
+    unique_viewers INT NOT NULL DEFAULT 0,  -- viewer_sketch로 추정한 순 방문자 수
+    viewer_sketch VARBINARY(1024),  -- HyperLogLog 레지스터 (1024개 × 1바이트)
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (PRODUCT_ID) REFERENCES PRODUCT(PRODUCT_ID) ON DELETE CASCADE
+);
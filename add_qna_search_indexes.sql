@@ -0,0 +1,7 @@
+USE web_db;
+
+-- 게시판 목록 최신순 커서 페이지네이션 (is_active, created_at, QNA_ID 순서로 읽는다)
+CREATE INDEX idx_qna_active_created ON QNA(is_active, created_at);
+
+-- 게시판 제목/내용/답변 FULLTEXT 검색용 ngram 인덱스 (/api/board/search)
+CREATE FULLTEXT INDEX ft_qna_title_question_answer ON QNA(title, question, answer) WITH PARSER ngram;
@@ -6,10 +6,36 @@ from datetime import datetime
 import hashlib
 import os
 import base64
+import json
 import re
 from dotenv import load_dotenv
-from openai import OpenAI
-from chatbot_rag import initialize_chatbot, get_chatbot
+from chatbot_rag import initialize_chatbot, get_chatbot, default_embedding_factory
+from knowledge_base import load_knowledge_base
+from vector_index import build_vector_index
+from chat_history_store import ChatHistoryStore
+from chatbot_executor import ChatbotExecutor, ChatbotBusyError, ChatbotTimeoutError
+from search_cache import QueryCache, normalize_search_query
+from search_query import (CATEGORIES, SEARCH_COLUMNS, SEARCH_LIMIT, SORT_ORDERS, SearchRouteStats,
+                          build_fulltext_query, build_search_query, format_search_cursor, has_search_terms,
+                          parse_search_query, validate_search_spec)
+from sql_guard import MAX_EXECUTION_TIME_ERRNO, QueryRejectedError, SqlGuard, with_execution_time_limit
+from llm_client import CircuitOpenError, LLMClient
+from product_events import product_events
+from product_search_index import ProductEmbeddingIndex
+from typeahead import TypeaheadIndex
+from catalog_snapshot import CatalogSnapshot
+from similar_products import SimilarProductsCache, compute_similar_products
+from price_suggestion import PriceSuggestionIndex
+from trending import MIN_SCORE as TRENDING_MIN_SCORE, TrendingScores
+from view_counter import HyperLogLog, ViewCounter
+from product_comments import (COMMENT_PAGE_SIZE, MAX_COMMENT_PAGE_SIZE, build_comments_query,
+                              next_comment_cursor)
+from board_search import (BOARD_LIST_COLUMNS, BOARD_SEARCH_LIMIT, ActivePostCount, build_board_list_query,
+                          build_board_search_query, format_board_cursor)
+from geo_location import (DEFAULT_RADIUS_KM, MAX_CANDIDATES, MAX_RADIUS_KM, build_nearby_candidates_query, geocode_zip,
+                          geohash_encode, parse_coordinates, rank_by_distance, resolve_meeting_location)
+from product_facets import (PRICE_BUCKETS, PRICE_BUCKET_KEYS, adjust_facet_count, build_browse_query,
+                            compute_facets, rebuild_facet_counts)
 
 # AWS 관리 라이브러리. boto3 라이브러리를 사용해서 aws s3에 이미지 업로드 해야 함.
 import boto3
@@ -61,7 +87,7 @@ def product_detail(product_id):
         cursor.execute("""
             SELECT p.PRODUCT_ID, p.product_name, p.price, p.description, p.image_url,
                    p.delivery_method, p.created_at, p.SELLER_ID, p.is_sold,
-                   p.meeting_zip_code, p.meeting_address, p.meeting_detail, u.nickname
+                   p.meeting_zip_code, p.meeting_address, p.meeting_detail, u.nickname, p.category, p.comment_count
             FROM PRODUCT p
             JOIN USER u ON p.SELLER_ID = u.USER_ID
             WHERE p.PRODUCT_ID = %s
@@ -73,6 +99,12 @@ def product_detail(product_id):
             conn.close()
             abort(404)
         
+        # 인기 상품 점수/조회수 (메모리에만 기록, PRODUCT는 갱신하지 않는다)
+        if not product[8]:
+            trending_scores.record(product_id, 'view', product[13])
+        if session.get('user_id') != product[7]:
+            product_views.record(product_id, viewer_key())
+        
         image_url = None
         if product[4]:
             image_base64 = base64.b64encode(product[4]).decode('utf-8')
@@ -98,14 +130,10 @@ def product_detail(product_id):
             'meeting_detail': product[11]
         }
         
-        cursor.execute("""
-            SELECT c.COMMENT_ID, c.comment, c.created_at, u.nickname
-            FROM COMMENTS c
-            JOIN USER u ON c.USER_ID = u.USER_ID
-            WHERE c.PRODUCT_ID = %s
-            ORDER BY c.created_at DESC
-        """, (product_id,))
-        comments = cursor.fetchall()
+        # 댓글은 첫 페이지만 렌더링 (나머지는 /api/comments로 더 불러온다)
+        sql, params = build_comments_query(product_id, limit=COMMENT_PAGE_SIZE + 1)
+        cursor.execute(sql, params)
+        comments, comments_next_cursor = next_comment_cursor(cursor.fetchall(), COMMENT_PAGE_SIZE)
         cursor.close()
         conn.close()
         
@@ -124,6 +152,8 @@ def product_detail(product_id):
             'product_detail.html',
             product=product_detail,
             comments=comment_list,
+            comment_count=product[14] or 0,
+            comments_next_cursor=comments_next_cursor,
             kakao_map_api=os.getenv('kakao_map_api')
         )
     except Exception as e:
@@ -501,7 +531,7 @@ def get_product_detail(product_id):
         cursor = conn.cursor()
         cursor.execute("""
             SELECT PRODUCT_ID, product_name, price, description, image_url, delivery_method, created_at, SELLER_ID, is_sold,
-                   meeting_zip_code, meeting_address, meeting_detail
+                   meeting_zip_code, meeting_address, meeting_detail, category
             FROM PRODUCT 
             WHERE PRODUCT_ID = %s
         """, (product_id,))
@@ -513,6 +543,11 @@ def get_product_detail(product_id):
         if not product:
             return jsonify({'error': '상품을 찾을 수 없습니다.'}), 404
         
+        if not product[8]:
+            trending_scores.record(product_id, 'view', product[12])
+        if session.get('user_id') != product[7]:
+            product_views.record(product_id, viewer_key())
+        
         # 이미지 URL 처리 (LONGBLOB 데이터를 base64로 인코딩)
         image_url = None
         if product[4]:  # image_url (LONGBLOB)이 있는 경우
@@ -552,6 +587,218 @@ def get_product_detail(product_id):
     except Exception as e:
         return jsonify({'error': f'상품 상세 조회 중 오류가 발생했습니다: {str(e)}'}), 500
 
+# 인기 상품 API
+@app.route('/api/products/trending', methods=['GET'])
+def get_trending_products():
+    """최근 조회/채팅/댓글이 많은 판매중 상품 (시간 감쇠 점수 순, category로 카테고리별)"""
+    try:
+        category = request.args.get('category') or None
+        if category and category not in CATEGORIES:
+            return jsonify({'error': '올바르지 않은 카테고리입니다.'}), 400
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        
+        trending_scores.start()  # 첫 스냅샷 전에는 이 워커의 점수만으로 계산
+        # 카테고리를 아직 모르는 상품이 섞여 있을 수 있어 넉넉히 뽑고 DB에서 거른다
+        ranked = trending_scores.top(category, limit * 3)
+        if not ranked:
+            return jsonify({'products': [], 'category': category}), 200
+        
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'error': '데이터베이스 연결 오류'}), 500
+        
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT p.PRODUCT_ID, p.product_name, p.price, p.image_url, p.delivery_method, p.category,
+                   p.created_at, u.nickname as seller_nickname
+            FROM PRODUCT p
+            LEFT JOIN USER u ON p.SELLER_ID = u.USER_ID
+            WHERE p.is_sold = 0 AND p.PRODUCT_ID IN ({', '.join(['%s'] * len(ranked))})
+        """, [product_id for product_id, _ in ranked])
+        products = {row[0]: row for row in cursor.fetchall()}
+        cursor.close()
+        conn.close()
+        trending_scores.learn_categories({product_id: row[5] for product_id, row in products.items()})
+        
+        product_list = []
+        for product_id, score in ranked:
+            product = products.get(product_id)
+            if not product or (category and product[5] != category):
+                continue
+            image_data = product[3]
+            if image_data and isinstance(image_data, bytes):
+                image_url = f"data:image/jpeg;base64,{base64.b64encode(image_data).decode('utf-8')}"
+            else:
+                image_url = None
+            product_list.append({
+                'id': product[0],
+                'title': product[1] if product[1] else '상품명 없음',
+                'price': product[2] if product[2] else 0,
+                'image_url': image_url,
+                'delivery_method': product[4] if product[4] else '배송 정보 없음',
+                'category': product[5] if product[5] else '기타',
+                'created_at': product[6].isoformat() if product[6] else None,
+                'seller_nickname': product[7] if product[7] else '판매자 정보 없음',
+                'trend_score': round(score, 2)
+            })
+            if len(product_list) >= limit:
+                break
+        
+        return jsonify({'products': product_list, 'category': category}), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'인기 상품 조회 중 오류가 발생했습니다: {str(e)}'}), 500
+
+# 내 주변 상품 API
+@app.route('/api/products/nearby', methods=['GET'])
+def get_nearby_products():
+    """위치(lat/lng) 반경 radius km 안의 판매중 상품을 가까운 순으로 조회"""
+    try:
+        location = parse_coordinates(request.args.get('lat'), request.args.get('lng'))
+        if not location:
+            return jsonify({'error': '올바른 위치를 입력해주세요.'}), 400
+        lat, lng = location
+        radius = request.args.get('radius', DEFAULT_RADIUS_KM, type=float)
+        if not radius or radius <= 0:
+            return jsonify({'error': '올바른 반경을 입력해주세요.'}), 400
+        radius = min(radius, MAX_RADIUS_KM)
+        category = request.args.get('category') or None
+        if category and category not in CATEGORIES:
+            return jsonify({'error': '올바르지 않은 카테고리입니다.'}), 400
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'error': '데이터베이스 연결 오류'}), 500
+        
+        cursor = conn.cursor()
+        
+        # 1단계: geohash 범위 + 사각형으로 후보 좌표만 읽고 정확한 거리로 정렬
+        sql, params = build_nearby_candidates_query(lat, lng, radius, category)
+        cursor.execute(sql, params)
+        candidates = cursor.fetchall()
+        ranked = rank_by_distance(lat, lng, candidates, radius)
+        page_items = ranked[(page - 1) * per_page:page * per_page]
+        
+        # 2단계: 현재 페이지 상품만 상세 조회
+        products = {}
+        if page_items:
+            cursor.execute(f"""
+                SELECT p.PRODUCT_ID, p.product_name, p.price, p.image_url, p.delivery_method, p.category,
+                       p.created_at, p.meeting_address, u.nickname as seller_nickname
+                FROM PRODUCT p
+                LEFT JOIN USER u ON p.SELLER_ID = u.USER_ID
+                WHERE p.PRODUCT_ID IN ({', '.join(['%s'] * len(page_items))})
+            """, [product_id for product_id, _ in page_items])
+            products = {row[0]: row for row in cursor.fetchall()}
+        cursor.close()
+        conn.close()
+        
+        product_list = []
+        for product_id, distance in page_items:
+            product = products.get(product_id)
+            if not product:
+                continue
+            image_data = product[3]
+            if image_data and isinstance(image_data, bytes):
+                image_url = f"data:image/jpeg;base64,{base64.b64encode(image_data).decode('utf-8')}"
+            else:
+                image_url = None
+            product_list.append({
+                'id': product[0],
+                'title': product[1] if product[1] else '상품명 없음',
+                'price': product[2] if product[2] else 0,
+                'image_url': image_url,
+                'delivery_method': product[4] if product[4] else '배송 정보 없음',
+                'category': product[5] if product[5] else '기타',
+                'created_at': product[6].isoformat() if product[6] else None,
+                'meeting_address': product[7] or '',
+                'seller_nickname': product[8] if product[8] else '판매자 정보 없음',
+                'distance_km': round(distance, 2)
+            })
+        
+        total_count = len(ranked)
+        total_pages = (total_count + per_page - 1) // per_page
+        return jsonify({
+            'products': product_list,
+            'radius_km': radius,
+            'truncated': len(candidates) >= MAX_CANDIDATES,  # 후보가 너무 많아 일부만 정렬함 (반경을 줄이도록 안내)
+            'total': total_count,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': total_pages,
+            'has_next': page < total_pages,
+            'has_prev': page > 1
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'내 주변 상품 조회 중 오류가 발생했습니다: {str(e)}'}), 500
+
+# 가격 추천 API
+@app.route('/api/products/price-suggestion', methods=['GET'])
+def get_price_suggestion():
+    """작성 중인 상품명/카테고리로 비슷한 판매 완료 상품 기준 추천 가격 범위 조회"""
+    try:
+        title = request.args.get('title', '').strip()
+        category = request.args.get('category') or None
+        if not title and not category:
+            return jsonify({'error': '상품명 또는 카테고리를 입력해주세요.'}), 400
+        if category and category not in CATEGORIES:
+            return jsonify({'error': '올바르지 않은 카테고리입니다.'}), 400
+        
+        if not price_suggestions.start():
+            return jsonify({'error': '가격 추천을 준비 중입니다. 잠시 후 다시 시도해주세요.'}), 503
+        
+        suggestion = price_suggestions.suggest(title, category)
+        if not suggestion:
+            return jsonify({'suggestion': None}), 200
+        return jsonify({'suggestion': suggestion}), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'가격 추천 중 오류가 발생했습니다: {str(e)}'}), 500
+
+# 비슷한 상품 추천 API
+@app.route('/api/products/<int:product_id>/similar', methods=['GET'])
+def get_similar_products(product_id):
+    """배치 작업이 미리 계산한 비슷한 상품 중 판매중인 상품 (상품별 캐시)"""
+    try:
+        limit = min(max(request.args.get('limit', 6, type=int), 1), 20)
+        
+        similar = similar_products_cache.get(product_id)
+        if similar is None:
+            conn = get_db_connection()
+            if not conn:
+                return jsonify({'error': '데이터베이스 연결 오류'}), 500
+            
+            cursor = conn.cursor()
+            cursor.execute("SELECT similar_products FROM PRODUCT_SIMILAR WHERE PRODUCT_ID = %s", (product_id,))
+            row = cursor.fetchone()
+            similar = []
+            if row:
+                scores = {similar_id: score for similar_id, score in json.loads(row[0])}
+                if scores:
+                    cursor.execute(f"""
+                        SELECT PRODUCT_ID, product_name, price, category
+                        FROM PRODUCT
+                        WHERE PRODUCT_ID IN ({', '.join(['%s'] * len(scores))}) AND is_sold = 0
+                    """, list(scores))
+                    similar = sorted(({
+                        'id': product[0],
+                        'title': product[1] or '상품명 없음',
+                        'price': product[2] or 0,
+                        'category': product[3] or '기타',
+                        'score': scores[product[0]]
+                    } for product in cursor.fetchall()), key=lambda item: item['score'], reverse=True)
+            cursor.close()
+            conn.close()
+            similar_products_cache.put(product_id, similar)
+        
+        return jsonify({'products': similar[:limit]}), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'비슷한 상품 조회 중 오류가 발생했습니다: {str(e)}'}), 500
+
 # 댓글 등록 API
 @app.route('/api/comments', methods=['POST'])
 def create_comment():
@@ -576,10 +823,14 @@ def create_comment():
             INSERT INTO COMMENTS (PRODUCT_ID, USER_ID, comment)
             VALUES (%s, %s, %s)
         """, (product_id, session.get('user_id'), comment))
+        # 상품별 댓글 수 (같은 트랜잭션, 상세 페이지에서 COUNT 없이 표시)
+        cursor.execute("UPDATE PRODUCT SET comment_count = comment_count + 1 WHERE PRODUCT_ID = %s", (product_id,))
         
         conn.commit()
         cursor.close()
         conn.close()
+        if str(product_id).isdigit():
+            trending_scores.record(int(product_id), 'comment')
         
         return jsonify({'message': '댓글이 등록되었습니다.'}), 201
         
@@ -589,21 +840,21 @@ def create_comment():
 # 댓글 조회 API
 @app.route('/api/comments/<int:product_id>', methods=['GET'])
 def get_comments(product_id):
+    """상품 댓글 최신순 한 페이지 (cursor: 다음 페이지 커서)"""
     try:
+        limit = min(max(request.args.get('limit', COMMENT_PAGE_SIZE, type=int), 1), MAX_COMMENT_PAGE_SIZE)
+        try:
+            sql, params = build_comments_query(product_id, request.args.get('cursor') or None, limit + 1)
+        except ValueError:
+            return jsonify({'error': '잘못된 커서입니다.'}), 400
+        
         conn = get_db_connection()
         if not conn:
             return jsonify({'error': '데이터베이스 연결 오류'}), 500
         
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT c.COMMENT_ID, c.comment, c.created_at, u.nickname as user_nickname
-            FROM COMMENTS c
-            JOIN USER u ON c.USER_ID = u.USER_ID
-            WHERE c.PRODUCT_ID = %s
-            ORDER BY c.created_at DESC
-        """, (product_id,))
-        
-        comments = cursor.fetchall()
+        cursor.execute(sql, params)
+        comments, next_cursor = next_comment_cursor(cursor.fetchall(), limit)
         cursor.close()
         conn.close()
         
@@ -616,7 +867,11 @@ def get_comments(product_id):
                 'user_nickname': comment[3]
             })
         
-        return jsonify({'comments': comment_list}), 200
+        return jsonify({
+            'comments': comment_list,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }), 200
         
     except Exception as e:
         return jsonify({'error': f'댓글 조회 중 오류가 발생했습니다: {str(e)}'}), 500
@@ -666,6 +921,11 @@ def create_product():
         if not meeting_zip_code or not meeting_address:
             return jsonify({'error': '거래 주소를 입력해주세요.'}), 400
         
+        # 거래 장소 좌표 (지도에서 찾은 좌표가 없으면 우편번호 구역 대표 좌표)
+        meeting_lat, meeting_lng, meeting_geohash = resolve_meeting_location(
+            meeting_zip_code, request.form.get('meeting_lat'), request.form.get('meeting_lng')
+        )
+        
         # 가격 유효성 검사
         if price < 0:
             return jsonify({'error': '가격은 0원 이상이어야 합니다.'}), 400
@@ -690,15 +950,16 @@ def create_product():
         
         # 이미지 파일을 LONGBLOB으로 변환
         image_data = image_file.read()
+        created_at = datetime.now()
         
         # 상품 등록 (이미지를 LONGBLOB으로 저장)
         cursor.execute("""
             INSERT INTO PRODUCT (
                 SELLER_ID, product_name, price, description, image_url,
                 delivery_method, category, meeting_zip_code, meeting_address,
-                meeting_detail, created_at, is_sold
+                meeting_detail, meeting_lat, meeting_lng, geohash, created_at, is_sold
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """, (
             seller_id,
             title,
@@ -710,15 +971,33 @@ def create_product():
             meeting_zip_code,
             meeting_address,
             meeting_detail,
-            datetime.now(),
+            meeting_lat,
+            meeting_lng,
+            meeting_geohash,
+            created_at,
             0
         ))
         
         product_id = cursor.lastrowid
+        # 필터별 상품 수 갱신 (같은 트랜잭션)
+        adjust_facet_count(cursor, {
+            'category': category, 'price': price, 'delivery_method': delivery, 'is_sold': 0
+        }, 1)
         conn.commit()
         cursor.close()
         conn.close()
         
+        # 검색 인덱스 등에 등록 알림 (임베딩은 백그라운드에서 처리)
+        product_events.publish('created', {
+            'id': product_id,
+            'title': title,
+            'description': description,
+            'category': category,
+            'price': price,
+            'delivery_method': delivery,
+            'created_at': created_at
+        })
+        
         return jsonify({
             'message': '상품이 성공적으로 등록되었습니다.',
             'product_id': product_id
@@ -744,16 +1023,21 @@ def get_user_products():
         
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT PRODUCT_ID, product_name, price, description, image_url, delivery_method, category, created_at, is_sold
-            FROM PRODUCT 
-            WHERE SELLER_ID = %s
-            ORDER BY created_at DESC
+            SELECT p.PRODUCT_ID, p.product_name, p.price, p.description, p.image_url, p.delivery_method, p.category,
+                   p.created_at, p.is_sold, v.view_count, v.unique_viewers
+            FROM PRODUCT p
+            LEFT JOIN PRODUCT_VIEW_STATS v ON v.PRODUCT_ID = p.PRODUCT_ID
+            WHERE p.SELLER_ID = %s
+            ORDER BY p.created_at DESC
         """, (session.get('user_id'),))
         
         products = cursor.fetchall()
         cursor.close()
         conn.close()
         
+        # 아직 저장하지 않은 이 워커의 조회수를 더한다 (순 방문자는 저장된 추정치)
+        pending_views = product_views.pending([product[0] for product in products])
+        
         product_list = []
         for product in products:
             # 이미지 URL 처리 (LONGBLOB 데이터를 base64로 인코딩)
@@ -771,7 +1055,9 @@ def get_user_products():
                 'delivery_method': product[5] if product[5] else '배송 정보 없음',
                 'category': product[6] if product[6] else '기타',
                 'created_at': product[7].isoformat() if product[7] else None,
-                'is_sold': bool(product[8])
+                'is_sold': bool(product[8]),
+                'view_count': (product[9] or 0) + pending_views.get(product[0], 0),
+                'unique_viewers': product[10] or 0
             })
         
         return jsonify({'products': product_list}), 200
@@ -881,7 +1167,7 @@ def purchase_product():
         
         # 상품 정보 조회
         cursor.execute("""
-            SELECT PRODUCT_ID, SELLER_ID, product_name, price, is_sold
+            SELECT PRODUCT_ID, SELLER_ID, product_name, price, is_sold, category, delivery_method
             FROM PRODUCT 
             WHERE PRODUCT_ID = %s
         """, (product_id,))
@@ -936,6 +1222,11 @@ def purchase_product():
             
             # 상품 판매 완료 처리
             cursor.execute("UPDATE PRODUCT SET is_sold = 1 WHERE PRODUCT_ID = %s", (product_id,))
+            if cursor.rowcount:
+                # 필터별 상품 수: 판매중 → 거래완료로 이동
+                facet_product = {'category': product[5], 'price': product_price, 'delivery_method': product[6]}
+                adjust_facet_count(cursor, dict(facet_product, is_sold=0), -1)
+                adjust_facet_count(cursor, dict(facet_product, is_sold=1), 1)
             
             # 거래 기록 생성
             cursor.execute("""
@@ -947,6 +1238,8 @@ def purchase_product():
             cursor.close()
             conn.close()
             
+            product_events.publish('sold', {'id': product_id})
+            
             return jsonify({
                 'message': '구매가 완료되었습니다.',
                 'product_name': product[2],
@@ -1082,6 +1375,12 @@ def get_products_by_category(category):
 @app.route('/api/products/category-stats', methods=['GET'])
 def get_category_stats():
     try:
+        # 스냅샷이 준비되어 있으면 MySQL을 거치지 않는다
+        if catalog_snapshot.start():
+            category_stats = catalog_snapshot.category_counts()
+            category_stats['all'] = sum(category_stats.values())
+            return jsonify({'stats': category_stats}), 200
+        
         conn = get_db_connection()
         if not conn:
             return jsonify({'error': '데이터베이스 연결 오류'}), 500
@@ -1115,6 +1414,154 @@ def get_category_stats():
     except Exception as e:
         return jsonify({'error': f'카테고리 통계 조회 중 오류가 발생했습니다: {str(e)}'}), 500
 
+def parse_multi_arg(name):
+    """같은 이름 반복(?a=x&a=y)과 쉼표 구분(?a=x,y)을 모두 받는 다중 값 파라미터"""
+    values = []
+    for raw in request.args.getlist(name):
+        values.extend(value.strip() for value in raw.split(',') if value.strip())
+    return values
+
+def format_price_facets(counts):
+    """가격대별 상품 수를 표시 이름과 함께 고정 순서 목록으로 변환"""
+    return [{'key': key, 'label': label, 'count': counts.get(key, 0)} for key, label, _, _ in PRICE_BUCKETS]
+
+@app.route('/api/products/browse', methods=['GET'])
+def browse_products():
+    """카테고리/가격대/배송방법/판매여부 다중 필터 상품 목록 + 필터별 상품 수"""
+    try:
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        sort = request.args.get('sort', 'latest')
+        if sort not in SORT_ORDERS:
+            return jsonify({'error': '올바르지 않은 정렬 방식입니다.'}), 400
+        
+        sold = request.args.get('sold', '0')  # 0: 판매중, 1: 거래완료, all: 전체
+        if sold not in ('0', '1', 'all'):
+            return jsonify({'error': '올바르지 않은 판매 상태입니다.'}), 400
+        filters = {
+            'category': parse_multi_arg('category'),
+            'price_bucket': parse_multi_arg('price'),
+            'delivery_method': parse_multi_arg('delivery'),
+            'is_sold': [] if sold == 'all' else [int(sold)],
+        }
+        if any(key not in PRICE_BUCKET_KEYS for key in filters['price_bucket']):
+            return jsonify({'error': '올바르지 않은 가격대입니다.'}), 400
+        
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'error': '데이터베이스 연결 오류'}), 500
+        
+        cursor = conn.cursor()
+        
+        # 필터별 상품 수 (조합별 집계 표만 읽는다)
+        cursor.execute("""
+            SELECT category, price_bucket, delivery_method, is_sold, product_count
+            FROM PRODUCT_FACET_COUNT
+            WHERE product_count > 0
+        """)
+        total_count, facets = compute_facets(cursor.fetchall(), filters)
+        total_pages = (total_count + per_page - 1) // per_page
+        
+        products = []
+        if (page - 1) * per_page < total_count:
+            sql, params = build_browse_query(filters, sort, per_page, (page - 1) * per_page)
+            cursor.execute(sql, params)
+            products = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        
+        product_list = []
+        for product in products:
+            image_data = product[3]
+            if image_data and isinstance(image_data, bytes):
+                image_url = f"data:image/jpeg;base64,{base64.b64encode(image_data).decode('utf-8')}"
+            else:
+                image_url = None
+            product_list.append({
+                'id': product[0],
+                'title': product[1] if product[1] else '상품명 없음',
+                'price': product[2] if product[2] else 0,
+                'image_url': image_url,
+                'delivery_method': product[4] if product[4] else '배송 정보 없음',
+                'category': product[5] if product[5] else '기타',
+                'created_at': product[6].isoformat() if product[6] else None,
+                'is_sold': bool(product[7]),
+                'seller_nickname': product[8] if product[8] else '판매자 정보 없음'
+            })
+        
+        facets['price_bucket'] = format_price_facets(facets['price_bucket'])
+        facets['is_sold'] = {str(value): count for value, count in facets['is_sold'].items()}
+        
+        return jsonify({
+            'products': product_list,
+            'facets': facets,
+            'filters': {
+                'category': filters['category'],
+                'price': filters['price_bucket'],
+                'delivery': filters['delivery_method'],
+                'sold': sold
+            },
+            'total': total_count,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': total_pages,
+            'has_next': page < total_pages,
+            'has_prev': page > 1
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'상품 목록 조회 중 오류가 발생했습니다: {str(e)}'}), 500
+
+@app.route('/api/products/catalog', methods=['GET'])
+def get_catalog():
+    """판매중 상품 목록 (메모리 스냅샷에서 필터/정렬/필터별 상품 수 계산, 이미지/판매자 정보 없음)
+
+    파라미터는 /api/products/browse와 같고 min_price/max_price도 받는다.
+    스냅샷이 아직 준비되지 않았으면 /api/products/browse로 처리한다.
+    """
+    try:
+        if not catalog_snapshot.start():
+            return browse_products()
+        
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        sort = request.args.get('sort', 'latest')
+        if sort not in SORT_ORDERS:
+            return jsonify({'error': '올바르지 않은 정렬 방식입니다.'}), 400
+        filters = {
+            'category': parse_multi_arg('category'),
+            'price_bucket': parse_multi_arg('price'),
+            'delivery_method': parse_multi_arg('delivery'),
+            'min_price': request.args.get('min_price', type=int),
+            'max_price': request.args.get('max_price', type=int),
+        }
+        if any(key not in PRICE_BUCKET_KEYS for key in filters['price_bucket']):
+            return jsonify({'error': '올바르지 않은 가격대입니다.'}), 400
+        
+        total_count, products, facets = catalog_snapshot.browse(filters, sort, per_page, (page - 1) * per_page)
+        facets['price_bucket'] = format_price_facets(facets['price_bucket'])
+        total_pages = (total_count + per_page - 1) // per_page
+        
+        return jsonify({
+            'products': products,
+            'facets': facets,
+            'filters': {
+                'category': filters['category'],
+                'price': filters['price_bucket'],
+                'delivery': filters['delivery_method'],
+                'sold': '0'
+            },
+            'total': total_count,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': total_pages,
+            'has_next': page < total_pages,
+            'has_prev': page > 1
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'상품 목록 조회 중 오류가 발생했습니다: {str(e)}'}), 500
+
 @app.route('/api/sold-products/paged', methods=['GET'])
 def get_sold_products_paged():
     try:
@@ -1246,11 +1693,14 @@ def admin_products():
 # 게시판 API 라우트들
 @app.route('/api/board', methods=['GET'])
 def get_board_posts_list():
-    """게시판 글 목록 조회"""
+    """게시판 글 목록 조회 (cursor: 다음 페이지 커서, page만 주면 이전 방식의 OFFSET 페이지)"""
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        offset = (page - 1) * per_page
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), 50)
+        cursor_arg = request.args.get('cursor') or None
+        page = request.args.get('page', type=int)
+        
+        # 전체 글 수 (활성화된 게시글만, 캐시)
+        total = board_post_count.get()
         
         connection = get_db_connection()
         if not connection:
@@ -1258,37 +1708,95 @@ def get_board_posts_list():
         
         cursor = connection.cursor(dictionary=True)
         
-        # 전체 글 수 조회 (활성화된 게시글만)
-        cursor.execute("SELECT COUNT(*) as total FROM QNA WHERE is_active = 0")
-        total = cursor.fetchone()['total']
-        
-        # 게시글 목록 조회 (활성화된 게시글만, 최신순)
-        query = """
-        SELECT q.QNA_ID, q.title, q.question, q.view_count, 
-               q.created_at, q.updated_at, u.nickname as author
-        FROM QNA q
-        JOIN USER u ON q.USER_ID = u.USER_ID
-        WHERE q.is_active = 0
-        ORDER BY q.created_at DESC
-        LIMIT %s OFFSET %s
-        """
-        cursor.execute(query, (per_page, offset))
+        if page and not cursor_arg:
+            # 게시글 목록 조회 (활성화된 게시글만, 최신순)
+            query = f"""
+            SELECT {BOARD_LIST_COLUMNS}
+            FROM QNA q
+            JOIN USER u ON q.USER_ID = u.USER_ID
+            WHERE q.is_active = 0
+            ORDER BY q.created_at DESC, q.QNA_ID DESC
+            LIMIT %s OFFSET %s
+            """
+            cursor.execute(query, (per_page + 1, (max(page, 1) - 1) * per_page))
+        else:
+            try:
+                query, params = build_board_list_query(cursor_arg, per_page + 1)  # 다음 페이지 확인용 한 행 더
+            except ValueError:
+                cursor.close()
+                connection.close()
+                return jsonify({'error': '잘못된 커서입니다.'}), 400
+            cursor.execute(query, params)
         posts = cursor.fetchall()
         
         cursor.close()
         connection.close()
         
+        has_more = len(posts) > per_page
+        posts = posts[:per_page]
+        
+        # 아직 저장하지 않은 조회수를 더한다
+        pending_views = board_views.pending([post['QNA_ID'] for post in posts])
+        for post in posts:
+            post['view_count'] = (post['view_count'] or 0) + pending_views.get(post['QNA_ID'], 0)
+        
         return jsonify({
             'posts': posts,
             'total': total,
-            'page': page,
+            'page': page or 1,
             'per_page': per_page,
-            'total_pages': (total + per_page - 1) // per_page
+            'total_pages': (total + per_page - 1) // per_page,
+            'next_cursor': format_board_cursor(posts[-1]) if has_more and posts else None,
+            'has_more': has_more
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'게시판 글 조회 중 오류가 발생했습니다: {str(e)}'}), 500
 
+@app.route('/api/board/search', methods=['GET'])
+def search_board_posts():
+    """게시판 검색 (제목/내용/답변 FULLTEXT 관련도순, 커서 기반 페이지네이션)"""
+    try:
+        q = request.args.get('q', '').strip()
+        # '+++'처럼 검색 조건이 만들어지지 않는 검색어는 전체 게시글이 되므로 받지 않는다
+        if not q or not has_search_terms(q):
+            return jsonify({'error': '검색어를 입력해주세요.'}), 400
+        limit = min(max(request.args.get('limit', 10, type=int), 1), BOARD_SEARCH_LIMIT)
+        try:
+            query, params = build_board_search_query(q, request.args.get('cursor') or None, limit + 1)
+        except ValueError:
+            return jsonify({'error': '잘못된 커서입니다.'}), 400
+        
+        connection = get_db_connection()
+        if not connection:
+            return jsonify({'error': '데이터베이스 연결 실패'}), 500
+        
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(with_execution_time_limit(query, nl_sql_guard.timeout_ms), params)
+        posts = cursor.fetchall()
+        cursor.close()
+        connection.close()
+        
+        has_more = len(posts) > limit
+        posts = posts[:limit]
+        next_cursor = None
+        if has_more and posts:
+            next_cursor = format_search_cursor(posts[-1]['score'], posts[-1]['QNA_ID'])
+        
+        pending_views = board_views.pending([post['QNA_ID'] for post in posts])
+        for post in posts:
+            post['view_count'] = (post['view_count'] or 0) + pending_views.get(post['QNA_ID'], 0)
+            post['score'] = float(post['score'] or 0)
+        
+        return jsonify({
+            'posts': posts,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'게시판 검색 중 오류가 발생했습니다: {str(e)}'}), 500
+
 @app.route('/api/board', methods=['POST'])
 def create_board_post():
     """게시판 글 작성"""
@@ -1322,6 +1830,7 @@ def create_board_post():
         post_id = cursor.lastrowid
         cursor.close()
         connection.close()
+        board_post_count.adjust(1)
         
         return jsonify({'message': '게시글이 성공적으로 작성되었습니다', 'post_id': post_id}), 201
         
@@ -1338,9 +1847,6 @@ def get_board_post(post_id):
         
         cursor = connection.cursor(dictionary=True)
         
-        # 조회수 증가
-        cursor.execute("UPDATE QNA SET view_count = view_count + 1 WHERE QNA_ID = %s", (post_id,))
-        
         # 게시글 상세 조회 (활성화된 게시글만)
         query = """
         SELECT q.QNA_ID, q.title, q.question, q.answer, q.view_count,
@@ -1352,13 +1858,16 @@ def get_board_post(post_id):
         cursor.execute(query, (post_id,))
         post = cursor.fetchone()
         
-        connection.commit()
         cursor.close()
         connection.close()
         
         if not post:
             return jsonify({'error': '게시글을 찾을 수 없습니다'}), 404
         
+        # 조회수 증가 (메모리에 모았다가 주기적으로 일괄 저장, 저장 전 증가분을 더해서 표시)
+        board_views.record(post_id)
+        post['view_count'] = (post['view_count'] or 0) + board_views.pending([post_id]).get(post_id, 0)
+        
         return jsonify({'post': post}), 200
         
     except Exception as e:
@@ -1425,11 +1934,14 @@ def delete_board_post(post_id):
             return jsonify({'error': '게시글을 찾을 수 없습니다'}), 404
         
         # 게시글 비활성화 (is_active를 1로 변경)
-        cursor.execute("UPDATE QNA SET is_active = 1 WHERE QNA_ID = %s", (post_id,))
+        cursor.execute("UPDATE QNA SET is_active = 1 WHERE QNA_ID = %s AND is_active = 0", (post_id,))
+        deactivated = cursor.rowcount
         connection.commit()
         
         cursor.close()
         connection.close()
+        if deactivated:
+            board_post_count.adjust(-1)
         
         return jsonify({'message': f'게시글 "{post[1]}"이 성공적으로 삭제되었습니다'}), 200
         
@@ -1854,7 +2366,10 @@ def delete_admin_product(product_id):
         cursor = connection.cursor()
         
         # 상품 존재 확인
-        cursor.execute("SELECT PRODUCT_ID, product_name FROM PRODUCT WHERE PRODUCT_ID = %s", (product_id,))
+        cursor.execute("""
+            SELECT PRODUCT_ID, product_name, category, price, delivery_method, is_sold
+            FROM PRODUCT WHERE PRODUCT_ID = %s
+        """, (product_id,))
         product = cursor.fetchone()
         
         if not product:
@@ -1864,11 +2379,17 @@ def delete_admin_product(product_id):
         
         # 상품 삭제
         cursor.execute("DELETE FROM PRODUCT WHERE PRODUCT_ID = %s", (product_id,))
+        if cursor.rowcount:
+            adjust_facet_count(cursor, {
+                'category': product[2], 'price': product[3], 'delivery_method': product[4], 'is_sold': product[5]
+            }, -1)
         connection.commit()
         
         cursor.close()
         connection.close()
         
+        product_events.publish('deleted', {'id': product_id})
+        
         return jsonify({'message': f'상품 "{product[1]}"이 성공적으로 삭제되었습니다'}), 200
         
     except Exception as e:
@@ -1900,18 +2421,346 @@ def writing():
     return render_template('writing.html')
 
 ##############################################
-# 자연어 → SQL 기반 검색 (LLM이 직접 SQL 생성)
+# 자연어 → 검색 조건 기반 검색 (LLM이 검색 조건 JSON 생성)
 ##############################################
 
-def generate_sql_with_llm(nl_query: str):
-    """LLM에게 자연어 질의를 주고 SQL을 생성하도록 요청한다."""
+# spec: LLM이 검색 조건 JSON을 만들고 서버가 파라미터화된 SQL로 변환 (기본)
+# sql: LLM이 SQL을 직접 생성 (이전 방식, 필요할 때만 사용)
+NL_SEARCH_MODE = os.getenv('NL_SEARCH_MODE', 'spec')
+
+# 자연어 질의 → 검색 조건(또는 검증된 SQL) 캐시 (같은 질의는 LLM 호출 없이 재사용)
+nl_sql_cache = QueryCache(
+    max_entries=int(os.getenv('NL_SEARCH_CACHE_SIZE', '1000')),
+    ttl=int(os.getenv('NL_SEARCH_CACHE_TTL', '3600')),  # 초
+    persist_path=os.getenv('NL_SEARCH_CACHE_PATH') or None,  # 설정하면 재시작 후에도 유지
+    persist_interval=int(os.getenv('NL_SEARCH_CACHE_SAVE_SECONDS', '30')),  # 파일 저장 주기 (초)
+)
+nl_search_routes = SearchRouteStats()  # 규칙/캐시/LLM/폴백 처리 비율
+# 실행 전 EXPLAIN 비용 검사 + 문장 단위 실행 시간 제한
+nl_sql_guard = SqlGuard(
+    max_rows=int(os.getenv('NL_SQL_MAX_ROWS', '100000')),  # 예상 검사 행 수가 넘으면 거절
+    rewrite_rows=int(os.getenv('NL_SQL_REWRITE_ROWS', '5000')),  # 넘으면 이미지 등 넓은 컬럼을 나중에 조회
+    timeout_ms=int(os.getenv('NL_SQL_TIMEOUT_MS', '2000')),  # MAX_EXECUTION_TIME
+)
+
+# 검색용 공유 OpenAI 클라이언트 (연결 재사용, 제한 시간, 서킷 브레이커)
+search_llm = LLMClient(
+    lambda: os.getenv('open_api_key'),
+    connect_timeout=float(os.getenv('OPENAI_CONNECT_TIMEOUT', '2')),  # 초
+    read_timeout=float(os.getenv('OPENAI_READ_TIMEOUT', '10')),  # 초
+    failure_threshold=int(os.getenv('LLM_BREAKER_FAILURES', '5')),  # 연속 실패 시 브레이커 열림
+    reset_timeout=float(os.getenv('LLM_BREAKER_RESET_SECONDS', '30')),  # 열린 뒤 시험 호출까지 대기
+)
+
+# 상품 임베딩 인덱스 (의미 기반 검색). 등록/판매/삭제 이벤트를 백그라운드 큐로 반영
+product_index = ProductEmbeddingIndex(
+    lambda: default_embedding_factory(os.getenv('open_api_key')),
+    persist_directory=os.getenv('PRODUCT_INDEX_DIR', 'vector_db'),
+    host=os.getenv('CHROMA_HOST') or None,  # 여러 워커가 함께 쓰려면 Chroma 서버 사용
+    port=int(os.getenv('CHROMA_PORT', '8000')),
+)
+product_events.subscribe(product_index.handle_event)
+
+def load_active_product_titles():
+    """자동완성 인덱스 재구성용 판매중 상품 (PRODUCT_ID, 상품명) 목록"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('데이터베이스 연결 오류')
     try:
-        api_key = os.getenv('open_api_key')
-        if not api_key:
-            raise RuntimeError('OPENAI API KEY missing')
+        cursor = conn.cursor()
+        cursor.execute("SELECT PRODUCT_ID, product_name FROM PRODUCT WHERE is_sold = 0")
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        conn.close()
 
-        client = OpenAI(api_key=api_key)
-        
+# 검색어 자동완성 (판매중 상품 제목 + 자주 검색된 질의, 메모리 내 정렬 배열)
+search_suggestions = TypeaheadIndex(
+    load_active_product_titles,
+    rebuild_interval=int(os.getenv('SEARCH_SUGGEST_REBUILD_SECONDS', '300')),  # 다른 워커의 변경 반영 주기
+    query_half_life_hours=float(os.getenv('SEARCH_SUGGEST_QUERY_HALF_LIFE_HOURS', '72')),  # 검색어 횟수 반감기
+)
+product_events.subscribe(search_suggestions.handle_event)
+
+def load_active_catalog():
+    """상품 목록 스냅샷 재구성용 판매중 상품 전체 (이미지/설명 제외)"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('데이터베이스 연결 오류')
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT PRODUCT_ID, product_name, price, category, delivery_method, created_at
+            FROM PRODUCT
+            WHERE is_sold = 0
+        """)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        conn.close()
+
+# 판매중 상품 목록의 메모리 내 열 기반 스냅샷 (목록/카테고리 수 조회를 MySQL 없이 처리)
+catalog_snapshot = CatalogSnapshot(
+    load_active_catalog,
+    reconcile_interval=int(os.getenv('CATALOG_RECONCILE_SECONDS', '600')),  # 다른 워커의 변경 반영/공간 정리 주기
+)
+product_events.subscribe(catalog_snapshot.handle_event)
+
+def save_trend_scores(rows, now):
+    """인기 점수 증가분을 PRODUCT_TREND_SCORE에 합침 (기존 점수는 마지막 갱신 이후만큼 감쇠)"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('데이터베이스 연결 오류')
+    try:
+        cursor = conn.cursor()
+        updated_at = datetime.fromtimestamp(now)
+        # 판매 완료/삭제되어 FK가 없는 상품은 IGNORE로 건너뛴다 (score를 updated_at보다 먼저 계산)
+        cursor.executemany(f"""
+            INSERT IGNORE INTO PRODUCT_TREND_SCORE (PRODUCT_ID, score, updated_at)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                score = score * EXP(-TIMESTAMPDIFF(SECOND, updated_at, VALUES(updated_at)) / {trending_scores.tau:.1f}) + VALUES(score),
+                updated_at = VALUES(updated_at)
+        """, [(product_id, score, updated_at) for product_id, score in rows])
+        cursor.execute("""
+            DELETE FROM PRODUCT_TREND_SCORE
+            WHERE score * EXP(-TIMESTAMPDIFF(SECOND, updated_at, %s) / %s) < %s
+        """, (updated_at, trending_scores.tau, TRENDING_MIN_SCORE))
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+def load_trend_scores():
+    """전체 워커가 합친 판매중 상품 인기 점수 (지금 시각 기준으로 감쇠)"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('데이터베이스 연결 오류')
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT t.PRODUCT_ID, p.category,
+                   t.score * EXP(-TIMESTAMPDIFF(SECOND, t.updated_at, %s) / %s) AS current_score
+            FROM PRODUCT_TREND_SCORE t
+            JOIN PRODUCT p ON p.PRODUCT_ID = t.PRODUCT_ID
+            WHERE p.is_sold = 0
+            ORDER BY current_score DESC
+            LIMIT %s
+        """, (datetime.now(), trending_scores.tau, int(os.getenv('TRENDING_MAX_PRODUCTS', '5000'))))
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        conn.close()
+
+# 인기 상품 점수 (조회/채팅/댓글 이벤트를 메모리에 모으고 주기적으로 DB에 합침)
+trending_scores = TrendingScores(
+    save_trend_scores,
+    load_trend_scores,
+    half_life_hours=float(os.getenv('TRENDING_HALF_LIFE_HOURS', '24')),
+    snapshot_interval=int(os.getenv('TRENDING_SNAPSHOT_SECONDS', '60')),
+)
+product_events.subscribe(trending_scores.handle_event)
+
+def viewer_key():
+    """순 방문자 판별 키 (로그인 사용자는 USER_ID, 아니면 접속 IP)"""
+    if session.get('user_id'):
+        return f"user:{session['user_id']}"
+    return f"ip:{request.access_route[0] if request.access_route else request.remote_addr}"
+
+def save_product_views(counts, sketches):
+    """상품 조회수 증가분과 방문자 스케치를 PRODUCT_VIEW_STATS에 여러 행 upsert로 저장
+
+    실패하면 ViewCounter가 증가분 전체를 되돌려 다시 저장하므로 모든 배치를 한 트랜잭션으로 커밋한다.
+    """
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('데이터베이스 연결 오류')
+    try:
+        cursor = conn.cursor()
+        product_ids = sorted(counts)  # 워커끼리 같은 순서로 잠가서 교착 상태를 줄인다
+        for start in range(0, len(product_ids), 500):
+            batch = product_ids[start:start + 500]
+            placeholders = ', '.join(['%s'] * len(batch))
+            # 저장된 스케치와 합쳐야 하므로 다른 워커의 저장과 겹치지 않게 행을 잠근다
+            cursor.execute(f"""
+                SELECT PRODUCT_ID, viewer_sketch
+                FROM PRODUCT_VIEW_STATS
+                WHERE PRODUCT_ID IN ({placeholders})
+                FOR UPDATE
+            """, batch)
+            stored = {product_id: sketch for product_id, sketch in cursor.fetchall()}
+            
+            rows = []
+            for product_id in batch:
+                sketch = sketches.get(product_id) or HyperLogLog()
+                if stored.get(product_id):
+                    sketch.merge(stored[product_id])
+                rows.append((product_id, counts[product_id], sketch.estimate(), sketch.to_bytes()))
+            # 판매자 탈퇴 등으로 삭제된 상품은 IGNORE로 건너뛴다
+            cursor.execute(f"""
+                INSERT IGNORE INTO PRODUCT_VIEW_STATS (PRODUCT_ID, view_count, unique_viewers, viewer_sketch)
+                VALUES {', '.join(['(%s, %s, %s, %s)'] * len(rows))}
+                ON DUPLICATE KEY UPDATE
+                    view_count = view_count + VALUES(view_count),
+                    unique_viewers = VALUES(unique_viewers),
+                    viewer_sketch = VALUES(viewer_sketch)
+            """, [value for row in rows for value in row])
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+# 상품 조회수/순 방문자 (메모리에 모았다가 주기적으로 일괄 저장)
+product_views = ViewCounter(
+    save_product_views,
+    flush_interval=int(os.getenv('PRODUCT_VIEW_FLUSH_SECONDS', '30')),
+    name='product-views',
+)
+
+def save_board_views(counts, _sketches):
+    """게시글 조회수 증가분을 CASE 식 UPDATE로 저장 (500개씩, 전체를 한 트랜잭션으로 커밋)"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('데이터베이스 연결 오류')
+    try:
+        cursor = conn.cursor()
+        post_ids = sorted(counts)
+        for start in range(0, len(post_ids), 500):
+            batch = post_ids[start:start + 500]
+            cursor.execute(f"""
+                UPDATE QNA
+                SET view_count = view_count + CASE QNA_ID {' '.join(['WHEN %s THEN %s'] * len(batch))} ELSE 0 END
+                WHERE QNA_ID IN ({', '.join(['%s'] * len(batch))})
+            """, [value for post_id in batch for value in (post_id, counts[post_id])] + batch)
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def count_active_board_posts():
+    """활성 게시글 수 (캐시 만료 때만 실행)"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('데이터베이스 연결 오류')
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM QNA WHERE is_active = 0")
+        count = cursor.fetchone()[0]
+        cursor.close()
+        return count
+    finally:
+        conn.close()
+
+# 활성 게시글 수 캐시 (글 작성/삭제 때 증감)
+board_post_count = ActivePostCount(count_active_board_posts, ttl=int(os.getenv('BOARD_COUNT_TTL', '300')))
+
+# 게시글 조회수 (인기 공지의 행 잠금 경합을 피하도록 메모리에 모았다가 일괄 저장)
+board_views = ViewCounter(
+    save_board_views,
+    flush_interval=int(os.getenv('BOARD_VIEW_FLUSH_SECONDS', '30')),
+    track_unique=False,
+    name='board-views',
+)
+
+# 비슷한 상품 추천 결과 캐시 (TTL마다 판매 여부를 다시 확인)
+similar_products_cache = SimilarProductsCache(ttl=int(os.getenv('SIMILAR_PRODUCTS_CACHE_TTL', '300')))
+
+def load_sold_prices():
+    """가격 추천 계산용 최근 판매 완료 상품 (상품명, 카테고리, 가격)"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('데이터베이스 연결 오류')
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT product_name, category, price
+            FROM PRODUCT
+            WHERE is_sold = 1
+            ORDER BY PRODUCT_ID DESC
+            LIMIT %s
+        """, (int(os.getenv('PRICE_SUGGEST_MAX_ITEMS', '20000')),))  # 2만 개 ≈ 벡터 40MB
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        conn.close()
+
+# 등록 시 가격 추천 (판매 완료 상품 벡터/가격 분포를 주기적으로 미리 계산)
+price_suggestions = PriceSuggestionIndex(
+    load_sold_prices,
+    refresh_interval=int(os.getenv('PRICE_SUGGEST_REFRESH_SECONDS', '3600')),
+)
+
+def generate_search_spec_with_llm(nl_query: str):
+    """LLM에게 자연어 질의를 주고 검색 조건 JSON을 생성하도록 요청한다. (검증된 검색 조건 반환)"""
+    system_prompt = """
+    당신은 중고거래 사이트 감자마켓의 자연어 검색 요청을 검색 조건 JSON으로 변환하는 어시스턴트입니다.
+    
+    JSON 형식 (다른 키는 사용하지 마세요):
+    {
+      "keywords": 상품명/설명에서 찾을 키워드 배열 (최대 3개, 하나라도 포함되면 검색됨),
+      "category": "의류" | "전자기기" | "기타" | null,
+      "min_price": 최소 가격(원, 정수) | null,
+      "max_price": 최대 가격(원, 정수) | null,
+      "delivery_method": "CU편의점 택배" | "GS편의점 택배" | "7ELEVEN 택배" | "우체국 택배" | null,
+      "sort": "latest" | "price_asc" | "price_desc"
+    }
+    
+    규칙:
+    1. JSON만 반환하세요. 다른 설명은 포함하지 마세요.
+    2. 질의에서 "검색해줘", "검색", "찾아줘" 같은 부가 문구는 무시하고 실제 검색 키워드만 추출하세요
+    3. 정렬 요청이 없으면 sort는 "latest"입니다
+    4. 카테고리 일반 키워드만 단독으로 검색할 때는 category만 지정하고 keywords는 비워두세요
+       * 의류 카테고리 키워드: "신발", "옷", "의류", "가방"
+       * 전자기기 카테고리 키워드: "노트북", "컴퓨터", "스마트폰", "전자기기", "태블릿"
+    5. 카테고리 키워드와 함께 가격 등 다른 조건이 있으면 카테고리 키워드도 keywords에 넣으세요
+    6. 브랜드명(나이키, 컨버스, 아디다스 등)이나 모델명(에어포스, 척테일러 등)은 category "의류"와 함께 keywords에 넣으세요
+    7. 전자제품 브랜드/모델명(아이폰, 갤럭시, 맥북, 삼성 등)은 category "전자기기"와 함께 keywords에 넣으세요
+    
+    예시:
+    질의: "신발 검색"
+    {"keywords": [], "category": "의류", "min_price": null, "max_price": null, "delivery_method": null, "sort": "latest"}
+    
+    질의: "겨울에 입을 만한 15만원 이하 옷 검색해줘"
+    {"keywords": ["겨울"], "category": "의류", "min_price": null, "max_price": 150000, "delivery_method": null, "sort": "latest"}
+    
+    질의: "나이키 에어포스 검색"
+    {"keywords": ["나이키", "에어포스"], "category": "의류", "min_price": null, "max_price": null, "delivery_method": null, "sort": "latest"}
+    
+    질의: "65만원 이하 노트북 싼 순으로"
+    {"keywords": ["노트북"], "category": "전자기기", "min_price": null, "max_price": 650000, "delivery_method": null, "sort": "price_asc"}
+    """
+    
+    completion = search_llm.chat_completion(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"검색 요청: {nl_query.strip()}"}
+        ],
+        temperature=0.1,
+        max_tokens=200,
+        response_format={"type": "json_object"}
+    )
+    
+    content = completion.choices[0].message.content.strip()
+    try:
+        spec = json.loads(content)
+    except ValueError:
+        raise ValueError(f"검색 조건 JSON 파싱 실패: {content}")
+    return validate_search_spec(spec)
+
+def generate_sql_with_llm(nl_query: str):
+    """LLM에게 자연어 질의를 주고 SQL을 생성하도록 요청한다. (NL_SEARCH_MODE=sql일 때만 사용)"""
+    try:
         # 테이블 스키마 정보
         schema_info = """
         PRODUCT 테이블 스키마:
@@ -1984,7 +2833,7 @@ def generate_sql_with_llm(nl_query: str):
         SQL: SELECT PRODUCT_ID, product_name, price, description, image_url, delivery_method, category, created_at, is_sold FROM PRODUCT WHERE is_sold = 0 AND category = '의류' AND price <= 150000 AND product_name LIKE '%신발%' ORDER BY created_at DESC LIMIT 50
         """
         
-        completion = client.chat.completions.create(
+        completion = search_llm.chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -2005,10 +2854,7 @@ def generate_sql_with_llm(nl_query: str):
         
     except Exception as e:
         print(f"LLM SQL 생성 오류: {e}")
-        # 폴백: 기본 SQL 생성 (단순 LIKE 검색)
-        # 보안을 위해 파라미터화는 나중에 추가 가능
-        safe_query = nl_query.replace("'", "''")  # SQL Injection 방지 (기본)
-        return f"SELECT PRODUCT_ID, product_name, price, description, image_url, delivery_method, category, created_at, is_sold FROM PRODUCT WHERE is_sold = 0 AND (product_name LIKE '%{safe_query}%' OR description LIKE '%{safe_query}%') ORDER BY created_at DESC LIMIT 50"
+        raise
 
 def validate_sql(sql: str):
     """SQL의 기본적인 보안 검증"""
@@ -2049,7 +2895,7 @@ def validate_sql(sql: str):
 
 @app.route('/api/search/nl', methods=['GET'])
 def search_natural_language():
-    """자연어 질의를 LLM으로 SQL로 변환하여 검색한다."""
+    """자연어 질의를 검색 조건으로 변환하여 검색한다."""
     try:
         q = request.args.get('q', '').strip()
         if not q:
@@ -2058,22 +2904,60 @@ def search_natural_language():
         # 로그 출력 (요청 시작)
         print("[NL-SEARCH] user_query:", q)
 
-        # LLM으로 SQL 생성
-        try:
-            sql = generate_sql_with_llm(q)
-            print("[NL-SEARCH] raw_sql_from_llm:", sql)
-        except Exception as e:
-            print(f"[NL-SEARCH] LLM SQL 생성 오류: {e}")
-            return jsonify({'error': f'SQL 생성 중 오류가 발생했습니다: {str(e)}'}), 500
-        
-        # SQL 검증
-        try:
-            sql = validate_sql(sql)
-            print("[NL-SEARCH] validated_sql:", sql)
-        except ValueError as e:
-            print(f"[NL-SEARCH] SQL 검증 실패: {e}")
-            print(f"[NL-SEARCH] 검증 실패한 SQL: {sql}")
-            return jsonify({'error': f'SQL 검증 오류: {str(e)}', 'sql': sql}), 400
+        # 단순한 질의(카테고리/가격/배송 방법)는 규칙으로 해석해서 LLM 없이 바로 검색
+        route = 'fast_path'
+        spec = parse_search_query(q)
+        sql = None
+        if not spec:
+            # 캐시 확인 (검증까지 끝난 검색 조건 또는 SQL만 저장되어 있음)
+            cached = nl_sql_cache.get(q)
+            if isinstance(cached, dict):
+                route = 'cache'
+                spec, sql = cached.get('spec'), cached.get('sql')
+            else:
+                route = 'llm'
+                try:
+                    if NL_SEARCH_MODE == 'sql':
+                        sql = generate_sql_with_llm(q)
+                        print("[NL-SEARCH] raw_sql_from_llm:", sql)
+                    else:
+                        spec = generate_search_spec_with_llm(q)
+                except CircuitOpenError:
+                    print("[NL-SEARCH] LLM 서킷 브레이커 열림, 기본 검색 사용")
+                    route = 'fallback'
+                except ValueError as e:
+                    print(f"[NL-SEARCH] LLM 응답 검증 실패, 기본 검색 사용: {e}")
+                    route = 'fallback'
+                except Exception as e:
+                    print(f"[NL-SEARCH] LLM 호출 오류, 기본 검색 사용: {e}")
+                    route = 'fallback'
+                
+                if sql:
+                    # SQL 검증
+                    try:
+                        sql = validate_sql(sql)
+                        print("[NL-SEARCH] validated_sql:", sql)
+                    except ValueError as e:
+                        print(f"[NL-SEARCH] SQL 검증 실패: {e}")
+                        print(f"[NL-SEARCH] 검증 실패한 SQL: {sql}")
+                        return jsonify({'error': f'SQL 검증 오류: {str(e)}', 'sql': sql}), 400
+                
+                # LLM 실패 시의 기본 검색은 캐시하지 않는다
+                if route == 'llm':
+                    nl_sql_cache.put(q, {'sql': sql} if sql else {'spec': spec})
+        
+        params = None
+        if route == 'fallback':
+            # LLM을 쓸 수 없으면 FULLTEXT 관련도순 검색 (부가 문구를 뺀 검색어 사용)
+            fallback_query = normalize_search_query(q) or q
+            if not has_search_terms(fallback_query):
+                return jsonify({'error': '검색어를 입력해주세요.'}), 400
+            sql, params = build_fulltext_query(fallback_query)
+            print("[NL-SEARCH] fulltext_fallback:", params[0])
+        elif spec:
+            sql, params = build_search_query(spec)
+            print(f"[NL-SEARCH] spec({route}):", spec)
+        nl_search_routes.record(route)
 
         # 데이터베이스 연결 및 실행
         conn = get_db_connection()
@@ -2082,11 +2966,28 @@ def search_natural_language():
         
         try:
             cursor = conn.cursor()
-            cursor.execute(sql)
+            # 실행 계획 검사 후 실행 (실행 시간 제한 힌트 추가, LLM이 만든 SQL은 비용이 너무 크면 거절)
+            llm_sql = not spec and route != 'fallback'
+            guarded_sql = nl_sql_guard.prepare(cursor, sql, params, reject=llm_sql)
+            cursor.execute(guarded_sql, params)
             rows = cursor.fetchall()
             cursor.close()
             conn.close()
-            print(f"[NL-SEARCH] 검색 결과: {len(rows)}개 상품")
+            print(f"[NL-SEARCH] 검색 결과: {len(rows)}개 상품 (route={route})")
+            if rows:
+                search_suggestions.record_query(q)
+        except QueryRejectedError as e:
+            conn.close()
+            return jsonify({'error': f'{str(e)} 검색어를 더 구체적으로 입력해주세요.', 'sql': sql}), 400
+        except mysql.connector.Error as e:
+            conn.close()
+            if e.errno == MAX_EXECUTION_TIME_ERRNO:
+                nl_sql_guard.record_timeout()
+                print(f"[NL-SEARCH] 실행 시간 초과: {sql}")
+                return jsonify({'error': '검색 시간이 초과되었습니다. 검색어를 더 구체적으로 입력해주세요.'}), 504
+            print(f"[NL-SEARCH] SQL 실행 오류: {e}")
+            print(f"[NL-SEARCH] 실행 실패한 SQL: {sql}")
+            return jsonify({'error': f'SQL 실행 중 오류가 발생했습니다: {str(e)}', 'sql': sql}), 500
         except Exception as e:
             print(f"[NL-SEARCH] SQL 실행 오류: {e}")
             print(f"[NL-SEARCH] 실행 실패한 SQL: {sql}")
@@ -2116,7 +3017,10 @@ def search_natural_language():
         return jsonify({
             'products': products,
             'total': len(products),
-            'sql': sql  # 디버깅용으로 SQL도 반환
+            'sql': sql,  # 디버깅용으로 SQL도 반환
+            'spec': spec,
+            'cached': route == 'cache',
+            'route': route  # fast_path | cache | llm | fallback
         }), 200
         
     except Exception as e:
@@ -2125,6 +3029,186 @@ def search_natural_language():
         traceback.print_exc()
         return jsonify({'error': f'자연어 검색 중 오류가 발생했습니다: {str(e)}'}), 500
 
+@app.route('/api/search', methods=['GET'])
+def search_products():
+    """FULLTEXT(ngram) 관련도순 상품 검색 (카테고리/가격 필터, 커서 기반 페이지네이션)"""
+    try:
+        q = request.args.get('q', '').strip()
+        # '+++'처럼 검색 조건이 만들어지지 않는 검색어는 전체 목록이 되므로 받지 않는다
+        if not q or not has_search_terms(q):
+            return jsonify({'error': '검색어를 입력해주세요.'}), 400
+        
+        category = request.args.get('category') or None
+        if category and category not in CATEGORIES:
+            return jsonify({'error': '올바르지 않은 카테고리입니다.'}), 400
+        try:
+            min_price = request.args.get('min_price', type=int)
+            max_price = request.args.get('max_price', type=int)
+            limit = min(max(request.args.get('limit', 20, type=int), 1), SEARCH_LIMIT)
+            sql, params = build_fulltext_query(
+                q, category, min_price, max_price,
+                cursor=request.args.get('cursor') or None,
+                limit=limit + 1  # 다음 페이지가 있는지 확인하기 위해 한 행 더 조회
+            )
+        except ValueError:
+            return jsonify({'error': '잘못된 커서입니다.'}), 400
+        
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'error': '데이터베이스 연결 오류'}), 500
+        
+        cursor = conn.cursor()
+        cursor.execute(with_execution_time_limit(sql, nl_sql_guard.timeout_ms), params)
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        
+        if rows and not request.args.get('cursor'):
+            search_suggestions.record_query(q)
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        products = []
+        for r in rows:
+            image_url = None
+            if r[4]:  # image_url (LONGBLOB)
+                image_base64 = base64.b64encode(r[4]).decode('utf-8')
+                image_url = f"data:image/jpeg;base64,{image_base64}"
+            products.append({
+                'id': r[0],
+                'title': r[1] or '상품명 없음',
+                'price': r[2] or 0,
+                'description': r[3] or '',
+                'image_url': image_url,
+                'delivery_method': r[5] or '배송 정보 없음',
+                'category': r[6] or '기타',
+                'created_at': r[7].isoformat() if r[7] else None,
+                'is_sold': bool(r[8]),
+                'score': float(r[9] or 0)
+            })
+        
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = format_search_cursor(rows[-1][9], rows[-1][0])
+        
+        return jsonify({
+            'products': products,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        }), 200
+        
+    except Exception as e:
+        print(f"[SEARCH] 검색 오류: {e}")
+        return jsonify({'error': f'상품 검색 중 오류가 발생했습니다: {str(e)}'}), 500
+
+@app.route('/api/search/suggest', methods=['GET'])
+def search_suggest():
+    """검색어 자동완성 (입력 중인 접두어로 시작하는 상품명/인기 검색어)"""
+    try:
+        q = request.args.get('q', '')
+        if not q.strip():
+            return jsonify({'suggestions': []}), 200
+        limit = min(max(request.args.get('limit', 8, type=int), 1), 20)
+        return jsonify({'suggestions': search_suggestions.suggest(q, limit)}), 200
+    except Exception as e:
+        print(f"[SEARCH-SUGGEST] 자동완성 오류: {e}")
+        return jsonify({'error': f'자동완성 중 오류가 발생했습니다: {str(e)}'}), 500
+
+@app.route('/api/search/semantic', methods=['GET'])
+def search_semantic():
+    """임베딩 기반 의미 검색 (근사 최근접 상위 k개 → SQL로 판매중/카테고리/가격 확인)"""
+    try:
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({'error': '검색어를 입력해주세요.'}), 400
+        
+        category = request.args.get('category') or None
+        if category and category not in CATEGORIES:
+            return jsonify({'error': '올바르지 않은 카테고리입니다.'}), 400
+        min_price = request.args.get('min_price', type=int)
+        max_price = request.args.get('max_price', type=int)
+        k = min(max(request.args.get('k', 20, type=int), 1), SEARCH_LIMIT)
+        
+        try:
+            hits = product_index.search(q, k=k, category=category, min_price=min_price, max_price=max_price)
+        except Exception as e:
+            print(f"[SEMANTIC-SEARCH] 임베딩 검색 오류: {e}")
+            return jsonify({'error': f'의미 검색을 사용할 수 없습니다: {str(e)}'}), 503
+        if not hits:
+            return jsonify({'products': [], 'total': 0}), 200
+        
+        scores = dict(hits)
+        conditions = [f"PRODUCT_ID IN ({', '.join(['%s'] * len(hits))})", 'is_sold = 0']
+        params = [product_id for product_id, _ in hits]
+        if category:
+            conditions.append('category = %s')
+            params.append(category)
+        if min_price is not None:
+            conditions.append('price >= %s')
+            params.append(min_price)
+        if max_price is not None:
+            conditions.append('price <= %s')
+            params.append(max_price)
+        
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'error': '데이터베이스 연결 오류'}), 500
+        
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {SEARCH_COLUMNS} FROM PRODUCT WHERE {' AND '.join(conditions)}", params)
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        
+        # 유사도 순서 유지
+        rows.sort(key=lambda r: scores[r[0]], reverse=True)
+        products = []
+        for r in rows:
+            image_url = None
+            if r[4]:  # image_url (LONGBLOB)
+                image_base64 = base64.b64encode(r[4]).decode('utf-8')
+                image_url = f"data:image/jpeg;base64,{image_base64}"
+            products.append({
+                'id': r[0],
+                'title': r[1] or '상품명 없음',
+                'price': r[2] or 0,
+                'description': r[3] or '',
+                'image_url': image_url,
+                'delivery_method': r[5] or '배송 정보 없음',
+                'category': r[6] or '기타',
+                'created_at': r[7].isoformat() if r[7] else None,
+                'is_sold': bool(r[8]),
+                'score': round(scores[r[0]], 4)
+            })
+        
+        return jsonify({'products': products, 'total': len(products)}), 200
+        
+    except Exception as e:
+        print(f"[SEMANTIC-SEARCH] 검색 오류: {e}")
+        return jsonify({'error': f'의미 검색 중 오류가 발생했습니다: {str(e)}'}), 500
+
+@app.route('/api/admin/search-metrics', methods=['GET'])
+def get_search_metrics():
+    """자연어 검색 캐시/처리 경로 지표 조회 (이 워커 프로세스 기준)"""
+    if not session.get('logged_in') or session.get('user_type') != 'manager':
+        return jsonify({'error': '관리자 권한이 필요합니다'}), 403
+    return jsonify({
+        'success': True,
+        'sql_cache': nl_sql_cache.metrics(),
+        'routes': nl_search_routes.metrics(),
+        'sql_guard': nl_sql_guard.metrics(),
+        'llm_breaker': search_llm.breaker.metrics(),
+        'product_index': product_index.metrics(),
+        'suggestions': search_suggestions.metrics(),
+        'catalog_snapshot': catalog_snapshot.metrics(),
+        'similar_products_cache': similar_products_cache.metrics(),
+        'price_suggestions': price_suggestions.metrics(),
+        'trending': trending_scores.metrics(),
+        'product_views': product_views.metrics(),
+        'board_views': board_views.metrics(),
+        'board_post_count': board_post_count.metrics()
+    }), 200
+
 @app.route('/upload-image', methods=['POST'])
 def upload_image():
     if 'image' not in request.files:
@@ -2179,6 +3263,15 @@ def chat_page(room_id):
     """채팅 페이지 렌더링"""
     return render_template('chat.html')
 
+# 챗봇 호출 전용 실행기 (동시 실행 수 제한 + 동일 질문 합치기)
+chatbot_executor = ChatbotExecutor(
+    get_chatbot,
+    max_in_flight=int(os.getenv('CHATBOT_MAX_IN_FLIGHT', 4)),
+    max_waiting=int(os.getenv('CHATBOT_MAX_WAITING', 16)),
+    queue_timeout=float(os.getenv('CHATBOT_QUEUE_TIMEOUT', 3)),
+    response_timeout=float(os.getenv('CHATBOT_RESPONSE_TIMEOUT', 60))
+)
+
 @app.route('/api/chatbot', methods=['POST'])
 def chatbot_api():
     """챗봇 API - 사용자 메시지 처리"""
@@ -2197,11 +3290,17 @@ def chatbot_api():
         # 세션 ID 생성 (사용자별로 구분)
         session_id = session.get('user_id', 'anonymous')
         
-        # 챗봇 응답 생성
-        response = chatbot.chat(message, session_id)
+        # 챗봇 응답 생성 (전용 실행기에서 실행, 한도 초과 시 바로 거절)
+        try:
+            response = chatbot_executor.chat(message, session_id)
+        except ChatbotBusyError:
+            return jsonify({'error': '챗봇 요청이 많습니다. 잠시 후 다시 시도해주세요.'}), 503
+        except ChatbotTimeoutError:
+            return jsonify({'error': '챗봇 응답 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.'}), 504
         
         return jsonify({
             'response': response,
+            'usage': chatbot.get_prompt_stats(session_id),  # 프롬프트 토큰 수
             'success': True
         }), 200
         
@@ -2224,6 +3323,18 @@ def clear_chatbot_session():
         print(f"챗봇 세션 초기화 오류: {e}")
         return jsonify({'error': '세션 초기화 중 오류가 발생했습니다.'}), 500
 
+def create_chat_history_store():
+    """챗봇 대화 기록 저장소 생성 (CHATBOT_HISTORY_BACKEND: mysql | sqlite | memory)"""
+    backend = os.getenv('CHATBOT_HISTORY_BACKEND', 'mysql').lower()
+    try:
+        if backend == 'mysql':
+            return ChatHistoryStore.for_mysql(get_db_connection)
+        if backend == 'sqlite':
+            return ChatHistoryStore.for_sqlite(os.getenv('CHATBOT_HISTORY_SQLITE_PATH', 'chatbot_history.db'))
+    except Exception as e:
+        print(f"대화 기록 저장소 초기화 오류: {e} (메모리 저장소를 사용합니다)")
+    return None
+
 # 챗봇 초기화 (앱 시작 시)
 def init_chatbot():
     """챗봇 초기화"""
@@ -2238,7 +3349,13 @@ def init_chatbot():
         initialize_chatbot(
             api_key=openai_api_key,
             pdf_path="potato_market_guide.pdf",  # PDF 파일 경로
-            persist_directory="vector_db"  # 벡터 DB 저장 경로
+            persist_directory="vector_db",  # 벡터 DB 저장 경로
+            history_store=create_chat_history_store(),  # 워커 간 공유 대화 기록
+            retrieval_mode=os.getenv('CHATBOT_RETRIEVAL_MODE', 'vector'),  # vector | hybrid | lexical
+            knowledge_dir=os.getenv('CHATBOT_KNOWLEDGE_DIR', 'knowledge_base'),  # FAQ/수수료/안전거래 등 추가 문서
+            index_mode=os.getenv('CHATBOT_INDEX_MODE', 'build'),  # build | readonly
+            index_dir=os.getenv('CHATBOT_INDEX_DIR', 'vector_index'),
+            prompt_token_budget=int(os.getenv('CHATBOT_PROMPT_TOKEN_BUDGET', '2500'))  # 프롬프트 토큰 예산
         )
         
         print("챗봇이 성공적으로 초기화되었습니다.")
@@ -2248,6 +3365,160 @@ def init_chatbot():
         print(f"챗봇 초기화 오류: {e}")
         return False
 
+@app.cli.command('ingest-guide')
+def ingest_guide_command():
+    """챗봇 지식 베이스를 임베딩해서 읽기 전용 벡터 인덱스의 새 버전 생성
+
+    워커는 CHATBOT_INDEX_MODE=readonly로 이 인덱스를 열기만 한다.
+    """
+    openai_api_key = os.getenv('open_api_key')
+    if not openai_api_key:
+        print("경고: OPENAI_API_KEY가 설정되지 않았습니다.")
+        return
+    
+    index_dir = os.getenv('CHATBOT_INDEX_DIR', 'vector_index')
+    chunks = load_knowledge_base([
+        "potato_market_guide.pdf",
+        os.getenv('CHATBOT_KNOWLEDGE_DIR', 'knowledge_base')
+    ])
+    print(f"분할된 청크 수: {len(chunks)}")
+    
+    version = build_vector_index(chunks, default_embedding_factory(openai_api_key), index_dir)
+    print(f"벡터 인덱스 생성 완료: {index_dir}/{version}")
+
+@app.cli.command('rebuild-facet-counts')
+def rebuild_facet_counts_command():
+    """PRODUCT 전체로 필터별 상품 수(PRODUCT_FACET_COUNT) 재계산 (트래픽이 적을 때 실행)"""
+    conn = get_db_connection()
+    if not conn:
+        print("데이터베이스 연결 오류")
+        return
+    cursor = conn.cursor()
+    rebuild_facet_counts(cursor)
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print("필터별 상품 수 재계산 완료")
+
+@app.cli.command('recount-product-comments')
+def recount_product_comments_command():
+    """COMMENTS로 PRODUCT.comment_count 재계산 (회원 탈퇴 CASCADE 삭제 등 보정용)"""
+    conn = get_db_connection()
+    if not conn:
+        print("데이터베이스 연결 오류")
+        return
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE PRODUCT p
+        LEFT JOIN (SELECT PRODUCT_ID, COUNT(*) AS comment_count FROM COMMENTS GROUP BY PRODUCT_ID) c
+            ON c.PRODUCT_ID = p.PRODUCT_ID
+        SET p.comment_count = COALESCE(c.comment_count, 0)
+    """)
+    conn.commit()
+    print(f"상품 댓글 수 재계산 완료: {cursor.rowcount}개 상품 변경")
+    cursor.close()
+    conn.close()
+
+@app.cli.command('compute-similar-products')
+def compute_similar_products_command():
+    """판매중 상품 전체의 비슷한 상품을 다시 계산해서 PRODUCT_SIMILAR에 저장 (cron 등으로 주기 실행)"""
+    conn = get_db_connection()
+    if not conn:
+        print("데이터베이스 연결 오류")
+        return
+    
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT PRODUCT_ID, product_name, description, category
+        FROM PRODUCT
+        WHERE is_sold = 0
+    """)
+    products = cursor.fetchall()
+    print(f"판매중 상품 {len(products)}개 유사도 계산 중...")
+    results = compute_similar_products(products)
+    
+    rows = [(product_id, json.dumps(similar)) for product_id, similar in results.items()]
+    for start in range(0, len(rows), 500):
+        cursor.executemany("""
+            INSERT INTO PRODUCT_SIMILAR (PRODUCT_ID, similar_products)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE similar_products = VALUES(similar_products), computed_at = CURRENT_TIMESTAMP
+        """, rows[start:start + 500])
+        conn.commit()
+    
+    # 판매 완료된 상품의 추천 목록 정리
+    cursor.execute("""
+        DELETE s FROM PRODUCT_SIMILAR s
+        JOIN PRODUCT p ON p.PRODUCT_ID = s.PRODUCT_ID
+        WHERE p.is_sold = 1
+    """)
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print(f"비슷한 상품 계산 완료: {len(rows)}개 상품")
+
+@app.cli.command('backfill-product-locations')
+def backfill_product_locations_command():
+    """좌표가 없는 상품의 거래 장소 좌표를 우편번호 구역 대표 좌표로 채움 (마이그레이션 후 1회 실행)"""
+    conn = get_db_connection()
+    if not conn:
+        print("데이터베이스 연결 오류")
+        return
+    
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT PRODUCT_ID, meeting_zip_code
+        FROM PRODUCT
+        WHERE meeting_lat IS NULL
+    """)
+    rows = []
+    skipped = 0
+    for product_id, zip_code in cursor.fetchall():
+        coordinates = geocode_zip(zip_code)
+        if not coordinates:
+            skipped += 1
+            continue
+        rows.append((coordinates[0], coordinates[1], geohash_encode(*coordinates), product_id))
+    for start in range(0, len(rows), 500):
+        cursor.executemany("""
+            UPDATE PRODUCT SET meeting_lat = %s, meeting_lng = %s, geohash = %s
+            WHERE PRODUCT_ID = %s
+        """, rows[start:start + 500])
+        conn.commit()
+    cursor.close()
+    conn.close()
+    print(f"거래 장소 좌표 채움: {len(rows)}개 (우편번호를 알 수 없음: {skipped}개)")
+
+@app.cli.command('index-products')
+def index_products_command():
+    """판매중인 상품 전체를 상품 임베딩 인덱스에 다시 등록 (최초 구축/복구용)"""
+    conn = get_db_connection()
+    if not conn:
+        print("데이터베이스 연결 오류")
+        return
+    
+    cursor = conn.cursor(dictionary=True)
+    last_id = 0
+    total = 0
+    while True:
+        cursor.execute("""
+            SELECT PRODUCT_ID AS id, product_name AS title, description, category, price
+            FROM PRODUCT
+            WHERE is_sold = 0 AND PRODUCT_ID > %s
+            ORDER BY PRODUCT_ID
+            LIMIT %s
+        """, (last_id, product_index.batch_size))
+        products = cursor.fetchall()
+        if not products:
+            break
+        product_index.add_products(products)
+        last_id = products[-1]['id']
+        total += len(products)
+        print(f"상품 임베딩 {total}개 등록")
+    cursor.close()
+    conn.close()
+    print(f"상품 임베딩 인덱스 구축 완료: {total}개")
+
 # 채팅 관련 API
 @app.route('/api/chat/rooms', methods=['GET'])
 def get_chat_rooms():
@@ -2361,7 +3632,7 @@ def create_or_get_chat_room():
         
         # 상품 정보 조회
         cursor.execute("""
-            SELECT PRODUCT_ID, SELLER_ID, product_name, price
+            SELECT PRODUCT_ID, SELLER_ID, product_name, price, category
             FROM PRODUCT
             WHERE PRODUCT_ID = %s
         """, (product_id,))
@@ -2397,6 +3668,7 @@ def create_or_get_chat_room():
             """, (product_id, seller_id, buyer_id))
             conn.commit()
             room_id = cursor.lastrowid
+            trending_scores.record(product['PRODUCT_ID'], 'chat', product['category'])
         
         cursor.close()
         conn.close()
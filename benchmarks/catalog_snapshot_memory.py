@@ -0,0 +1,67 @@
+# benchmarks/catalog_snapshot_memory.py
+"""판매중 상품 스냅샷(catalog_snapshot)의 메모리 사용량과 조회 시간 측정
+
+임의로 만든 상품 N개로 스냅샷을 구성해서 10만 개당 메모리와
+카테고리/가격 필터 + 정렬 조회, 카테고리별 개수 조회 시간을 출력한다.
+
+사용법:
+    python benchmarks/catalog_snapshot_memory.py --count 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_snapshot import CatalogSnapshot
+from search_query import CATEGORIES, DELIVERY_METHODS
+
+WORDS = ['나이키', '아디다스', '맥북', '아이폰', '갤럭시', '원피스', '패딩', '자전거', '책상', '의자',
+         '모니터', '키보드', '에어팟', '운동화', '가방', '거의 새것', '급처', '정품', '미개봉', '팝니다']
+
+
+def make_rows(count):
+    now = datetime.now()
+    return [
+        (product_id, ' '.join(random.sample(WORDS, 4)), random.randint(1, 300) * 1000,
+         random.choice(CATEGORIES), random.choice(DELIVERY_METHODS),
+         now - timedelta(seconds=random.randint(0, 90 * 86400)))
+        for product_id in range(1, count + 1)
+    ]
+
+
+def measure(label, func, repeat=50):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    print(f"{label}: {(time.perf_counter() - start) / repeat * 1000:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=100000, help='판매중 상품 수')
+    args = parser.parse_args()
+
+    rows = make_rows(args.count)
+    snapshot = CatalogSnapshot(lambda: rows)
+    start = time.perf_counter()
+    snapshot.reconcile()
+    metrics = snapshot.metrics()
+    print(f"상품 {args.count}개 구성: {time.perf_counter() - start:.2f}s, "
+          f"메모리 {metrics['memory_bytes'] / 1024 / 1024:.1f}MB "
+          f"(10만 개당 {metrics['bytes_per_100k'] / 1024 / 1024:.1f}MB, 상품명 버퍼 {len(snapshot.titles) / 1024 / 1024:.1f}MB)")
+
+    measure('전체 최신순 1페이지', lambda: snapshot.browse({}, 'latest', 20, 0))
+    measure('카테고리 + 가격 범위 + 가격순', lambda: snapshot.browse(
+        {'category': ['전자기기'], 'min_price': 50000, 'max_price': 150000}, 'price_asc', 20, 0))
+    measure('가격대 2개 + 배송방법 + 5페이지', lambda: snapshot.browse(
+        {'price_bucket': ['10k_50k', '50k_100k'], 'delivery_method': ['우체국 택배']}, 'latest', 20, 80))
+    measure('카테고리별 개수', snapshot.category_counts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/ingest_benchmark.py
+"""지식 베이스 적재(PDF 페이지 추출 + 청크 분할) 병렬 처리 벤치마크
+
+가이드 PDF 내용을 반복한 합성 PDF(기본 500쪽)를 만들어 워커 수별 적재 시간을 측정한다.
+
+사용법:
+    python benchmarks/ingest_benchmark.py --pages 500 --workers 1,2,4,8
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+from knowledge_base import load_knowledge_base
+
+
+def build_corpus(directory, pages, guide_pdf, files=5):
+    """가이드 PDF 텍스트를 반복해서 여러 개의 합성 PDF 생성"""
+    with fitz.open(guide_pdf) as guide:
+        lines = [line for page in guide for line in page.get_text().splitlines() if line.strip()]
+    per_file = max(1, pages // files)
+    written = 0
+    for index in range(files):
+        count = per_file if index < files - 1 else pages - written
+        if count <= 0:
+            break
+        pdf = fitz.open()
+        for page_number in range(count):
+            page = pdf.new_page()
+            y = 60
+            for offset in range(40):
+                line = lines[(page_number + offset) % len(lines)]
+                page.insert_text((40, y), f"{line} ({index}-{page_number})", fontname="korea", fontsize=9)
+                y += 18
+        pdf.save(os.path.join(directory, f"policy_{index}.pdf"))
+        pdf.close()
+        written += count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pdf', default='potato_market_guide.pdf')
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--workers', default='1,2,4')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='kb_bench_')
+    try:
+        build_corpus(directory, args.pages, args.pdf)
+        baseline = None
+        for workers in [int(value) for value in args.workers.split(',')]:
+            start = time.perf_counter()
+            chunks = load_knowledge_base([directory], max_workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers={workers:<3} {elapsed:.2f}s  청크 {len(chunks)}개  속도 향상 x{baseline / elapsed:.2f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/nearby_search.py
+"""내 주변 상품 검색(geo_location)의 후보 수와 조회 시간 측정
+
+도시 주변에 몰리도록 임의로 만든 판매중 상품 N개의 거래 장소를 geohash 순으로 정렬해서
+(is_sold, geohash, 위도, 경도) 인덱스 범위 조회를 흉내 내고, 반경별로
+geohash 접두어 범위 + 사각형 후보 → 정확한 거리 정렬 경로와 전체 거리 계산(풀 스캔)을 비교한다.
+두 경로의 결과가 같은지도 확인한다.
+
+사용법:
+    python benchmarks/nearby_search.py --count 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from bisect import bisect_left
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geo_location import (ZIP_PREFIX_CENTROIDS, bounding_box, covering_prefixes, geohash_encode, haversine_km,
+                          rank_by_distance)
+
+CITY_SPREAD_DEGREES = 0.08  # 도시 중심에서 퍼지는 정도 (약 9km 표준편차)
+
+
+def make_locations(count):
+    centers = [(lat, lng) for lat, lng, _ in ZIP_PREFIX_CENTROIDS.values()]
+    picks = np.random.randint(0, len(centers), count)
+    lats = np.array([centers[i][0] for i in picks]) + np.random.normal(0, CITY_SPREAD_DEGREES, count)
+    lngs = np.array([centers[i][1] for i in picks]) + np.random.normal(0, CITY_SPREAD_DEGREES, count)
+    return lats, lngs
+
+
+def build_index(lats, lngs):
+    """geohash 순으로 정렬한 (geohash 목록, 위도, 경도, PRODUCT_ID) = 인덱스 리프 순서"""
+    hashes = [geohash_encode(lat, lng) for lat, lng in zip(lats.tolist(), lngs.tolist())]
+    order = sorted(range(len(hashes)), key=hashes.__getitem__)
+    return [hashes[i] for i in order], lats[order], lngs[order], np.array(order, dtype=np.int64) + 1
+
+
+def indexed_search(index, lat, lng, radius):
+    hashes, lats, lngs, ids = index
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius)
+    candidates = []
+    scanned = 0
+    for prefix in covering_prefixes(lat, lng, radius):
+        start = bisect_left(hashes, prefix)
+        end = bisect_left(hashes, prefix + '~')  # '~'는 base32 문자보다 뒤
+        scanned += end - start
+        rows = slice(start, end)
+        inside = (lats[rows] >= min_lat) & (lats[rows] <= max_lat) & (lngs[rows] >= min_lng) & (lngs[rows] <= max_lng)
+        candidates.extend(zip(ids[rows][inside].tolist(), lats[rows][inside].tolist(), lngs[rows][inside].tolist()))
+    return rank_by_distance(lat, lng, candidates, radius), scanned, len(candidates)
+
+
+def full_scan(index, lat, lng, radius):
+    _, lats, lngs, ids = index
+    distances = haversine_km(lat, lng, lats, lngs)
+    inside = distances <= radius
+    order = np.lexsort((-ids[inside], distances[inside]))
+    return [int(product_id) for product_id in ids[inside][order]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1000000, help='판매중 상품 수')
+    parser.add_argument('--queries', type=int, default=50, help='반경별 조회 횟수')
+    args = parser.parse_args()
+
+    np.random.seed(0)
+    random.seed(0)
+    lats, lngs = make_locations(args.count)
+    start = time.perf_counter()
+    index = build_index(lats, lngs)
+    print(f"상품 {args.count}개 geohash 인덱스 구성: {time.perf_counter() - start:.1f}s")
+
+    centers = [(lat, lng) for lat, lng, _ in ZIP_PREFIX_CENTROIDS.values()]
+    for radius in (1, 3, 10, 20):
+        points = [(lat + random.uniform(-0.05, 0.05), lng + random.uniform(-0.05, 0.05))
+                  for lat, lng in random.choices(centers, k=args.queries)]
+        indexed_time = scan_time = 0.0
+        scanned = candidates = found = 0
+        for lat, lng in points:
+            start = time.perf_counter()
+            ranked, scanned_rows, candidate_rows = indexed_search(index, lat, lng, radius)
+            indexed_time += time.perf_counter() - start
+            start = time.perf_counter()
+            expected = full_scan(index, lat, lng, radius)
+            scan_time += time.perf_counter() - start
+            assert [product_id for product_id, _ in ranked] == expected, '풀 스캔과 결과가 다릅니다'
+            scanned += scanned_rows
+            candidates += candidate_rows
+            found += len(ranked)
+        print(f"반경 {radius}km: geohash 범위 {scanned / args.queries:.0f}행 → 사각형 후보 {candidates / args.queries:.0f}행 "
+              f"→ 결과 {found / args.queries:.0f}개, {indexed_time / args.queries * 1000:.2f}ms "
+              f"(풀 스캔 {scan_time / args.queries * 1000:.2f}ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/nl_fastpath_coverage.py
+"""자연어 검색 규칙 해석(fast path) 처리 비율과 해석 시간 측정
+
+질의 파일(한 줄에 하나, 예: [NL-SEARCH] user_query 로그에서 추출)을 주면 그 질의로,
+없으면 기본 예시 질의로 규칙으로 처리되는 비율을 출력한다.
+
+사용법:
+    python benchmarks/nl_fastpath_coverage.py --queries queries.txt -v
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_query import build_search_query, parse_search_query
+
+SAMPLE_QUERIES = [
+    '신발 검색', '옷 검색', '노트북 검색', '컴퓨터 검색', '아이폰 검색',
+    '나이키 신발 검색', '나이키 에어포스 검색', '65만원 이하 노트북', '15만원 이하 신발',
+    '만원 이하 옷', '5만원 이하 가방 찾아줘', '10만원대 스마트폰', '5~10만원 태블릿',
+    'CU 택배 노트북', '우체국 택배 옷', '싼 순으로 갤럭시', '30만원 이상 맥북',
+    '겨울에 입을 만한 15만원 이하 옷 검색해줘', '자취방 가구', '캠핑 용품', '아기 장난감',
+    '거의 새거인 닌텐도 스위치', '선물하기 좋은 향수',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', help='질의 파일 (한 줄에 하나)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='질의별 해석 결과 출력')
+    args = parser.parse_args()
+
+    if args.queries:
+        with open(args.queries, encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = SAMPLE_QUERIES
+
+    handled = 0
+    start = time.perf_counter()
+    for query in queries:
+        spec = parse_search_query(query)
+        if spec:
+            handled += 1
+            build_search_query(spec)
+        if args.verbose:
+            print(f"{'FAST' if spec else 'LLM ':4} {query} {spec or ''}")
+    elapsed = time.perf_counter() - start
+
+    print(f"질의 {len(queries)}개 중 규칙 처리 {handled}개 ({handled / len(queries):.1%}), "
+          f"질의당 {elapsed / len(queries) * 1e6:.0f}µs")
+
+
+if __name__ == '__main__':
+    main()
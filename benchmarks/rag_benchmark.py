@@ -0,0 +1,162 @@
+# benchmarks/rag_benchmark.py
+"""PotatoMarketChatbot 오프라인 성능 벤치마크
+
+OpenAI 대신 chatbot_fakes의 결정적 임베딩/채팅 모델을 주입해서
+코퍼스 크기와 동시성별로 다음 항목을 측정한다.
+  - 적재 시간: 청크 분할 + 임베딩 + 벡터 DB 적재
+  - 검색 지연시간 p50/p95/p99
+  - 체인 오버헤드: chat() 지연시간에서 검색 시간과 (가짜) LLM 지연을 뺀 값
+  - 메모리: 적재 중 Python 힙 최대 사용량(tracemalloc), 프로세스 최대 RSS
+
+사용법:
+    python benchmarks/rag_benchmark.py --sizes 10,100,1000 --concurrency 1,8 --queries 200
+"""
+import argparse
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from chatbot_rag import PotatoMarketChatbot, load_guide_chunks
+from chatbot_fakes import fake_chat_model_factory, fake_embedding_factory
+
+QUERIES = [
+    "배송 방법에는 어떤 것들이 있나요?",
+    "상품 등록은 어떻게 하나요?",
+    "돈을 충전하려면 어떻게 해야 하나요?",
+    "질문은 어디에 올리나요?",
+    "관리자는 무엇을 할 수 있나요",
+    "구매하면 잔액에서 빠지나요",
+    "이용약관은 어디서 보나요",
+    "편의점 택배 되나요",
+]
+
+FILLER_TERMS = [
+    "중고", "거래", "택배", "편의점", "충전", "잔액", "게시판", "관리자", "카테고리",
+    "의류", "전자기기", "노트북", "신발", "가방", "직거래", "안전", "환불", "수수료",
+]
+
+
+class SyntheticCorpusChatbot(PotatoMarketChatbot):
+    """가이드 PDF 페이지를 변형해 원하는 쪽수의 코퍼스를 만드는 벤치마크용 챗봇"""
+
+    def __init__(self, pages, seed=0, **kwargs):
+        self.pages = pages
+        self.seed = seed
+        super().__init__(**kwargs)
+
+    def load_chunks(self):
+        rng = random.Random(self.seed)
+        base_pages = [doc.page_content for doc in load_guide_chunks(self.pdf_path, 100000, 0)]
+        documents = []
+        for page in range(self.pages):
+            filler = ' '.join(rng.choice(FILLER_TERMS) for _ in range(120))
+            text = f"{base_pages[page % len(base_pages)]}\n부록 {page}: {filler}"
+            documents.append(Document(page_content=text, metadata={'source': 'synthetic', 'page': page}))
+        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+        return splitter.split_documents(documents)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_size(pages, args):
+    persist_directory = tempfile.mkdtemp(prefix='rag_bench_')
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        chatbot = SyntheticCorpusChatbot(
+            pages,
+            api_key='offline',
+            pdf_path=args.pdf,
+            persist_directory=persist_directory,
+            retrieval_mode=args.retrieval_mode,
+            embedding_factory=fake_embedding_factory(latency=args.embedding_latency_ms / 1000),
+            chat_model_factory=fake_chat_model_factory(latency=args.llm_latency_ms / 1000),
+        )
+        ingest_seconds = time.perf_counter() - start
+        _, peak_heap = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        queries = [QUERIES[i % len(QUERIES)] for i in range(args.queries)]
+
+        retrieval_ms = []
+        for query in queries:
+            t0 = time.perf_counter()
+            chatbot.retriever.invoke(query)
+            retrieval_ms.append((time.perf_counter() - t0) * 1000)
+
+        results = []
+        for concurrency in args.concurrency:
+            chat_ms = []
+
+            def ask(item):
+                index, query = item
+                t0 = time.perf_counter()
+                chatbot.chat(query, session_id=f"bench-{concurrency}-{index}")
+                return (time.perf_counter() - t0) * 1000
+
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                chat_ms.extend(executor.map(ask, enumerate(queries)))
+            elapsed = time.perf_counter() - t0
+            overhead = statistics.median(chat_ms) - statistics.median(retrieval_ms) - args.llm_latency_ms
+            results.append((concurrency, chat_ms, len(queries) / elapsed, overhead))
+
+        return {
+            'chunks': len(chatbot.chunks),
+            'ingest_seconds': ingest_seconds,
+            'peak_heap_mb': peak_heap / 1024 / 1024,
+            'retrieval_ms': retrieval_ms,
+            'chat': results,
+        }
+    finally:
+        shutil.rmtree(persist_directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pdf', default='potato_market_guide.pdf')
+    parser.add_argument('--sizes', default='10,100', help='코퍼스 쪽수 목록 (쉼표 구분)')
+    parser.add_argument('--concurrency', default='1,8', help='동시 요청 수 목록 (쉼표 구분)')
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--retrieval-mode', default='vector', choices=['vector', 'hybrid', 'lexical'])
+    parser.add_argument('--embedding-latency-ms', type=float, default=0.0)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+    args.concurrency = [int(value) for value in args.concurrency.split(',')]
+
+    for pages in [int(value) for value in args.sizes.split(',')]:
+        result = run_size(pages, args)
+        retrieval = result['retrieval_ms']
+        print(f"\n[{pages}쪽 / 청크 {result['chunks']}개 / {args.retrieval_mode}]")
+        print(f"  적재 시간        : {result['ingest_seconds']:.2f}s")
+        print(f"  적재 힙 최대     : {result['peak_heap_mb']:.1f}MB")
+        print(f"  검색 p50/p95/p99 : {percentile(retrieval, 50):.2f} / "
+              f"{percentile(retrieval, 95):.2f} / {percentile(retrieval, 99):.2f} ms")
+        for concurrency, chat_ms, throughput, overhead in result['chat']:
+            print(f"  동시성 {concurrency:>3} chat p50/p95/p99 : {percentile(chat_ms, 50):.2f} / "
+                  f"{percentile(chat_ms, 95):.2f} / {percentile(chat_ms, 99):.2f} ms, "
+                  f"{throughput:.1f} req/s, 체인 오버헤드 {overhead:.2f} ms")
+
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n프로세스 최대 RSS: {max_rss_mb:.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/retrieval_benchmark.py
+"""챗봇 검색 방식(vector / hybrid / lexical)별 관련도와 지연시간 비교
+
+사용법:
+    python benchmarks/retrieval_benchmark.py [--chunk-size 300] [--k 3]
+
+lexical은 오프라인으로 동작한다. vector/hybrid는 open_api_key 환경 변수가 있을 때 측정하며,
+--fake-embeddings를 주면 chatbot_fakes.HashingEmbeddings로 오프라인 측정한다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from chatbot_rag import load_guide_chunks
+from lexical_retriever import BM25Retriever, HybridRetriever, VectorScoreRetriever
+
+# (질문, 정답 청크에 들어 있어야 하는 문구)
+GUIDE_QUESTIONS = [
+    ("배송 방법에는 어떤 것들이 있나요?", "우체국 택배"),
+    ("편의점 택배 되나요", "CU편의점 택배"),
+    ("상품 등록은 어떻게 하나요?", "등록하기 버튼"),
+    ("상품 이미지는 꼭 올려야 하나요", "상품 이미지를 업로드하세요"),
+    ("돈을 충전하려면 어떻게 해야 하나요?", "충전 기능"),
+    ("구매하면 잔액에서 빠지나요", "자동으로 차감"),
+    ("로그인은 무엇으로 하나요", "이메일과 비밀번호"),
+    ("질문은 어디에 올리나요?", "Q&A 게시판"),
+    ("관리자는 무엇을 할 수 있나요", "사용자 목록을 조회"),
+    ("고객센터에 문의하고 싶어요", "고객센터 챗봇"),
+    ("이용약관은 어디서 보나요", "이용약관을 확인"),
+    ("감자마켓은 누가 만들었나요", "안양대학교"),
+    ("감자마켓은 어떤 웹사이트인가요?", "중고 물품"),
+    ("상품을 사려면 어떻게 하나요", "구매하기 버튼"),
+]
+
+
+def evaluate(retriever, k):
+    """hit@k, MRR, 검색 지연시간(ms) 측정"""
+    hits, reciprocal_ranks, latencies = 0, [], []
+    for question, expected in GUIDE_QUESTIONS:
+        start = time.perf_counter()
+        docs = retriever.invoke(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+        rank = next(
+            (i + 1 for i, doc in enumerate(docs[:k]) if expected in doc.page_content),
+            None
+        )
+        if rank:
+            hits += 1
+            reciprocal_ranks.append(1 / rank)
+        else:
+            reciprocal_ranks.append(0.0)
+    latencies.sort()
+    return {
+        'hit@k': hits / len(GUIDE_QUESTIONS),
+        'mrr': sum(reciprocal_ranks) / len(GUIDE_QUESTIONS),
+        'p50_ms': statistics.median(latencies),
+        'max_ms': latencies[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pdf', default='potato_market_guide.pdf')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--chunk-overlap', type=int, default=200)
+    parser.add_argument('--k', type=int, default=3)
+    parser.add_argument('--fake-embeddings', action='store_true', help='OpenAI 대신 해싱 임베딩 사용')
+    args = parser.parse_args()
+
+    load_dotenv()
+    chunks = load_guide_chunks(args.pdf, args.chunk_size, args.chunk_overlap)
+    print(f"청크 수: {len(chunks)} (chunk_size={args.chunk_size}, overlap={args.chunk_overlap})")
+
+    retrievers = {'lexical': BM25Retriever.from_documents(chunks, k=args.k)}
+
+    api_key = os.getenv('open_api_key')
+    if api_key or args.fake_embeddings:
+        from langchain_chroma import Chroma
+        if args.fake_embeddings:
+            from chatbot_fakes import HashingEmbeddings
+            embeddings = HashingEmbeddings()
+        else:
+            from langchain_openai import OpenAIEmbeddings
+            embeddings = OpenAIEmbeddings(api_key=api_key)
+        vector_store = Chroma.from_documents(chunks, embeddings)
+        retrievers['vector'] = VectorScoreRetriever(vector_store=vector_store, k=args.k)
+        retrievers['hybrid'] = HybridRetriever(
+            lexical=retrievers['lexical'], vector_store=vector_store, k=args.k
+        )
+    else:
+        print("open_api_key가 없어 vector/hybrid 측정은 건너뜁니다.")
+
+    print(f"{'mode':<8} {'hit@k':>6} {'mrr':>6} {'p50(ms)':>9} {'max(ms)':>9}")
+    for mode, retriever in retrievers.items():
+        result = evaluate(retriever, args.k)
+        print(f"{mode:<8} {result['hit@k']:>6.2f} {result['mrr']:>6.2f} "
+              f"{result['p50_ms']:>9.2f} {result['max_ms']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
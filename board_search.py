@@ -0,0 +1,112 @@
+# board_search.py
+"""게시판(QNA) 목록 keyset 페이지네이션, FULLTEXT 검색, 활성 게시글 수 캐시
+
+목록은 (created_at, QNA_ID) 내림차순 커서로 다음 페이지를 읽어서 OFFSET만큼 건너뛰는 비용이 없고,
+검색은 QNA(title, question, answer) ngram FULLTEXT 관련도순으로 상품 검색과 같은 '점수:ID' 커서를 쓴다.
+전체 게시글 수는 요청마다 COUNT(*) 하지 않고 캐시해 두고 글 작성/삭제 때 함께 증감한다.
+"""
+import threading
+import time
+from datetime import datetime
+from search_query import build_boolean_query, escape_like, fulltext_score_sql, parse_search_cursor
+
+BOARD_FULLTEXT_COLUMNS = 'q.title, q.question, q.answer'
+BOARD_LIST_COLUMNS = """q.QNA_ID, q.title, q.question, q.view_count,
+               q.created_at, q.updated_at, u.nickname as author"""
+BOARD_SEARCH_LIMIT = 50
+
+
+def format_board_cursor(post):
+    """목록 다음 페이지 커서 ('작성시각:QNA_ID')"""
+    return f"{post['created_at'].isoformat()}:{post['QNA_ID']}"
+
+
+def parse_board_cursor(cursor):
+    """'작성시각:QNA_ID' 커서 해석 (잘못되면 ValueError)"""
+    created_at, post_id = cursor.rsplit(':', 1)
+    return datetime.fromisoformat(created_at), int(post_id)
+
+
+def build_board_list_query(cursor=None, limit=10):
+    """활성 게시글 최신순 목록 SQL (idx_qna_active_created 인덱스 순서대로 읽는다)"""
+    conditions = ['q.is_active = 0']
+    params = []
+    if cursor:
+        created_at, post_id = parse_board_cursor(cursor)
+        conditions.append('(q.created_at < %s OR (q.created_at = %s AND q.QNA_ID < %s))')
+        params.extend([created_at, created_at, post_id])
+    sql = f"""
+        SELECT {BOARD_LIST_COLUMNS}
+        FROM QNA q
+        JOIN USER u ON q.USER_ID = u.USER_ID
+        WHERE {' AND '.join(conditions)}
+        ORDER BY q.created_at DESC, q.QNA_ID DESC
+        LIMIT %s
+    """
+    params.append(limit)
+    return sql, params
+
+
+def build_board_search_query(text, cursor=None, limit=10):
+    """제목/내용/답변 FULLTEXT(ngram) 관련도순 검색 SQL (결과의 score 컬럼이 관련도)"""
+    boolean_query, short_words = build_boolean_query(text)
+    conditions = ['q.is_active = 0']
+    params = []
+    if boolean_query:
+        match_sql = f'MATCH({BOARD_FULLTEXT_COLUMNS}) AGAINST (%s IN BOOLEAN MODE)'
+        score_sql = fulltext_score_sql(match_sql)
+        score_params = [boolean_query]
+        conditions.append(match_sql)
+        params.extend(score_params)
+    else:
+        score_sql, score_params = '0', []
+    for word in short_words:
+        # 한 글자 단어는 ngram 색인에 없으므로 제목에서 찾는다
+        conditions.append('q.title LIKE %s')
+        params.append(f'%{escape_like(word)}%')
+    if cursor:
+        last_score, last_id = parse_search_cursor(cursor)
+        conditions.append(f'({score_sql} < %s OR ({score_sql} = %s AND q.QNA_ID < %s))')
+        params.extend(score_params + [last_score] + score_params + [last_score, last_id])
+    sql = f"""
+        SELECT {BOARD_LIST_COLUMNS}, {score_sql} AS score
+        FROM QNA q
+        JOIN USER u ON q.USER_ID = u.USER_ID
+        WHERE {' AND '.join(conditions)}
+        ORDER BY score DESC, q.QNA_ID DESC
+        LIMIT %s
+    """
+    return sql, score_params + params + [limit]
+
+
+class ActivePostCount:
+    """활성 게시글 수 캐시 (글 작성/삭제 때 증감, ttl마다 COUNT(*)로 다시 맞춘다)"""
+
+    def __init__(self, loader, ttl=300):
+        self.loader = loader  # () -> 활성 게시글 수
+        self.ttl = ttl  # 초 (다른 워커의 작성/삭제가 반영되는 최대 시간)
+        self._count = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'reloads': 0}
+
+    def get(self):
+        with self._lock:
+            if self._count is not None and time.time() - self._loaded_at <= self.ttl:
+                self.stats['hits'] += 1
+                return self._count
+        count = self.loader()
+        with self._lock:
+            self._count = count
+            self._loaded_at = time.time()
+            self.stats['reloads'] += 1
+            return count
+
+    def adjust(self, delta):
+        with self._lock:
+            if self._count is not None:
+                self._count = max(self._count + delta, 0)
+
+    def metrics(self):
+        with self._lock:
+            return dict(self.stats, count=self._count)
@@ -0,0 +1,312 @@
+# catalog_snapshot.py
+"""판매중 상품 목록의 메모리 내 열 기반(columnar) 스냅샷
+
+익명 방문자의 상품 목록/카테고리 수 조회는 판매중(is_sold = 0) 상품이라는 작은 집합만 본다.
+이 집합을 열별 NumPy 배열(PRODUCT_ID, 가격, 카테고리/배송방법/가격대 코드, 등록 시각)과
+상품명을 이어 붙인 UTF-8 버퍼(+ 시작 위치/길이)로 들고 있다가 필터/정렬/개수 계산을
+벡터 연산으로 처리해서 MySQL을 거치지 않고 응답한다.
+
+상품 등록/판매/삭제 이벤트로 바로 갱신하고(판매/삭제는 행을 지우지 않고 alive만 끈다),
+다른 워커의 변경과 지워진 행의 공간은 reconcile_interval마다 DB에서 다시 읽어 정리한다.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from product_facets import PRICE_BUCKETS, price_bucket
+
+EPOCH = datetime(1970, 1, 1)  # DB의 TIMESTAMP 값(naive)을 그대로 초 단위로 저장
+PRICE_BUCKET_CODES = {bucket[0]: code for code, bucket in enumerate(PRICE_BUCKETS)}
+INITIAL_CAPACITY = 1024
+CREATED_BITS = 31  # 최신순 정렬 키 = 등록 시각 << 31 | PRODUCT_ID
+LOW_32_BITS = (1 << 32) - 1  # 가격순 정렬 키 = 가격 << 32 | 등록 시각(하위 32비트)
+
+
+def to_epoch(value):
+    if isinstance(value, datetime):
+        return int((value - EPOCH).total_seconds())
+    return int(value or 0)
+
+
+def from_epoch(seconds):
+    return (EPOCH + timedelta(seconds=int(seconds))).isoformat()
+
+
+class CodeBook:
+    """문자열 ↔ 작은 정수 코드 (카테고리, 배송방법)"""
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        value = value or ''
+        if value not in self.codes:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+        return self.codes[value]
+
+
+class CatalogSnapshot:
+    COLUMNS = (
+        ('ids', np.int64), ('prices', np.int64), ('created', np.int64),
+        ('categories', np.int16), ('deliveries', np.int16), ('buckets', np.int8),
+        ('title_starts', np.int64), ('title_lengths', np.int32), ('alive', np.bool_),
+    )
+
+    def __init__(self, loader, reconcile_interval=600):
+        self.loader = loader  # () -> [(PRODUCT_ID, 상품명, 가격, 카테고리, 배송방법, 등록 시각)] 판매중 상품 전체
+        self.reconcile_interval = reconcile_interval  # 초
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pending = None  # 재구성 중에 들어온 변경 (재구성 뒤 다시 적용)
+        self.ready = False
+        self.built_at = None
+        self.stats = {'queries': 0, 'appended': 0, 'removed': 0, 'reconciles': 0, 'reconcile_seconds': 0.0}
+        self._reset(INITIAL_CAPACITY)
+
+    # 저장 구조
+    def _reset(self, capacity):
+        for name, dtype in self.COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.titles = bytearray()
+        self.category_book = CodeBook()
+        self.delivery_book = CodeBook()
+        self.size = 0  # 사용 중인 행 수 (지워진 행 포함)
+        self.live = 0  # 판매중 행 수
+        self.sorted = True  # ids[:size]가 오름차순인지 (PRODUCT_ID로 행을 찾을 때 이분 탐색)
+
+    def _grow(self, needed):
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, _ in self.COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def _append(self, product_id, title, price, category, delivery_method, created):
+        self._grow(self.size + 1)
+        row = self.size
+        if row and self.ids[row - 1] >= product_id:
+            self.sorted = False
+        encoded = (title or '').encode('utf-8')
+        self.ids[row] = product_id
+        self.prices[row] = price or 0
+        self.created[row] = to_epoch(created)
+        self.categories[row] = self.category_book.code(category or '기타')
+        self.deliveries[row] = self.delivery_book.code(delivery_method)
+        self.buckets[row] = PRICE_BUCKET_CODES[price_bucket(price)]
+        self.title_starts[row] = len(self.titles)
+        self.title_lengths[row] = len(encoded)
+        self.alive[row] = True
+        self.titles.extend(encoded)
+        self.size += 1
+        self.live += 1
+
+    def _sort_rows(self):
+        order = np.argsort(self.ids[:self.size], kind='stable')
+        for name, _ in self.COLUMNS:
+            column = getattr(self, name)
+            column[:self.size] = column[:self.size][order]
+        self.sorted = True
+
+    def _find(self, product_id):
+        if not self.sorted:
+            self._sort_rows()
+        row = int(np.searchsorted(self.ids[:self.size], product_id))
+        if row < self.size and self.ids[row] == product_id:
+            return row
+        return None
+
+    def _apply(self, change):
+        if change[0] == 'add':
+            product = change[1]
+            row = self._find(product['id'])
+            if row is None:
+                self._append(product['id'], product.get('title'), product.get('price'), product.get('category'),
+                             product.get('delivery_method'), product.get('created_at') or datetime.now())
+                self.stats['appended'] += 1
+            elif not self.alive[row]:
+                self.alive[row] = True
+                self.live += 1
+        else:
+            row = self._find(change[1])
+            if row is not None and self.alive[row]:
+                self.alive[row] = False
+                self.live -= 1
+                self.stats['removed'] += 1
+        if self._pending is not None:
+            self._pending.append(change)
+
+    # 이벤트/재구성
+    def handle_event(self, event, product):
+        """product_events 구독 함수"""
+        with self._lock:
+            if event == 'created':
+                self._apply(('add', product))
+            else:
+                self._apply(('remove', product['id']))
+
+    def reconcile(self):
+        """DB의 판매중 상품으로 스냅샷을 새로 만든다 (지워진 행 공간도 정리)"""
+        start = time.perf_counter()
+        with self._lock:
+            self._pending = []
+        try:
+            rows = self.loader()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        fresh = CatalogSnapshot(self.loader)
+        fresh._reset(max(INITIAL_CAPACITY, len(rows)))
+        for product_id, title, price, category, delivery_method, created in rows:
+            fresh._append(product_id, title, price, category, delivery_method, created)
+        if not fresh.sorted:
+            fresh._sort_rows()
+
+        with self._lock:
+            pending, self._pending = self._pending, None
+            for name, _ in self.COLUMNS:
+                setattr(self, name, getattr(fresh, name))
+            self.titles = fresh.titles
+            self.category_book = fresh.category_book
+            self.delivery_book = fresh.delivery_book
+            self.size, self.live, self.sorted = fresh.size, fresh.live, fresh.sorted
+            for change in pending:
+                self._apply(change)
+            self.ready = True
+            self.built_at = time.time()
+            self.stats['reconciles'] += 1
+            self.stats['reconcile_seconds'] = round(time.perf_counter() - start, 3)
+
+    def start(self):
+        """백그라운드 재구성 스레드 시작 (첫 재구성이 끝나야 ready)"""
+        # gunicorn이 fork한 뒤 워커 프로세스에서 스레드를 만들도록 처음 사용할 때 호출
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='catalog-snapshot', daemon=True)
+                self._worker.start()
+        return self.ready
+
+    def _run(self):
+        while True:
+            try:
+                self.reconcile()
+            except Exception as e:
+                print(f"상품 목록 스냅샷 재구성 오류: {e}")
+            time.sleep(self.reconcile_interval)
+
+    # 조회 (self._lock 안에서만 배열을 읽는다)
+    def _masks(self, filters):
+        """차원별 필터 마스크 (필터가 없는 차원은 None)"""
+        size = self.size
+        masks = {}
+        for dimension, column, book in (('category', self.categories, self.category_book),
+                                        ('delivery_method', self.deliveries, self.delivery_book)):
+            values = filters.get(dimension)
+            if values:
+                codes = [book.codes[value] for value in values if value in book.codes]
+                masks[dimension] = np.isin(column[:size], codes)
+        if filters.get('price_bucket'):
+            codes = [PRICE_BUCKET_CODES[key] for key in filters['price_bucket'] if key in PRICE_BUCKET_CODES]
+            masks['price_bucket'] = np.isin(self.buckets[:size], codes)
+        if filters.get('min_price') is not None:
+            masks['min_price'] = self.prices[:size] >= filters['min_price']
+        if filters.get('max_price') is not None:
+            masks['max_price'] = self.prices[:size] <= filters['max_price']
+        return masks
+
+    def _combine(self, masks, skip=None):
+        mask = self.alive[:self.size].copy()
+        for dimension, dimension_mask in masks.items():
+            if dimension != skip:
+                mask &= dimension_mask
+        return mask
+
+    def _sort_key(self, rows, sort):
+        created = self.created[rows]
+        if sort == 'price_asc':  # 가격 오름차순, 같은 가격이면 최신순
+            return (self.prices[rows] << 32) | (LOW_32_BITS - (created & LOW_32_BITS))
+        if sort == 'price_desc':
+            return -((self.prices[rows] << 32) | (created & LOW_32_BITS))
+        return -((created << CREATED_BITS) | self.ids[rows])  # 최신순
+
+    def _row(self, row):
+        start = int(self.title_starts[row])
+        return {
+            'id': int(self.ids[row]),
+            'title': bytes(self.titles[start:start + int(self.title_lengths[row])]).decode('utf-8') or '상품명 없음',
+            'price': int(self.prices[row]),
+            'category': self.category_book.values[self.categories[row]] or '기타',
+            'delivery_method': self.delivery_book.values[self.deliveries[row]] or '배송 정보 없음',
+            'created_at': from_epoch(self.created[row]),
+            'is_sold': False
+        }
+
+    def browse(self, filters, sort='latest', limit=20, offset=0):
+        """(전체 개수, 해당 페이지 상품 dict 목록, 차원별 값 → 상품 수)
+
+        filters: category / delivery_method / price_bucket (값 목록), min_price / max_price.
+        상품 수는 product_facets.compute_facets와 같이 해당 차원만 뺀 필터로 센다.
+        """
+        with self._lock:
+            self.stats['queries'] += 1
+            masks = self._masks(filters)
+            matched = np.flatnonzero(self._combine(masks))
+            total = len(matched)
+
+            # 필요한 만큼(offset + limit)만 부분 정렬
+            wanted = min(offset + limit, total)
+            rows = []
+            if offset < total:
+                keys = self._sort_key(matched, sort)
+                if wanted < total:
+                    top = np.argpartition(keys, wanted - 1)[:wanted]
+                else:
+                    top = np.arange(total)
+                top = top[np.argsort(keys[top], kind='stable')]
+                rows = [self._row(row) for row in matched[top[offset:wanted]]]
+
+            facets = {}
+            for dimension, column, names in (
+                ('category', self.categories, self.category_book.values),
+                ('delivery_method', self.deliveries, self.delivery_book.values),
+                ('price_bucket', self.buckets, [bucket[0] for bucket in PRICE_BUCKETS]),
+            ):
+                counts = np.bincount(column[:self.size][self._combine(masks, skip=dimension)],
+                                     minlength=len(names))
+                facets[dimension] = {names[code]: int(count) for code, count in enumerate(counts) if count}
+            return total, rows, facets
+
+    def category_counts(self):
+        """판매중 상품의 카테고리별 개수"""
+        with self._lock:
+            self.stats['queries'] += 1
+            counts = np.bincount(self.categories[:self.size][self.alive[:self.size]],
+                                 minlength=len(self.category_book.values))
+            return {self.category_book.values[code]: int(count) for code, count in enumerate(counts) if count}
+
+    def memory_bytes(self):
+        """배열(할당된 용량 전체) + 상품명 버퍼 바이트 수"""
+        return sum(getattr(self, name).nbytes for name, _ in self.COLUMNS) + len(self.titles)
+
+    def metrics(self):
+        with self._lock:
+            memory = self.memory_bytes()
+            return dict(
+                self.stats,
+                ready=self.ready,
+                rows=self.size,
+                live=self.live,
+                memory_bytes=memory,
+                bytes_per_100k=int(memory / self.live * 100000) if self.live else 0,
+                built_at=self.built_at,
+            )
@@ -0,0 +1,210 @@
+# chat_history_store.py
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+# 챗봇 대화 기록 테이블 (MySQL / SQLite 공용 이름)
+CHATBOT_HISTORY_TABLE = "CHATBOT_MESSAGE"
+
+# 세션 초기화 표시 행. 다른 워커의 캐시도 이 행을 읽으면 비워진다.
+CLEAR_MARKER = "__clear__"
+
+MYSQL_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {CHATBOT_HISTORY_TABLE} (
+    MESSAGE_ID BIGINT AUTO_INCREMENT PRIMARY KEY,
+    SESSION_ID VARCHAR(255) NOT NULL,
+    message TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_chatbot_message_session (SESSION_ID, MESSAGE_ID)
+)
+"""
+
+SQLITE_SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {CHATBOT_HISTORY_TABLE} (
+        MESSAGE_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        SESSION_ID TEXT NOT NULL,
+        message TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS idx_chatbot_message_session
+    ON {CHATBOT_HISTORY_TABLE} (SESSION_ID, MESSAGE_ID)
+    """,
+]
+
+
+class ChatHistoryStore:
+    """여러 워커가 공유하는 챗봇 대화 기록 저장소
+
+    connection_factory는 DB-API 커넥션을 반환하는 함수이며, 요청마다 새 커넥션을 열고 닫는다.
+    세션별로 읽은 메시지와 마지막 MESSAGE_ID를 캐시해 두고, 이후에는 새로 추가된 행만 읽는다.
+    캐시는 최근에 쓴 max_sessions개 세션만 LRU로 유지하고 ttl 동안 쓰지 않은 세션은 버린다
+    (버린 세션은 다음 요청 때 DB에서 최근 max_messages개를 다시 읽는다).
+    """
+
+    def __init__(self, connection_factory, placeholder="%s", max_messages=20, schema=None,
+                 max_sessions=1000, ttl=3600):
+        self.connection_factory = connection_factory
+        self.placeholder = placeholder
+        self.max_messages = max_messages  # 세션당 프롬프트에 사용할 최근 메시지 수
+        self.max_sessions = max_sessions  # 캐시할 세션 수
+        self.ttl = ttl  # 초 (마지막 사용 이후)
+        self._cache = OrderedDict()  # session_id -> {'messages': [...], 'last_id': int, 'used_at': float}
+        self._lock = threading.Lock()
+        if schema:
+            self.ensure_schema(schema)
+
+    @classmethod
+    def for_mysql(cls, connection_factory, **kwargs):
+        """MySQL 기반 저장소 생성"""
+        return cls(connection_factory, placeholder="%s", schema=[MYSQL_SCHEMA], **kwargs)
+
+    @classmethod
+    def for_sqlite(cls, db_path, **kwargs):
+        """로컬/테스트용 SQLite 기반 저장소 생성"""
+        def connect():
+            return sqlite3.connect(db_path, timeout=10)
+        return cls(connect, placeholder="?", schema=SQLITE_SCHEMA, **kwargs)
+
+    def ensure_schema(self, statements):
+        """대화 기록 테이블이 없으면 생성"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = self.connection_factory()
+        if conn is None:
+            raise RuntimeError("대화 기록 저장소에 연결할 수 없습니다.")
+        return conn
+
+    def get_history(self, session_id):
+        """세션별 BaseChatMessageHistory 반환"""
+        return StoredChatMessageHistory(self, str(session_id))
+
+    def load_messages(self, session_id):
+        """캐시에 없는 새 메시지만 읽어서 세션 대화 기록 반환"""
+        with self._lock:
+            entry = self._cache.get(session_id)
+            if entry and time.time() - entry['used_at'] > self.ttl:
+                del self._cache[session_id]
+                entry = None
+            last_id = entry['last_id'] if entry else None
+
+        p = self.placeholder
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            if last_id is None:
+                # 처음 읽는 세션은 최근 max_messages개만 가져온다
+                cursor.execute(f"""
+                    SELECT MESSAGE_ID, message FROM {CHATBOT_HISTORY_TABLE}
+                    WHERE SESSION_ID = {p}
+                    ORDER BY MESSAGE_ID DESC
+                    LIMIT {p}
+                """, (session_id, self.max_messages))
+                rows = list(reversed(cursor.fetchall()))
+            else:
+                cursor.execute(f"""
+                    SELECT MESSAGE_ID, message FROM {CHATBOT_HISTORY_TABLE}
+                    WHERE SESSION_ID = {p} AND MESSAGE_ID > {p}
+                    ORDER BY MESSAGE_ID ASC
+                """, (session_id, last_id))
+                rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            conn.close()
+
+        with self._lock:
+            # 읽는 동안 다른 스레드가 캐시에서 뺐더라도 이어 읽은 항목은 그대로 다시 넣는다
+            entry = self._cache.get(session_id) or entry or {'messages': [], 'last_id': 0}
+            entry['used_at'] = time.time()
+            self._cache[session_id] = entry
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.max_sessions:
+                self._cache.popitem(last=False)
+            for message_id, payload in rows:
+                if message_id <= entry['last_id']:
+                    continue  # 다른 스레드가 이미 반영한 행
+                if payload == CLEAR_MARKER:
+                    # 다른 워커에서 세션이 초기화된 경우
+                    entry['messages'] = []
+                else:
+                    entry['messages'].extend(messages_from_dict([json.loads(payload)]))
+                entry['last_id'] = message_id
+            if len(entry['messages']) > self.max_messages:
+                entry['messages'] = entry['messages'][-self.max_messages:]
+            return list(entry['messages'])
+
+    def append_messages(self, session_id, messages):
+        """한 턴의 메시지를 한 번의 배치 INSERT로 저장"""
+        if not messages:
+            return
+        p = self.placeholder
+        rows = [
+            (session_id, json.dumps(message_to_dict(message), ensure_ascii=False))
+            for message in messages
+        ]
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(f"""
+                INSERT INTO {CHATBOT_HISTORY_TABLE} (SESSION_ID, message)
+                VALUES ({p}, {p})
+            """, rows)
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+
+    def clear_session(self, session_id):
+        """세션 대화 기록 삭제"""
+        p = self.placeholder
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"DELETE FROM {CHATBOT_HISTORY_TABLE} WHERE SESSION_ID = {p}",
+                (session_id,)
+            )
+            cursor.execute(f"""
+                INSERT INTO {CHATBOT_HISTORY_TABLE} (SESSION_ID, message)
+                VALUES ({p}, {p})
+            """, (session_id, CLEAR_MARKER))
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+
+class StoredChatMessageHistory(BaseChatMessageHistory):
+    """ChatHistoryStore에 저장되는 세션 대화 기록"""
+
+    def __init__(self, store, session_id):
+        self.store = store
+        self.session_id = session_id
+
+    @property
+    def messages(self):
+        return self.store.load_messages(self.session_id)
+
+    def add_messages(self, messages):
+        # RunnableWithMessageHistory는 질문과 답변을 한 번에 넘기므로 턴당 INSERT 한 번
+        self.store.append_messages(self.session_id, list(messages))
+
+    def clear(self):
+        self.store.clear_session(self.session_id)
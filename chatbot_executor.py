@@ -0,0 +1,135 @@
+# chatbot_executor.py
+"""챗봇 호출 전용 실행기
+
+LLM 응답 지연이 웹 워커 스레드를 모두 점유하지 않도록
+  - 동시에 실행되는 챗봇 호출 수를 max_in_flight로 제한하고
+  - 대기 요청 수(max_waiting)와 대기 시간(queue_timeout)을 넘으면 바로 거절하며
+  - 대화 기록이 없는 세션의 같은 질문은 하나의 LLM 호출로 합친다(single-flight).
+"""
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from chatbot_rag import ERROR_MESSAGE, NOT_READY_MESSAGE
+
+
+class ChatbotBusyError(Exception):
+    """챗봇 호출 한도를 넘어 요청을 거절한 경우"""
+
+
+class ChatbotTimeoutError(Exception):
+    """챗봇 응답이 response_timeout 안에 오지 않은 경우"""
+
+
+def normalize_question(question):
+    """공백/대소문자/문장부호 차이를 무시한 질문 키"""
+    return re.sub(r'[\s?!.~]+', ' ', question.lower()).strip()
+
+
+class ChatbotExecutor:
+    def __init__(self, chatbot_getter, max_in_flight=4, max_waiting=16, queue_timeout=3.0,
+                 response_timeout=60.0):
+        self.chatbot_getter = chatbot_getter  # 현재 챗봇 인스턴스를 반환하는 함수
+        self.max_in_flight = max_in_flight
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+        self.response_timeout = response_timeout
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._inflight = {}  # 정규화된 질문 -> Future (대화 기록 없는 질문만)
+        self._executor = None
+        self.stats = {'accepted': 0, 'coalesced': 0, 'rejected': 0, 'timeouts': 0}
+
+    def _get_executor(self):
+        # gunicorn이 fork한 뒤 워커 프로세스에서 스레드를 만들도록 처음 사용할 때 생성
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_in_flight, thread_name_prefix='chatbot'
+                )
+            return self._executor
+
+    def _acquire_slot(self):
+        """실행 슬롯 확보. 대기열이 가득 찼거나 queue_timeout 안에 못 얻으면 ChatbotBusyError"""
+        with self._lock:
+            if self._waiting >= self.max_waiting:
+                self.stats['rejected'] += 1
+                raise ChatbotBusyError()
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        if not acquired:
+            with self._lock:
+                self.stats['rejected'] += 1
+            raise ChatbotBusyError()
+        with self._lock:
+            self.stats['accepted'] += 1
+
+    def _submit(self, fn, *args):
+        """슬롯을 확보한 뒤 실행기에 작업 제출. 슬롯은 작업이 끝날 때 반환된다."""
+        self._acquire_slot()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _wait(self, future):
+        try:
+            return future.result(timeout=self.response_timeout)
+        except TimeoutError:
+            with self._lock:
+                self.stats['timeouts'] += 1
+            raise ChatbotTimeoutError()
+
+    def chat(self, question, session_id="default"):
+        """챗봇 응답 반환 (ChatbotBusyError / ChatbotTimeoutError 발생 가능)"""
+        chatbot = self.chatbot_getter()
+        if not chatbot.chain:
+            return NOT_READY_MESSAGE
+        if chatbot.has_history(session_id):
+            return self._wait(self._submit(chatbot.chat, question, session_id))
+
+        # 대화 기록이 없는 세션: 같은 질문이 이미 실행 중이면 그 결과를 함께 사용
+        key = normalize_question(question)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.stats['coalesced'] += 1
+
+        if leader:
+            try:
+                task = self._submit(chatbot.answer_with_stats, question)
+            except BaseException as e:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                future.set_exception(e)
+                raise
+
+            def finish(task):
+                with self._lock:
+                    self._inflight.pop(key, None)
+                if task.exception() is not None:
+                    future.set_exception(task.exception())
+                else:
+                    future.set_result(task.result())
+            task.add_done_callback(finish)
+
+        try:
+            answer, prompt_stats = self._wait(future)
+        except (ChatbotBusyError, ChatbotTimeoutError):
+            raise
+        except Exception as e:
+            print(f"챗봇 응답 오류: {e}")
+            return ERROR_MESSAGE
+        chatbot.record_turn(session_id, question, answer, prompt_stats)
+        return answer
@@ -0,0 +1,71 @@
+# chatbot_fakes.py
+"""OpenAI 호출 없이 챗봇을 실행하기 위한 결정적(deterministic) 임베딩/채팅 모델
+
+벤치마크와 로컬 개발에서 PotatoMarketChatbot의 embedding_factory, chat_model_factory로 주입해 사용한다.
+"""
+import hashlib
+import math
+import time
+from typing import Any, List, Optional
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import SimpleChatModel
+from lexical_retriever import tokenize_korean
+
+
+class HashingEmbeddings(Embeddings):
+    """토큰 해싱 기반 임베딩
+
+    같은 텍스트는 항상 같은 벡터가 되고, 토큰이 겹치는 텍스트끼리 유사도가 높아서
+    무작위 벡터와 달리 검색 품질 비교에도 쓸 수 있다.
+    """
+
+    def __init__(self, size=256, latency=0.0):
+        self.size = size
+        self.latency = latency  # 원격 임베딩 API 지연 흉내 (초)
+
+    def _embed(self, text):
+        vector = [0.0] * self.size
+        for token in tokenize_korean(text):
+            digest = hashlib.md5(token.encode('utf-8')).digest()
+            index = int.from_bytes(digest[:4], 'little') % self.size
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[index] += sign
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts):
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+
+class EchoChatModel(SimpleChatModel):
+    """질문과 컨텍스트 길이를 그대로 돌려주는 채팅 모델"""
+
+    latency: float = 0.0  # LLM 응답 지연 흉내 (초)
+
+    @property
+    def _llm_type(self):
+        return "potato-echo-chat-model"
+
+    def _call(self, messages: List[Any], stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        system = messages[0].content if messages else ''
+        question = messages[-1].content if messages else ''
+        return f"[fake] 질문: {question} (프롬프트 {len(system)}자, 메시지 {len(messages)}개)"
+
+
+def fake_embedding_factory(size=256, latency=0.0):
+    """PotatoMarketChatbot(embedding_factory=...)에 넘길 팩토리 생성"""
+    return lambda api_key: HashingEmbeddings(size=size, latency=latency)
+
+
+def fake_chat_model_factory(latency=0.0):
+    """PotatoMarketChatbot(chat_model_factory=...)에 넘길 팩토리 생성"""
+    return lambda api_key: EchoChatModel(latency=latency)
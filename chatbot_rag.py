@@ -1,52 +1,116 @@
 # chatbot_rag.py
-import os
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import threading
+from collections import OrderedDict
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_chroma import Chroma
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough, RunnableWithMessageHistory
+from langchain_core.runnables import RunnableLambda, RunnableWithMessageHistory
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.chat_history import InMemoryChatMessageHistory
+from lexical_retriever import BM25Retriever, HybridRetriever, VectorScoreRetriever
+from knowledge_base import collect_sources, format_citation, load_knowledge_base
+from vector_index import MmapVectorStore
+from context_budget import assemble_context, count_tokens
+
+# 챗봇 안내 메시지
+NOT_READY_MESSAGE = "죄송합니다. 챗봇이 준비되지 않았습니다. 잠시 후 다시 시도해주세요."
+ERROR_MESSAGE = "죄송합니다. 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+
+# 검색 방식: vector(임베딩 검색), hybrid(BM25 + 임베딩), lexical(BM25만, 임베딩 API 호출 없음)
+RETRIEVAL_MODES = ('vector', 'hybrid', 'lexical')
+
+# 프롬프트 토큰 예산 (시스템 프롬프트 + 컨텍스트 + 대화 기록 + 질문)
+PROMPT_TOKEN_BUDGET = 2500
+RETRIEVAL_K = 5  # 예산 안에서 점수순으로 골라 쓰도록 후보 청크를 넉넉히 검색
+PROMPT_STATS_SIZE = 1000  # 세션별 마지막 프롬프트 토큰 통계 보관 수
+
+def load_guide_chunks(pdf_path, chunk_size=1000, chunk_overlap=200):
+    """PDF 문서를 로드하고 청크로 분할"""
+    return load_knowledge_base([pdf_path], chunk_size, chunk_overlap, max_workers=1)
+
+def default_embedding_factory(api_key):
+    """기본 임베딩 모델 (OpenAI)"""
+    return OpenAIEmbeddings(api_key=api_key)
+
+def default_chat_model_factory(api_key):
+    """기본 채팅 모델 (OpenAI gpt-4o-mini)"""
+    return ChatOpenAI(
+        model_name="gpt-4o-mini", 
+        temperature=0, 
+        api_key=api_key
+    )
 
 class PotatoMarketChatbot:
-    def __init__(self, api_key, pdf_path=None, persist_directory=None):
+    def __init__(self, api_key, pdf_path=None, persist_directory=None, history_store=None,
+                 retrieval_mode="vector", embedding_factory=None, chat_model_factory=None,
+                 knowledge_dir=None, index_mode="build", index_dir=None,
+                 prompt_token_budget=PROMPT_TOKEN_BUDGET):
         self.api_key = api_key
+        # 모델 팩토리 (api_key -> 모델). 벤치마크/테스트에서는 chatbot_fakes의 팩토리를 주입
+        self.embedding_factory = embedding_factory or default_embedding_factory
+        self.chat_model_factory = chat_model_factory or default_chat_model_factory
         self.pdf_path = pdf_path or "potato_market_guide.pdf"  # 기본 PDF 파일 경로
+        self.knowledge_dir = knowledge_dir  # 추가 정책 문서(PDF/마크다운) 디렉터리
         self.persist_directory = persist_directory or "vector_db"
+        # build: 시작할 때 문서를 임베딩해서 Chroma에 적재
+        # readonly: 'flask ingest-guide'로 미리 만든 인덱스를 메모리 매핑으로 열기 (워커 간 공유)
+        self.index_mode = index_mode
+        self.index_dir = index_dir or "vector_index"
         self.vector_store = None
+        self.chunks = []  # BM25 검색기에 사용하는 분할된 청크
+        self.retriever = None
+        self.retrieval_mode = retrieval_mode
+        self.chain = None  # 대화 기록 없이 실행하는 체인
         self.chain_with_memory = None
-        self.chat_histories = {}  # 세션별 대화 기록 저장
+        self.chat_histories = {}  # 세션별 대화 기록 저장 (history_store가 없을 때)
+        self.history_store = history_store  # 워커 간 공유 대화 기록 저장소 (ChatHistoryStore)
+        self.prompt_token_budget = prompt_token_budget
+        self.system_prompt_tokens = 0
+        self.prompt_stats = OrderedDict()  # 세션별 마지막 요청의 프롬프트 토큰 통계
+        self._stats_lock = threading.Lock()  # ChatbotExecutor 스레드들이 함께 갱신
+        self._local = threading.local()  # 요청 스레드별 프롬프트 통계 전달용
         
         # 벡터 DB 초기화
         self.initialize_vector_db()
         
         # 챗봇 체인 초기화
-        self.initialize_chatbot_chain()
+        self.initialize_chatbot_chain(retrieval_mode)
+    
+    def knowledge_paths(self):
+        """지식 베이스로 적재할 파일/디렉터리 목록"""
+        return [self.pdf_path, self.knowledge_dir]
+    
+    def load_chunks(self):
+        """벡터 DB에 적재할 청크 로드 (PDF 페이지 추출/분할은 프로세스 풀에서 병렬 처리)"""
+        return load_knowledge_base(self.knowledge_paths())
     
     def initialize_vector_db(self):
         """벡터 데이터베이스 초기화"""
         try:
-            # PDF 파일이 존재하는지 확인
-            if not os.path.exists(self.pdf_path):
+            if self.index_mode == "readonly":
+                # 미리 만든 인덱스 열기 (문서 로드/임베딩 없음)
+                self.vector_store = MmapVectorStore.open_current(
+                    self.index_dir, self.embedding_factory(self.api_key)
+                )
+                self.chunks = self.vector_store.documents
+                print(f"읽기 전용 벡터 인덱스: {self.vector_store.manifest['version']} "
+                      f"(문서의 수: {len(self.chunks)})")
+                return
+            
+            # 지식 베이스 문서가 존재하는지 확인
+            if not collect_sources(self.knowledge_paths()):
                 print(f"PDF 파일을 찾을 수 없습니다: {self.pdf_path}")
                 raise FileNotFoundError(f"PDF 파일을 찾을 수 없습니다: {self.pdf_path}")
             
             # 문서 로드 및 텍스트 분할
-            loader = PyPDFLoader(self.pdf_path)
-            documents = loader.load()
-            
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000, 
-                chunk_overlap=200
-            )
-            chunks = text_splitter.split_documents(documents)
+            chunks = self.load_chunks()
+            self.chunks = chunks
             print(f"분할된 청크 수: {len(chunks)}")
             
             # 임베딩 생성과 DB 적재
-            embedding_function = OpenAIEmbeddings(api_key=self.api_key)
+            embedding_function = self.embedding_factory(self.api_key)
             
             self.vector_store = Chroma.from_documents(
                 documents=chunks,
@@ -60,11 +124,24 @@ class PotatoMarketChatbot:
             raise e
     
     
-    def initialize_chatbot_chain(self):
+    def create_retriever(self, retrieval_mode, k=RETRIEVAL_K):
+        """검색 방식에 맞는 검색기 생성"""
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"지원하지 않는 검색 방식입니다: {retrieval_mode}")
+        if retrieval_mode == 'vector':
+            return VectorScoreRetriever(vector_store=self.vector_store, k=k)
+        lexical = BM25Retriever.from_documents(self.chunks, k=k)
+        if retrieval_mode == 'lexical':
+            return lexical
+        return HybridRetriever(lexical=lexical, vector_store=self.vector_store, k=k)
+
+    def initialize_chatbot_chain(self, retrieval_mode=None):
         """챗봇 체인 초기화"""
         try:
             # 검색기 생성
-            retriever = self.vector_store.as_retriever(search_kwargs={"k": 3})
+            self.retrieval_mode = retrieval_mode or self.retrieval_mode
+            retriever = self.create_retriever(self.retrieval_mode)
+            self.retriever = retriever
             
             # 프롬프트 템플릿 설정
             template = """당신은 감자마켓 고객센터 전문가입니다. 
@@ -77,6 +154,7 @@ class PotatoMarketChatbot:
             - 모르는 내용은 솔직히 모른다고 말하세요
             - 친근하고 도움이 되는 톤으로 답변하세요
             - 구체적인 단계별 안내를 제공하세요
+            - 참고한 정책 문서가 있으면 [출처]의 문서명과 페이지를 함께 알려주세요
 
             예시1
             Q: 배고파
@@ -99,26 +177,20 @@ class PotatoMarketChatbot:
             ])
             
             # 모델 설정
-            model = ChatOpenAI(
-                model_name="gpt-4o-mini", 
-                temperature=0, 
-                api_key=self.api_key
-            )
+            model = self.chat_model_factory(self.api_key)
             
-            # 문서 포맷팅 함수
-            def format_docs(docs):
-                return "\n\n".join(doc.page_content for doc in docs)
+            self.system_prompt_tokens = count_tokens(template)
             
-            # 체인 구성
+            # 체인 구성 (검색 → 토큰 예산에 맞춘 컨텍스트/대화 기록 조립 → 모델)
             chain = (
-                RunnablePassthrough.assign(
-                    context=lambda x: format_docs(retriever.invoke(x["question"]))
-                )
+                RunnableLambda(self.build_prompt_inputs)
                 | prompt
                 | model
                 | StrOutputParser()
             )
             
+            self.chain = chain
+            
             # 메모리 설정
             self.chain_with_memory = RunnableWithMessageHistory(
                 chain,
@@ -131,8 +203,45 @@ class PotatoMarketChatbot:
             print(f"챗봇 체인 초기화 오류: {e}")
             self.chain_with_memory = None
     
+    def build_prompt_inputs(self, inputs):
+        """검색한 청크와 대화 기록을 토큰 예산에 맞춰 프롬프트 입력으로 조립"""
+        question = inputs["question"]
+        docs = self.retriever.invoke(question)
+        context, history, stats = assemble_context(
+            docs,
+            inputs.get("chat_history") or [],
+            question,
+            budget=self.prompt_token_budget,
+            system_tokens=self.system_prompt_tokens,
+            format_chunk=lambda doc, text: f"[출처: {format_citation(doc)}]\n{text}",
+        )
+        self._local.prompt_stats = stats
+        return {"question": question, "context": "\n\n".join(context), "chat_history": history}
+    
+    def _take_prompt_stats(self):
+        stats = getattr(self._local, 'prompt_stats', None)
+        self._local.prompt_stats = None
+        return stats
+    
+    def save_prompt_stats(self, session_id, stats):
+        """세션의 마지막 프롬프트 토큰 통계 저장"""
+        if not stats:
+            return
+        with self._stats_lock:
+            self.prompt_stats[session_id] = stats
+            self.prompt_stats.move_to_end(session_id)
+            while len(self.prompt_stats) > PROMPT_STATS_SIZE:
+                self.prompt_stats.popitem(last=False)
+    
+    def get_prompt_stats(self, session_id="default"):
+        """세션의 마지막 요청 프롬프트 토큰 통계 (없으면 None)"""
+        with self._stats_lock:
+            return self.prompt_stats.get(session_id)
+    
     def get_chat_history(self, session_id):
         """세션별 대화 기록 반환"""
+        if self.history_store:
+            return self.history_store.get_history(session_id)
         if session_id not in self.chat_histories:
             self.chat_histories[session_id] = InMemoryChatMessageHistory()
         return self.chat_histories[session_id]
@@ -141,21 +250,44 @@ class PotatoMarketChatbot:
         """챗봇과 대화"""
         try:
             if not self.chain_with_memory:
-                return "죄송합니다. 챗봇이 준비되지 않았습니다. 잠시 후 다시 시도해주세요."
+                return NOT_READY_MESSAGE
             
             response = self.chain_with_memory.invoke(
                 {"question": question},
                 {"configurable": {"session_id": session_id}}
             )
+            self.save_prompt_stats(session_id, self._take_prompt_stats())
             
             return response
             
         except Exception as e:
             print(f"챗봇 응답 오류: {e}")
-            return "죄송합니다. 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+            return ERROR_MESSAGE
+    
+    def has_history(self, session_id):
+        """세션에 이전 대화 기록이 있는지 확인"""
+        return bool(self.get_chat_history(session_id).messages)
+    
+    def answer(self, question):
+        """대화 기록 없이 질문에 답변 (실패하면 예외 발생)"""
+        return self.answer_with_stats(question)[0]
+    
+    def answer_with_stats(self, question):
+        """대화 기록 없이 답변하고 (응답, 프롬프트 토큰 통계) 반환 (실패하면 예외 발생)"""
+        if not self.chain:
+            raise RuntimeError(NOT_READY_MESSAGE)
+        response = self.chain.invoke({"question": question, "chat_history": []})
+        return response, self._take_prompt_stats()
+    
+    def record_turn(self, session_id, question, answer, prompt_stats=None):
+        """answer()로 만든 응답을 세션 대화 기록에 추가"""
+        self.get_chat_history(session_id).add_messages([HumanMessage(question), AIMessage(answer)])
+        self.save_prompt_stats(session_id, prompt_stats)
     
     def clear_session(self, session_id="default"):
         """세션 대화 기록 초기화"""
+        if self.history_store:
+            self.history_store.clear_session(str(session_id))
         if session_id in self.chat_histories:
             del self.chat_histories[session_id]
         return True
@@ -163,10 +295,17 @@ class PotatoMarketChatbot:
 # 전역 챗봇 인스턴스
 chatbot_instance = None
 
-def initialize_chatbot(api_key, pdf_path=None, persist_directory=None):
+def initialize_chatbot(api_key, pdf_path=None, persist_directory=None, history_store=None,
+                       retrieval_mode="vector", embedding_factory=None, chat_model_factory=None,
+                       knowledge_dir=None, index_mode="build", index_dir=None,
+                       prompt_token_budget=PROMPT_TOKEN_BUDGET):
     """챗봇 초기화"""
     global chatbot_instance
-    chatbot_instance = PotatoMarketChatbot(api_key, pdf_path, persist_directory)
+    chatbot_instance = PotatoMarketChatbot(
+        api_key, pdf_path, persist_directory, history_store, retrieval_mode,
+        embedding_factory, chat_model_factory, knowledge_dir, index_mode, index_dir,
+        prompt_token_budget
+    )
     return chatbot_instance
 
 def get_chatbot():
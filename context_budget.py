@@ -0,0 +1,128 @@
+# context_budget.py
+"""챗봇 프롬프트 컨텍스트 조립
+
+검색된 청크를 점수순으로 정렬하고, 청크 분할 시 생긴 겹치는 구간과 중복 청크를 제거한 뒤
+tiktoken 토큰 수 기준 예산 안에 들어오도록 대화 기록 → 청크 순서로 잘라낸다.
+"""
+import threading
+
+TOKEN_MODEL = "gpt-4o-mini"
+MIN_OVERLAP_CHARS = 40  # 이보다 짧게 겹치는 구간은 겹침으로 보지 않는다
+MAX_OVERLAP_CHARS = 400  # 청크 분할 chunk_overlap(200)보다 넉넉하게
+DUPLICATE_RATIO = 0.8  # 다른 청크와 이 비율 이상 겹치면 중복으로 제거
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder():
+    """tiktoken 인코더 (없거나 로드 실패 시 None)"""
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            try:
+                import tiktoken
+                _encoder = tiktoken.encoding_for_model(TOKEN_MODEL)
+            except Exception as e:
+                print(f"tiktoken 인코더 로드 실패, 글자 수로 토큰을 추정합니다: {e}")
+                _encoder = False
+        return _encoder or None
+
+
+def count_tokens(text):
+    """텍스트 토큰 수"""
+    if not text:
+        return 0
+    encoder = get_encoder()
+    if encoder:
+        return len(encoder.encode(text))
+    # 한글은 대략 1~2글자가 1토큰
+    return len(text) // 2 + 1
+
+
+def truncate_to_tokens(text, max_tokens):
+    """텍스트를 max_tokens 이하로 자르기"""
+    encoder = get_encoder()
+    if encoder:
+        tokens = encoder.encode(text)
+        return text if len(tokens) <= max_tokens else encoder.decode(tokens[:max_tokens])
+    return text[:max(0, (max_tokens - 1) * 2)]
+
+
+def overlap_length(previous, text):
+    """previous의 끝과 text의 시작이 겹치는 길이 (청크 분할 시 chunk_overlap 구간)"""
+    for length in range(min(len(previous), len(text), MAX_OVERLAP_CHARS), MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(text[:length]):
+            return length
+    return 0
+
+
+def dedupe_chunks(docs):
+    """점수순 청크에서 중복 청크를 빼고, 앞 청크와 겹치는 구간을 잘라낸 (문서, 텍스트) 목록 반환"""
+    kept = []
+    for doc in docs:
+        text = doc.page_content.strip()
+        if any(text in other or (other in text and len(other) >= DUPLICATE_RATIO * len(text))
+               for _, other in kept):
+            continue
+        for _, other in kept:
+            # 문서상 바로 뒤 청크면 앞부분, 바로 앞 청크면 뒷부분이 겹친다
+            head = overlap_length(other, text)
+            if head:
+                text = text[head:].strip()
+            tail = overlap_length(text, other)
+            if tail:
+                text = text[:-tail].strip()
+        if len(text) >= MIN_OVERLAP_CHARS or (text and not kept):
+            kept.append((doc, text))
+    return kept
+
+
+def assemble_context(docs, history, question, budget, system_tokens=0, format_chunk=None):
+    """토큰 예산에 맞춘 (컨텍스트 문서 목록, 대화 기록, 통계) 반환
+
+    예산을 넘으면 오래된 대화 기록부터 버리고, 그래도 넘으면 점수가 낮은 청크부터 버린다.
+    """
+    format_chunk = format_chunk or (lambda doc, text: text)
+    ranked = sorted(docs, key=lambda doc: doc.metadata.get('score', 0.0), reverse=True)
+    chunks = [(doc, format_chunk(doc, text)) for doc, text in dedupe_chunks(ranked)]
+    chunk_tokens = [count_tokens(text) for _, text in chunks]
+    history = list(history)
+    history_tokens = [count_tokens(message.content) for message in history]
+    question_tokens = count_tokens(question)
+
+    def total():
+        return system_tokens + question_tokens + sum(chunk_tokens) + sum(history_tokens)
+
+    history_dropped = 0
+    while history and total() > budget:
+        history.pop(0)
+        history_tokens.pop(0)
+        history_dropped += 1
+
+    chunks_dropped = len(ranked) - len(chunks)
+    while len(chunks) > 1 and total() > budget:
+        chunks.pop()
+        chunk_tokens.pop()
+        chunks_dropped += 1
+
+    if chunks and total() > budget:
+        # 마지막 남은 청크는 버리지 않고 예산에 맞춰 자른다
+        remaining = max(0, budget - (total() - chunk_tokens[0]))
+        doc, text = chunks[0]
+        chunks[0] = (doc, truncate_to_tokens(text, remaining))
+        chunk_tokens[0] = count_tokens(chunks[0][1])
+
+    stats = {
+        'system_tokens': system_tokens,
+        'context_tokens': sum(chunk_tokens),
+        'history_tokens': sum(history_tokens),
+        'question_tokens': question_tokens,
+        'prompt_tokens': total(),
+        'budget': budget,
+        'chunks': len(chunks),
+        'chunks_dropped': chunks_dropped,
+        'history_messages': len(history),
+        'history_dropped': history_dropped,
+    }
+    return [text for _, text in chunks], history, stats
@@ -0,0 +1,221 @@
+# geo_location.py
+"""거래 장소 좌표와 내 주변 상품 검색 (geohash 범위 + 정확한 거리 정렬)
+
+상품 등록 때 거래 장소 좌표를 정해서 meeting_lat/meeting_lng/geohash에 저장한다.
+등록 화면의 카카오 지도가 주소로 찾은 좌표를 함께 보내면 그 값을 쓰고,
+없으면 우편번호 앞 2자리(구역번호)별 대표 좌표표로 대략적인 위치를 정한다 (외부 API 호출 없음).
+구역번호 표는 시/군/구 묶음 단위라 오차가 수~수십 km이므로 거리 정렬은 지도 좌표가 있는 상품에서만 정확하다.
+
+내 주변 검색은 반경을 덮는 geohash 칸 몇 개의 접두어 범위를 (is_sold, geohash, 위도, 경도) 인덱스로 읽고
+위경도 사각형(bounding box)으로 한 번 더 거른 뒤, 후보만 NumPy 하버사인 거리로 정렬한다.
+"""
+import math
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 7  # 저장 정밀도 (약 150m × 150m)
+MAX_COVER_CELLS = 12  # 반경을 덮는 geohash 칸 수 상한 (이보다 많아지면 한 단계 큰 칸 사용)
+DEFAULT_RADIUS_KM = 3.0
+MAX_RADIUS_KM = 20.0
+MAX_CANDIDATES = 50000  # 정렬할 후보 수 상한 (인덱스만 읽는 가벼운 행, 넘으면 일부 상품이 빠질 수 있다)
+
+# 국내 좌표 범위 (클라이언트가 보낸 좌표 검증용)
+KOREA_BOUNDS = (33.0, 39.0, 124.5, 132.0)
+
+# 우편번호 앞 2자리(구역번호) → (위도, 경도, 지역)  대표 도시/구 중심 기준 근사값
+ZIP_PREFIX_CENTROIDS = {
+    '01': (37.6543, 127.0568, '서울 도봉·노원·강북'),
+    '02': (37.5894, 127.0532, '서울 성북·동대문·중랑'),
+    '03': (37.5943, 126.9586, '서울 종로·서대문·은평'),
+    '04': (37.5495, 126.9753, '서울 중구·용산·마포·성동'),
+    '05': (37.5206, 127.1155, '서울 광진·송파·강동'),
+    '06': (37.4959, 127.0454, '서울 강남·서초'),
+    '07': (37.5264, 126.8643, '서울 영등포·양천·강서·동작'),
+    '08': (37.4784, 126.9060, '서울 구로·금천·관악'),
+    '10': (37.6584, 126.8320, '경기 고양·파주·김포'),
+    '11': (37.7381, 127.0338, '경기 의정부·양주·동두천·포천'),
+    '12': (37.6360, 127.2165, '경기 남양주·구리·가평'),
+    '13': (37.4200, 127.1265, '경기 성남·하남·광주'),
+    '14': (37.4564, 126.8050, '경기 부천·광명·안양'),
+    '15': (37.3219, 126.8309, '경기 안산·시흥·군포·의왕'),
+    '16': (37.2636, 127.0286, '경기 수원·용인'),
+    '17': (37.2411, 127.3776, '경기 용인·이천·여주·안성'),
+    '18': (37.1383, 127.0311, '경기 화성·오산·평택'),
+    '21': (37.4563, 126.7052, '인천'),
+    '22': (37.4900, 126.6500, '인천 서구·중구·동구·미추홀'),
+    '23': (37.7469, 126.4877, '인천 강화·옹진'),
+    '24': (37.8813, 127.7298, '강원 춘천·영서 북부·속초'),
+    '25': (37.7519, 128.8761, '강원 강릉·동해·삼척·평창'),
+    '26': (37.3422, 127.9202, '강원 원주·횡성·영월'),
+    '27': (36.9910, 127.9259, '충북 충주·제천·음성·진천'),
+    '28': (36.6424, 127.4890, '충북 청주'),
+    '29': (36.3064, 127.5714, '충북 보은·옥천·영동'),
+    '30': (36.4800, 127.2890, '세종'),
+    '31': (36.8151, 127.1139, '충남 천안·아산·당진·서산'),
+    '32': (36.4465, 127.1190, '충남 공주·논산·부여·보령'),
+    '33': (36.1086, 127.4889, '충남 금산·서천'),
+    '34': (36.3504, 127.3845, '대전 동구·중구·대덕'),
+    '35': (36.3550, 127.3400, '대전 서구·유성'),
+    '36': (36.5684, 128.7294, '경북 안동·영주·상주·문경'),
+    '37': (36.0190, 129.3435, '경북 포항·영덕·울진'),
+    '38': (35.8562, 128.9500, '경북 경주·영천·경산·청도'),
+    '39': (36.1195, 128.3446, '경북 구미·김천·칠곡·성주'),
+    '40': (37.4844, 130.9057, '경북 울릉'),
+    '41': (35.8850, 128.6200, '대구 중구·동구·북구'),
+    '42': (35.8400, 128.5600, '대구 남구·서구·수성·달서'),
+    '43': (35.7747, 128.4310, '대구 달성·군위'),
+    '44': (35.5384, 129.3114, '울산 중구·남구·동구·북구'),
+    '45': (35.5600, 129.1300, '울산 울주'),
+    '46': (35.2100, 129.0800, '부산 북부·금정·기장'),
+    '47': (35.1700, 129.0500, '부산진·동래·연제·수영'),
+    '48': (35.1300, 129.0600, '부산 남구·해운대·중구·동구'),
+    '49': (35.1000, 128.9800, '부산 서구·사하·강서·사상'),
+    '50': (35.2285, 128.8894, '경남 김해·양산·밀양·거창'),
+    '51': (35.2279, 128.6811, '경남 창원·함안·의령'),
+    '52': (35.1800, 128.1076, '경남 진주·사천·하동·남해'),
+    '53': (34.8806, 128.6211, '경남 통영·거제·고성'),
+    '54': (35.8242, 127.1480, '전북 전주·익산·군산·김제'),
+    '55': (35.6500, 127.3500, '전북 완주·진안·무주·남원'),
+    '56': (35.5699, 126.8560, '전북 정읍·고창·부안'),
+    '57': (35.2800, 126.9500, '전남 담양·장성·영광·곡성'),
+    '58': (34.8118, 126.3922, '전남 목포·나주·무안·해남'),
+    '59': (34.9506, 127.4872, '전남 순천·여수·광양·고흥'),
+    '61': (35.1600, 126.8500, '광주 동구·서구·남구'),
+    '62': (35.1700, 126.8000, '광주 북구·광산'),
+    '63': (33.4996, 126.5312, '제주'),
+}
+
+
+def geocode_zip(zip_code):
+    """우편번호 → (위도, 경도) 구역번호 대표 좌표 (모르는 번호면 None)"""
+    digits = ''.join(ch for ch in (zip_code or '') if ch.isdigit())
+    if len(digits) != 5:  # 2015년 이전 6자리 우편번호는 구역번호 체계가 달라 쓰지 않는다
+        return None
+    centroid = ZIP_PREFIX_CENTROIDS.get(digits[:2])
+    return (centroid[0], centroid[1]) if centroid else None
+
+
+def parse_coordinates(lat, lng):
+    """문자열 좌표 검증 (국내 범위가 아니면 None)"""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    min_lat, max_lat, min_lng, max_lng = KOREA_BOUNDS
+    if not (min_lat <= lat <= max_lat and min_lng <= lng <= max_lng):
+        return None
+    return lat, lng
+
+
+def resolve_meeting_location(zip_code, lat=None, lng=None):
+    """거래 장소 좌표 결정 → (위도, 경도, geohash) 또는 (None, None, None)"""
+    coordinates = parse_coordinates(lat, lng) or geocode_zip(zip_code)
+    if not coordinates:
+        return None, None, None
+    return coordinates[0], coordinates[1], geohash_encode(*coordinates)
+
+
+def geohash_encode(lat, lng, precision=GEOHASH_PRECISION):
+    """위경도 → geohash 문자열 (경도/위도 비트를 번갈아 5비트씩 base32)"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        target, bounds = (lng, lng_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if target >= middle:
+            value = value * 2 + 1
+            bounds[0] = middle
+        else:
+            value = value * 2
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """geohash 칸 크기 (위도 각도, 경도 각도)"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def bounding_box(lat, lng, radius_km):
+    """중심에서 반경을 덮는 위경도 사각형 (최소 위도, 최대 위도, 최소 경도, 최대 경도)"""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    lng_delta = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(lat))))
+    return lat - lat_delta, lat + lat_delta, lng - lng_delta, lng + lng_delta
+
+
+def covering_prefixes(lat, lng, radius_km):
+    """반경을 덮는 geohash 접두어 목록 (칸 수가 MAX_COVER_CELLS 이하인 가장 작은 칸 크기)"""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = geohash_cell_size(precision)
+        rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+        columns = math.floor(max_lng / lng_step) - math.floor(min_lng / lng_step) + 1
+        if rows * columns > MAX_COVER_CELLS:
+            continue
+        prefixes = set()
+        for row in range(rows):
+            for column in range(columns):
+                # 각 칸의 안쪽 점을 인코딩 (사각형 가장자리 칸도 포함되도록 칸 경계 기준으로 이동)
+                cell_lat = min((math.floor(min_lat / lat_step) + row + 0.5) * lat_step, 89.999999)
+                cell_lng = (math.floor(min_lng / lng_step) + column + 0.5) * lng_step
+                prefixes.add(geohash_encode(cell_lat, cell_lng, precision))
+        return sorted(prefixes)
+    return ['']
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """한 점과 여러 점 사이의 대원 거리 (km, NumPy 배열)"""
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def build_nearby_candidates_query(lat, lng, radius_km, category=None):
+    """반경 안 후보 (PRODUCT_ID, 위도, 경도) SQL (geohash 접두어 범위 + 사각형, 카테고리 조건이 없으면 인덱스만 읽는다)"""
+    prefixes = covering_prefixes(lat, lng, radius_km)
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    conditions = ['is_sold = 0']
+    params = []
+    if prefixes != ['']:
+        conditions.append(f"({' OR '.join(['geohash LIKE %s'] * len(prefixes))})")
+        params.extend(f"{prefix}%" for prefix in prefixes)
+    conditions.append('meeting_lat BETWEEN %s AND %s AND meeting_lng BETWEEN %s AND %s')
+    params.extend([min_lat, max_lat, min_lng, max_lng])
+    if category:
+        conditions.append('category = %s')
+        params.append(category)
+    sql = f"""
+        SELECT PRODUCT_ID, meeting_lat, meeting_lng
+        FROM PRODUCT
+        WHERE {' AND '.join(conditions)}
+        LIMIT %s
+    """
+    params.append(MAX_CANDIDATES)
+    return sql, params
+
+
+def rank_by_distance(lat, lng, candidates, radius_km):
+    """후보 [(PRODUCT_ID, 위도, 경도)]를 정확한 거리로 걸러 가까운 순 [(PRODUCT_ID, 거리 km)]"""
+    if not candidates:
+        return []
+    ids = np.array([row[0] for row in candidates], dtype=np.int64)
+    distances = haversine_km(lat, lng,
+                             np.array([float(row[1]) for row in candidates]),
+                             np.array([float(row[2]) for row in candidates]))
+    inside = distances <= radius_km
+    ids, distances = ids[inside], distances[inside]
+    order = np.lexsort((-ids, distances))  # 거리순, 같은 거리(같은 대표 좌표)는 최신 상품 먼저
+    return [(int(ids[row]), float(distances[row])) for row in order]
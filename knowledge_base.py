@@ -0,0 +1,116 @@
+# knowledge_base.py
+"""챗봇 지식 베이스 적재 (PDF / 마크다운 / 텍스트)
+
+PDF는 PyMuPDF(fitz)로 페이지 범위 단위 작업을 나눠 프로세스 풀에서 추출/분할한다.
+각 청크에는 인용을 위한 source(파일 경로)와 page(0부터 시작) metadata가 붙는다.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+PDF_EXTENSIONS = ('.pdf',)
+TEXT_EXTENSIONS = ('.md', '.markdown', '.txt')
+
+# 한 작업이 처리할 PDF 페이지 수. 작을수록 코어 간 부하가 고르게 나뉜다.
+PAGES_PER_TASK = 16
+
+
+def collect_sources(paths):
+    """파일/디렉터리 목록에서 적재 대상 파일 경로를 정렬해서 반환"""
+    sources = []
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    if name.lower().endswith(PDF_EXTENSIONS + TEXT_EXTENSIONS):
+                        sources.append(os.path.join(root, name))
+        elif path.lower().endswith(PDF_EXTENSIONS + TEXT_EXTENSIONS):
+            sources.append(path)
+    return sorted(set(sources))
+
+
+def plan_tasks(sources, pages_per_task=PAGES_PER_TASK):
+    """파일 목록을 (종류, 경로, 시작 페이지, 끝 페이지) 작업으로 분할"""
+    import fitz
+
+    tasks = []
+    for source in sources:
+        if source.lower().endswith(PDF_EXTENSIONS):
+            with fitz.open(source) as pdf:
+                page_count = pdf.page_count
+            for start in range(0, page_count, pages_per_task):
+                tasks.append(('pdf', source, start, min(start + pages_per_task, page_count)))
+        else:
+            tasks.append(('text', source, 0, 0))
+    return tasks
+
+
+def _split(text, metadata, chunk_size, chunk_overlap):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return [(chunk, metadata) for chunk in splitter.split_text(text)]
+
+
+def process_task(task, chunk_size=1000, chunk_overlap=200):
+    """작업 하나를 처리해서 (청크 텍스트, metadata) 목록 반환 (워커 프로세스에서 실행)"""
+    kind, source, start, end = task
+    chunks = []
+    if kind == 'pdf':
+        import fitz
+
+        with fitz.open(source) as pdf:
+            total_pages = pdf.page_count
+            for page_number in range(start, end):
+                text = pdf.load_page(page_number).get_text()
+                if not text.strip():
+                    continue
+                metadata = {
+                    'source': source,
+                    'page': page_number,
+                    'page_label': str(page_number + 1),
+                    'total_pages': total_pages,
+                }
+                chunks.extend(_split(text, metadata, chunk_size, chunk_overlap))
+    else:
+        with open(source, encoding='utf-8') as f:
+            text = f.read()
+        chunks.extend(_split(text, {'source': source}, chunk_size, chunk_overlap))
+    return chunks
+
+
+def _process_task_args(args):
+    return process_task(*args)
+
+
+def load_knowledge_base(paths, chunk_size=1000, chunk_overlap=200, max_workers=None):
+    """지식 베이스 파일들을 청크 Document 목록으로 적재
+
+    max_workers가 1이거나 작업이 하나뿐이면 현재 프로세스에서 처리한다.
+    결과 순서는 (파일, 페이지) 순서로 항상 동일하다.
+    """
+    tasks = plan_tasks(collect_sources(paths))
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(tasks)) if tasks else 1
+
+    task_args = [(task, chunk_size, chunk_overlap) for task in tasks]
+    if max_workers <= 1:
+        results = [_process_task_args(args) for args in task_args]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_process_task_args, task_args))
+
+    return [
+        Document(page_content=text, metadata=dict(metadata))
+        for chunks in results
+        for text, metadata in chunks
+    ]
+
+
+def format_citation(doc):
+    """청크 출처 표시 문자열 (예: potato_market_guide.pdf p.2)"""
+    source = os.path.basename(doc.metadata.get('source', '')) or '알 수 없음'
+    page_label = doc.metadata.get('page_label')
+    return f"{source} p.{page_label}" if page_label else source
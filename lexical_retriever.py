@@ -0,0 +1,166 @@
+# lexical_retriever.py
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, List
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# 한글 단어 끝에 붙는 조사/어미 (긴 것부터 제거)
+KOREAN_SUFFIXES = sorted([
+    '에서는', '으로는', '에게서', '까지는', '부터는',
+    '하나요', '인가요', '은요', '는요', '나요', '까요', '하면', '해요', '하는', '되나요', '합니까',
+    '에서', '으로', '에게', '한테', '까지', '부터', '처럼', '보다', '이나', '이랑', '하고',
+    '은', '는', '이', '가', '을', '를', '에', '로', '와', '과', '의', '도', '만', '나', '요',
+], key=len, reverse=True)
+
+TOKEN_PATTERN = re.compile(r'[가-힣]+|[a-z0-9]+')
+HANGUL_PATTERN = re.compile(r'^[가-힣]+$')
+
+
+def strip_korean_suffix(word):
+    """한글 단어에서 조사/어미를 떼어낸 어간 반환 (한 글자 어간은 남긴다)"""
+    for suffix in KOREAN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 1:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize_korean(text):
+    """한국어 검색용 토큰화
+
+    형태소 분석기 없이도 조사가 붙은 단어가 매칭되도록
+    어간 + 음절 bigram을 함께 토큰으로 사용한다.
+    """
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        if HANGUL_PATTERN.match(word):
+            stem = strip_korean_suffix(word)
+            tokens.append(stem)
+            if len(stem) > 2:
+                tokens.extend(stem[i:i + 2] for i in range(len(stem) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """메모리 내 BM25 역색인"""
+
+    def __init__(self, texts, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # term -> [(doc_idx, tf), ...]
+        self.doc_lengths = []
+        for doc_idx, text in enumerate(texts):
+            counts = Counter(tokenize_korean(text))
+            self.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((doc_idx, tf))
+        self.doc_count = len(self.doc_lengths)
+        self.avg_length = (sum(self.doc_lengths) / self.doc_count) if self.doc_count else 0.0
+        self.idf = {
+            term: math.log(1 + (self.doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def search(self, query, k=3):
+        """(doc_idx, score) 목록을 점수 내림차순으로 반환"""
+        scores = defaultdict(float)
+        for term in set(tokenize_korean(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_idx, tf in self.postings[term]:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_idx] / (self.avg_length or 1)
+                scores[doc_idx] += idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def with_score(doc, score):
+    """점수를 metadata에 담은 문서 사본 반환"""
+    return Document(page_content=doc.page_content, metadata={**doc.metadata, 'score': float(score)})
+
+
+def document_key(doc):
+    """벡터/BM25 결과를 같은 청크끼리 묶기 위한 키"""
+    return (doc.metadata.get('source'), doc.metadata.get('page'), doc.page_content)
+
+
+class BM25Retriever(BaseRetriever):
+    """임베딩 호출 없이 로컬에서 동작하는 BM25 검색기"""
+
+    index: Any
+    documents: List[Document]
+    k: int = 3
+
+    @classmethod
+    def from_documents(cls, documents, k=3):
+        documents = list(documents)
+        return cls(index=BM25Index([doc.page_content for doc in documents]), documents=documents, k=k)
+
+    def search_with_scores(self, query, k):
+        return [(self.documents[idx], score) for idx, score in self.index.search(query, k)]
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return [with_score(doc, score) for doc, score in self.search_with_scores(query, self.k)]
+
+
+def vector_search_with_scores(vector_store, query, k):
+    """벡터 검색 결과를 (문서, 유사도) 목록으로 반환
+
+    컬렉션의 거리 함수(l2/cosine)나 임베딩 정규화 여부와 관계없이
+    점수가 클수록 가깝도록 거리 d를 1 / (1 + d)로 변환한다.
+    """
+    return [
+        (doc, 1.0 / (1.0 + max(distance, 0.0)))
+        for doc, distance in vector_store.similarity_search_with_score(query, k=k)
+    ]
+
+
+class VectorScoreRetriever(BaseRetriever):
+    """벡터 검색 결과에 유사도 점수를 metadata['score']로 붙여 반환하는 검색기"""
+
+    vector_store: Any
+    k: int = 3
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        results = vector_search_with_scores(self.vector_store, query, self.k)
+        return [with_score(doc, score) for doc, score in results]
+
+
+def normalize_scores(results):
+    """점수를 0~1 범위로 min-max 정규화"""
+    if not results:
+        return {}
+    scores = [score for _, score in results]
+    low, high = min(scores), max(scores)
+    span = (high - low) or 1.0
+    return {
+        document_key(doc): (doc, (score - low) / span if high != low else 1.0)
+        for doc, score in results
+    }
+
+
+class HybridRetriever(BaseRetriever):
+    """BM25 점수와 벡터 유사도 점수를 가중 합산하는 검색기"""
+
+    lexical: BM25Retriever
+    vector_store: Any
+    k: int = 3
+    fetch_k: int = 10
+    alpha: float = 0.5  # 벡터 점수 가중치 (1 - alpha는 BM25 가중치)
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        lexical = normalize_scores(self.lexical.search_with_scores(query, self.fetch_k))
+        vector = normalize_scores(vector_search_with_scores(self.vector_store, query, self.fetch_k))
+        fused = {}
+        for key in set(lexical) | set(vector):
+            doc = (vector.get(key) or lexical.get(key))[0]
+            score = (
+                self.alpha * vector.get(key, (None, 0.0))[1]
+                + (1 - self.alpha) * lexical.get(key, (None, 0.0))[1]
+            )
+            fused[key] = (doc, score)
+        ranked = sorted(fused.values(), key=lambda item: item[1], reverse=True)[:self.k]
+        return [with_score(doc, score) for doc, score in ranked]
@@ -0,0 +1,115 @@
+# llm_client.py
+"""검색용 공유 OpenAI 클라이언트와 서킷 브레이커
+
+요청마다 OpenAI 클라이언트를 새로 만들지 않고 keep-alive 연결 풀을 공유하며,
+연결/응답 제한 시간을 명시한다. 연속 실패가 failure_threshold에 도달하면 브레이커가 열려
+reset_timeout 동안은 LLM을 호출하지 않고 바로 CircuitOpenError를 발생시키고(호출 측은 로컬 검색으로 대체),
+그 뒤에는 half-open 상태에서 시험 호출 하나로 회복 여부를 확인한다.
+"""
+import threading
+import time
+import httpx
+from openai import OpenAI
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """브레이커가 열려 있어 LLM을 호출하지 않은 경우"""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout  # 초
+        self.state = CLOSED
+        self.failures = 0  # 연속 실패 수
+        self.opened_at = None
+        self._probing = False  # half-open 상태에서 시험 호출 진행 중
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'successes': 0, 'failures': 0, 'short_circuited': 0, 'opened': 0}
+
+    def allow(self):
+        """호출해도 되는지 확인 (안 되면 CircuitOpenError)"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == CLOSED or (self.state == HALF_OPEN and not self._probing):
+                self._probing = self.state == HALF_OPEN
+                self.stats['calls'] += 1
+                return
+            self.stats['short_circuited'] += 1
+        raise CircuitOpenError("LLM 호출이 일시적으로 중단되었습니다.")
+
+    def record_success(self):
+        with self._lock:
+            self.stats['successes'] += 1
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.stats['failures'] += 1
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.stats['opened'] += 1
+                    print(f"[LLM] 서킷 브레이커 열림 (연속 실패 {self.failures}회)")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def metrics(self):
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return dict(
+                self.stats,
+                state=self.state,
+                consecutive_failures=self.failures,
+                failure_threshold=self.failure_threshold,
+                retry_in=retry_in,
+            )
+
+
+class LLMClient:
+    """연결 풀을 공유하는 OpenAI 클라이언트 + 서킷 브레이커"""
+
+    def __init__(self, api_key_getter, connect_timeout=2.0, read_timeout=10.0, max_connections=20,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.api_key_getter = api_key_getter
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get_client(self):
+        # gunicorn이 fork한 뒤 워커 프로세스에서 연결 풀을 만들도록 처음 사용할 때 생성
+        with self._lock:
+            if self._client is None:
+                api_key = self.api_key_getter()
+                if not api_key:
+                    raise RuntimeError('OPENAI API KEY missing')
+                self._client = OpenAI(
+                    api_key=api_key,
+                    timeout=self.timeout,
+                    max_retries=0,  # 재시도 대신 브레이커와 로컬 검색 대체로 처리
+                    http_client=httpx.Client(timeout=self.timeout, limits=self.limits),
+                )
+            return self._client
+
+    def chat_completion(self, **kwargs):
+        """chat.completions.create 호출 (브레이커가 열려 있으면 CircuitOpenError)"""
+        self.breaker.allow()
+        try:
+            completion = self.get_client().chat.completions.create(**kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return completion
@@ -0,0 +1,148 @@
+# price_suggestion.py
+"""상품 등록 시 가격 추천 (판매 완료된 비슷한 상품의 가격 분포)
+
+주기 작업이 최근 판매 완료 상품의 상품명 TF-IDF 벡터(similar_products.HashedTfidf)와
+카테고리별 가격 백분위(10/25/50/75/90)를 NumPy로 미리 계산해 둔다.
+추천 요청은 같은 카테고리 안에서 초안 상품명과 코사인 유사도가 높은 k개(kNN)의
+유사도 가중 백분위로 범위를 정하고, 비슷한 상품이 적으면 카테고리 가격대를 돌려준다.
+모든 계산이 메모리 안에서 끝나므로 요청마다 집계 쿼리를 실행하지 않는다.
+"""
+import threading
+import time
+import numpy as np
+from similar_products import HashedTfidf
+
+PERCENTILES = (10, 25, 50, 75, 90)
+NEIGHBORS = 20  # kNN 개수
+MIN_SIMILARITY = 0.2  # 이보다 덜 비슷한 상품은 비교 대상에서 제외
+MIN_COMPARABLES = 3  # 비슷한 상품이 이보다 적으면 카테고리 가격대로 추천
+
+
+def round_price(price):
+    """보기 좋은 단위로 반올림 (1만원 미만은 100원, 이상은 1000원)"""
+    unit = 100 if price < 10000 else 1000
+    return int(round(price / unit) * unit)
+
+
+def weighted_percentiles(values, weights, percentiles):
+    """가중 백분위 (가중치 누적 비율로 선형 보간)"""
+    order = np.argsort(values)
+    values = values[order]
+    cumulative = np.cumsum(weights[order])
+    positions = (cumulative - weights[order] / 2) / cumulative[-1] * 100
+    return np.interp(percentiles, positions, values)
+
+
+class PriceSuggestionIndex:
+    def __init__(self, loader, refresh_interval=3600):
+        self.loader = loader  # () -> [(상품명, 카테고리, 가격)] 최근 판매 완료 상품
+        self.refresh_interval = refresh_interval  # 초
+        self._state = None  # 재계산 때마다 통째로 교체 (조회는 잠금 없이 한 번 읽은 참조만 사용)
+        self._lock = threading.Lock()
+        self._worker = None
+        self.stats = {'suggestions': 0, 'similar_based': 0, 'refreshes': 0, 'refresh_seconds': 0.0}
+
+    def refresh(self):
+        """판매 완료 상품으로 벡터/가격 분포 재계산"""
+        start = time.perf_counter()
+        rows = sorted(self.loader(), key=lambda row: row[1] or '기타')  # 카테고리별로 연속된 구간이 되도록
+        tfidf = HashedTfidf()
+        vectors = tfidf.fit_transform([(title, '') for title, _, _ in rows])
+        prices = np.array([price or 0 for _, _, price in rows], dtype=np.float64)
+
+        categories = {}
+        for row, (_, category, _) in enumerate(rows):
+            category = category or '기타'
+            first, _ = categories.get(category, (row, row))
+            categories[category] = (first, row + 1)
+        state = {
+            'tfidf': tfidf,
+            'vectors': vectors,
+            'prices': prices,
+            'titles': [title for title, _, _ in rows],
+            'categories': categories,  # 카테고리 -> (시작 행, 끝 행)
+            'bands': {
+                category: self._bands(prices[first:end]) for category, (first, end) in categories.items()
+            },
+            'all_bands': self._bands(prices) if len(prices) else None,
+        }
+        self._state = state
+        with self._lock:
+            self.stats['refreshes'] += 1
+            self.stats['refresh_seconds'] = round(time.perf_counter() - start, 3)
+
+    @staticmethod
+    def _bands(prices):
+        values = np.percentile(prices, PERCENTILES)
+        return {f'p{percentile}': round_price(value) for percentile, value in zip(PERCENTILES, values)}
+
+    def start(self):
+        """백그라운드 재계산 스레드 시작 (첫 계산이 끝나야 True)"""
+        # gunicorn이 fork한 뒤 워커 프로세스에서 스레드를 만들도록 처음 사용할 때 호출
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='price-suggestion', daemon=True)
+                self._worker.start()
+        return self._state is not None
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"가격 추천 데이터 계산 오류: {e}")
+            time.sleep(self.refresh_interval)
+
+    def suggest(self, title, category=None, neighbors=NEIGHBORS):
+        """초안 상품명/카테고리로 추천 가격 범위 계산 (데이터가 없으면 None)"""
+        state = self._state
+        if state is None or not len(state['prices']):
+            return None
+        first, end = state['categories'].get(category, (0, len(state['prices'])))
+        bands = state['bands'].get(category) or state['all_bands']
+
+        comparables = []
+        if title and title.strip():
+            similarities = state['vectors'][first:end] @ state['tfidf'].transform(title)
+            k = min(neighbors, len(similarities))
+            top = np.argpartition(-similarities, k - 1)[:k]
+            top = top[similarities[top] >= MIN_SIMILARITY]
+            top = top[np.argsort(-similarities[top])]
+            comparables = [(first + int(row), float(similarities[row])) for row in top]
+
+        with self._lock:
+            self.stats['suggestions'] += 1
+            if len(comparables) >= MIN_COMPARABLES:
+                self.stats['similar_based'] += 1
+
+        if len(comparables) >= MIN_COMPARABLES:
+            rows = np.array([row for row, _ in comparables])
+            weights = np.array([similarity for _, similarity in comparables])
+            low, median, high = weighted_percentiles(state['prices'][rows], weights, (25, 50, 75))
+            basis = 'similar'
+        else:
+            low, median, high = bands['p25'], bands['p50'], bands['p75']
+            basis = 'category'
+
+        return {
+            'basis': basis,  # similar: 비슷한 판매 완료 상품 기준, category: 카테고리 가격대 기준
+            'suggested_price': round_price(median),
+            'low': round_price(low),
+            'high': round_price(high),
+            'comparable_count': len(comparables),
+            'comparables': [
+                {'title': state['titles'][row], 'price': int(state['prices'][row]), 'similarity': round(similarity, 3)}
+                for row, similarity in comparables[:5]
+            ],
+            'category_bands': bands,
+        }
+
+    def metrics(self):
+        state = self._state
+        with self._lock:
+            return dict(
+                self.stats,
+                ready=state is not None,
+                sold_items=len(state['prices']) if state else 0,
+                memory_bytes=int(state['vectors'].nbytes + state['prices'].nbytes) if state else 0,
+            )
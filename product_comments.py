@@ -0,0 +1,50 @@
+# product_comments.py
+"""상품 문의 댓글 keyset 페이지네이션
+
+상품별 댓글을 (created_at, COMMENT_ID) 내림차순으로 한 페이지씩 읽는다.
+(PRODUCT_ID, created_at, COMMENT_ID) 인덱스 순서대로 읽으므로 댓글이 많아도 페이지마다 비용이 같다.
+전체 댓글 수는 PRODUCT.comment_count(댓글 등록 트랜잭션에서 함께 증가)를 쓴다.
+"""
+from datetime import datetime
+
+COMMENT_PAGE_SIZE = 20
+MAX_COMMENT_PAGE_SIZE = 50
+
+
+def format_comment_cursor(comment_id, created_at):
+    """다음 페이지 커서 ('작성시각:COMMENT_ID')"""
+    return f"{created_at.isoformat()}:{comment_id}"
+
+
+def parse_comment_cursor(cursor):
+    """'작성시각:COMMENT_ID' 커서 해석 (잘못되면 ValueError)"""
+    created_at, comment_id = cursor.rsplit(':', 1)
+    return datetime.fromisoformat(created_at), int(comment_id)
+
+
+def build_comments_query(product_id, cursor=None, limit=COMMENT_PAGE_SIZE):
+    """상품 댓글 최신순 한 페이지 SQL (COMMENT_ID, 내용, 작성시각, 닉네임)"""
+    conditions = ['c.PRODUCT_ID = %s']
+    params = [product_id]
+    if cursor:
+        created_at, comment_id = parse_comment_cursor(cursor)
+        conditions.append('(c.created_at < %s OR (c.created_at = %s AND c.COMMENT_ID < %s))')
+        params.extend([created_at, created_at, comment_id])
+    sql = f"""
+        SELECT c.COMMENT_ID, c.comment, c.created_at, u.nickname
+        FROM COMMENTS c
+        JOIN USER u ON c.USER_ID = u.USER_ID
+        WHERE {' AND '.join(conditions)}
+        ORDER BY c.created_at DESC, c.COMMENT_ID DESC
+        LIMIT %s
+    """
+    params.append(limit)
+    return sql, params
+
+
+def next_comment_cursor(rows, limit):
+    """limit + 1개 조회한 결과로 (이번 페이지 행, 다음 페이지 커서 또는 None)"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, format_comment_cursor(rows[-1][0], rows[-1][2])
@@ -0,0 +1,37 @@
+# product_events.py
+"""상품 등록/판매/삭제 이벤트 전달
+
+검색 인덱스처럼 상품 변경을 따라가야 하는 메모리 내 구조들이 구독한다.
+구독 함수는 요청 스레드에서 바로 호출되므로 오래 걸리는 작업은 큐에 넣고 바로 반환해야 한다.
+이벤트는 현재 워커 프로세스 안에서만 전달되므로, 다른 워커의 변경은 각 구조의 주기적 재구성으로 따라간다.
+"""
+import threading
+
+CREATED = 'created'
+SOLD = 'sold'
+DELETED = 'deleted'
+
+
+class ProductEvents:
+    def __init__(self):
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener):
+        """listener(event, product) 등록. product는 최소한 'id'를 가진 dict"""
+        with self._lock:
+            self._listeners.append(listener)
+        return listener
+
+    def publish(self, event, product):
+        """구독자에게 이벤트 전달 (구독자 오류는 기록만 하고 요청을 실패시키지 않는다)"""
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event, product)
+            except Exception as e:
+                print(f"상품 이벤트 처리 오류 ({event}, {getattr(listener, '__qualname__', listener)}): {e}")
+
+
+product_events = ProductEvents()
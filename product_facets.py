@@ -0,0 +1,141 @@
+# product_facets.py
+"""상품 다중 필터 조회(/api/products/browse)와 필터별 상품 수(facet)
+
+PRODUCT_FACET_COUNT는 (카테고리, 가격대, 배송방법, 판매여부) 조합별 상품 수를 담는 작은 표
+(조합 수 = 카테고리 × 가격대 × 배송방법 × 2, 수백 행 이하)로, 상품 등록/판매/삭제 트랜잭션
+안에서 함께 갱신한다. 조회 때는 이 표만 읽어서 필터별 상품 수와 전체 개수를 계산하므로
+요청마다 PRODUCT를 GROUP BY/COUNT 하지 않는다.
+"""
+from search_query import SORT_ORDERS
+
+# (키, 표시 이름, 최소 가격 이상, 최대 가격 미만)
+PRICE_BUCKETS = (
+    ('under_10k', '1만원 미만', 0, 10000),
+    ('10k_50k', '1~5만원', 10000, 50000),
+    ('50k_100k', '5~10만원', 50000, 100000),
+    ('100k_300k', '10~30만원', 100000, 300000),
+    ('300k_1m', '30~100만원', 300000, 1000000),
+    ('over_1m', '100만원 이상', 1000000, None),
+)
+PRICE_BUCKET_KEYS = tuple(bucket[0] for bucket in PRICE_BUCKETS)
+FACET_DIMENSIONS = ('category', 'price_bucket', 'delivery_method', 'is_sold')
+DEFAULT_CATEGORY = '기타'  # PRODUCT.category 기본값
+
+
+def price_bucket(price):
+    """가격이 속한 가격대 키"""
+    for key, _, low, high in PRICE_BUCKETS:
+        if (price or 0) >= low and (high is None or (price or 0) < high):
+            return key
+    return PRICE_BUCKETS[0][0]
+
+
+def facet_cell(product):
+    """상품 dict(category, price, delivery_method, is_sold)의 PRODUCT_FACET_COUNT 키"""
+    return (
+        product.get('category') or DEFAULT_CATEGORY,
+        price_bucket(product.get('price')),
+        product.get('delivery_method') or '',
+        1 if product.get('is_sold') else 0,
+    )
+
+
+def adjust_facet_count(cursor, product, delta):
+    """조합별 상품 수 증감 (호출 측 트랜잭션 안에서 실행)"""
+    cursor.execute("""
+        INSERT INTO PRODUCT_FACET_COUNT (category, price_bucket, delivery_method, is_sold, product_count)
+        VALUES (%s, %s, %s, %s, GREATEST(%s, 0))
+        ON DUPLICATE KEY UPDATE product_count = GREATEST(product_count + %s, 0)
+    """, facet_cell(product) + (delta, delta))
+
+
+def price_bucket_case(column='price'):
+    """가격 → 가격대 키 SQL CASE 식 (재계산용)"""
+    branches = ' '.join(
+        f"WHEN {column} < {high} THEN '{key}'" for key, _, _, high in PRICE_BUCKETS if high is not None
+    )
+    return f"CASE {branches} ELSE '{PRICE_BUCKETS[-1][0]}' END"
+
+
+REBUILD_FACET_COUNTS_SQL = f"""
+    INSERT INTO PRODUCT_FACET_COUNT (category, price_bucket, delivery_method, is_sold, product_count)
+    SELECT COALESCE(NULLIF(category, ''), '{DEFAULT_CATEGORY}'), {price_bucket_case()}, COALESCE(delivery_method, ''),
+           COALESCE(is_sold, 0), COUNT(*)
+    FROM PRODUCT
+    GROUP BY 1, 2, 3, 4
+"""
+
+
+def rebuild_facet_counts(cursor):
+    """PRODUCT 전체로 PRODUCT_FACET_COUNT 재계산 (회원 탈퇴 CASCADE 삭제 등 이벤트 밖 변경 보정용)"""
+    cursor.execute("DELETE FROM PRODUCT_FACET_COUNT")
+    cursor.execute(REBUILD_FACET_COUNTS_SQL)
+
+
+def compute_facets(cells, filters):
+    """조합별 상품 수로 (필터에 맞는 전체 개수, 차원별 값 → 상품 수) 계산
+
+    각 차원의 수는 그 차원을 뺀 나머지 필터만 적용해서 센다
+    (카테고리를 하나 골라도 다른 카테고리 수가 0이 되지 않고 '선택하면 몇 개인지'를 보여준다).
+    """
+    facets = {dimension: {} for dimension in FACET_DIMENSIONS}
+    total = 0
+    for cell in cells:
+        count = cell[-1]
+        matched = [not filters.get(dimension) or value in filters[dimension]
+                   for dimension, value in zip(FACET_DIMENSIONS, cell)]
+        if all(matched):
+            total += count
+        for index, dimension in enumerate(FACET_DIMENSIONS):
+            if all(matched[:index] + matched[index + 1:]):
+                facets[dimension][cell[index]] = facets[dimension].get(cell[index], 0) + count
+    return total, facets
+
+
+def facet_in_condition(column, values, empty_values):
+    """facet_cell과 같은 기준의 'column IN (...)' 조건과 파라미터
+
+    facet 수는 NULL/빈 값을 기본값(카테고리 '기타', 배송방법 '', 판매여부 0)으로 세므로
+    기본값을 고르면 NULL/빈 값 행도 포함해야 목록과 수가 맞는다.
+    인덱스를 쓸 수 있도록 COALESCE로 감싸지 않고 IS NULL 조건을 OR로 붙인다.
+    """
+    condition = f"{column} IN ({', '.join(['%s'] * len(values))})"
+    params = list(values)
+    if empty_values[0] in values:
+        extra = [f"{column} IS NULL"] + [f"{column} = %s" for _ in empty_values[1:]]
+        condition = f"({' OR '.join([condition] + extra)})"
+        params.extend(empty_values[1:])
+    return condition, params
+
+
+def build_browse_query(filters, sort='latest', limit=20, offset=0):
+    """다중 필터 상품 목록 SQL (각 차원 안은 OR, 차원끼리는 AND)"""
+    conditions = []
+    params = []
+    for dimension, empty_values in (('is_sold', (0,)), ('category', (DEFAULT_CATEGORY, '')),
+                                    ('delivery_method', ('',))):
+        if filters.get(dimension):
+            condition, condition_params = facet_in_condition(f"p.{dimension}", filters[dimension], empty_values)
+            conditions.append(condition)
+            params.extend(condition_params)
+    if filters.get('price_bucket'):
+        ranges = []
+        for key, _, low, high in PRICE_BUCKETS:
+            if key in filters['price_bucket']:
+                ranges.append('(p.price >= %s AND p.price < %s)' if high is not None else 'p.price >= %s')
+                params.extend([low, high] if high is not None else [low])
+        conditions.append(f"({' OR '.join(ranges)})")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    order_by = ', '.join(f"p.{term}" for term in SORT_ORDERS[sort].split(', '))
+    sql = f"""
+        SELECT p.PRODUCT_ID, p.product_name, p.price, p.image_url, p.delivery_method, p.category, p.created_at, p.is_sold,
+               u.nickname as seller_nickname
+        FROM PRODUCT p
+        LEFT JOIN USER u ON p.SELLER_ID = u.USER_ID
+        {where}
+        ORDER BY {order_by}
+        LIMIT %s OFFSET %s
+    """
+    params.extend([limit, offset])
+    return sql, params
@@ -0,0 +1,178 @@
+# product_search_index.py
+"""상품 임베딩 인덱스 (Chroma 'products' 컬렉션)
+
+상품 등록/판매/삭제는 백그라운드 큐로 모아서 묶음(batch) 단위로 임베딩/삭제하고,
+검색은 Chroma의 HNSW 근사 최근접 검색으로 상위 k개 PRODUCT_ID를 찾는다.
+판매/삭제된 상품은 인덱스에서 지우고, 카테고리/가격은 Chroma metadata로 먼저 거른 뒤
+판매 여부 등 최종 확인은 호출 측 SQL이 한다.
+
+여러 gunicorn 워커가 같은 컬렉션에 쓰는 경우에는 CHROMA_HOST로 Chroma 서버를 사용한다.
+(로컬 persist_directory는 단일 프로세스 쓰기만 안전하다)
+"""
+import queue
+import threading
+from collections import OrderedDict
+from langchain_chroma import Chroma
+
+COLLECTION_NAME = 'products'
+BATCH_SIZE = 64
+DESCRIPTION_CHARS = 500  # 임베딩에 사용할 설명 앞부분 길이
+
+
+def product_text(product):
+    """임베딩할 상품 텍스트 (제목 + 카테고리 + 설명 앞부분)"""
+    description = (product.get('description') or '')[:DESCRIPTION_CHARS]
+    return f"{product.get('title') or ''}\n{product.get('category') or ''}\n{description}".strip()
+
+
+def build_filter(category=None, min_price=None, max_price=None):
+    """Chroma metadata 필터 (조건이 없으면 None)"""
+    conditions = []
+    if category:
+        conditions.append({'category': category})
+    if min_price is not None:
+        conditions.append({'price': {'$gte': min_price}})
+    if max_price is not None:
+        conditions.append({'price': {'$lte': max_price}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
+
+class ProductEmbeddingIndex:
+    def __init__(self, embedding_getter, persist_directory='vector_db', host=None, port=None,
+                 collection_name=COLLECTION_NAME, batch_size=BATCH_SIZE, query_cache_size=1024):
+        self.embedding_getter = embedding_getter  # 임베딩 모델을 반환하는 함수 (처음 사용할 때 호출)
+        self.persist_directory = persist_directory
+        self.host = host
+        self.port = port
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.query_cache_size = query_cache_size
+        self._store = None
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._query_vectors = OrderedDict()  # 검색어 → 임베딩 (같은 검색어는 임베딩 API를 다시 부르지 않는다)
+        self.stats = {'queued': 0, 'indexed': 0, 'deleted': 0, 'failed': 0, 'searches': 0, 'query_cache_hits': 0}
+
+    def get_store(self):
+        with self._lock:
+            if self._store is None:
+                options = {'host': self.host, 'port': self.port} if self.host else \
+                    {'persist_directory': self.persist_directory}
+                self._store = Chroma(
+                    collection_name=self.collection_name,
+                    embedding_function=self.embedding_getter(),
+                    collection_metadata={'hnsw:space': 'cosine'},
+                    **options,
+                )
+            return self._store
+
+    def _ensure_worker(self):
+        # gunicorn이 fork한 뒤 워커 프로세스에서 스레드를 만들도록 처음 사용할 때 시작
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='product-indexer', daemon=True)
+                self._worker.start()
+
+    def enqueue_upsert(self, product):
+        """상품 임베딩 추가/갱신 예약 (product: id, title, description, category, price)"""
+        self._enqueue(('upsert', product))
+
+    def enqueue_delete(self, product_id):
+        """상품 임베딩 삭제 예약 (판매 완료/삭제)"""
+        self._enqueue(('delete', product_id))
+
+    def _enqueue(self, item):
+        with self._lock:
+            self.stats['queued'] += 1
+        self._queue.put(item)
+        self._ensure_worker()
+
+    def handle_event(self, event, product):
+        """product_events 구독 함수"""
+        if event == 'created':
+            self.enqueue_upsert(product)
+        else:
+            self.enqueue_delete(product['id'])
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._apply(batch)
+            except Exception as e:
+                with self._lock:
+                    self.stats['failed'] += len(batch)
+                print(f"상품 임베딩 인덱스 갱신 오류: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _apply(self, batch):
+        """순서를 지키면서 연속된 upsert/delete를 묶어서 반영"""
+        store = self.get_store()
+        index = 0
+        while index < len(batch):
+            kind = batch[index][0]
+            group = []
+            while index < len(batch) and batch[index][0] == kind:
+                group.append(batch[index][1])
+                index += 1
+            if kind == 'upsert':
+                self.add_products(group)
+            else:
+                store.delete(ids=[str(product_id) for product_id in group])
+                with self._lock:
+                    self.stats['deleted'] += len(group)
+
+    def add_products(self, products):
+        """상품 목록을 바로 임베딩해서 추가 (백그라운드 스레드와 'flask index-products'에서 사용)"""
+        if not products:
+            return
+        self.get_store().add_texts(
+            texts=[product_text(product) for product in products],
+            metadatas=[{'category': product.get('category') or '기타', 'price': int(product.get('price') or 0)}
+                       for product in products],
+            ids=[str(product['id']) for product in products],
+        )
+        with self._lock:
+            self.stats['indexed'] += len(products)
+
+    def flush(self):
+        """대기 중인 변경이 모두 반영될 때까지 대기"""
+        self._queue.join()
+
+    def _query_vector(self, query):
+        with self._lock:
+            vector = self._query_vectors.get(query)
+            if vector is not None:
+                self._query_vectors.move_to_end(query)
+                self.stats['query_cache_hits'] += 1
+                return vector
+        vector = self.get_store().embeddings.embed_query(query)
+        with self._lock:
+            self._query_vectors[query] = vector
+            while len(self._query_vectors) > self.query_cache_size:
+                self._query_vectors.popitem(last=False)
+        return vector
+
+    def search(self, query, k=20, category=None, min_price=None, max_price=None):
+        """(PRODUCT_ID, 유사도 점수) 목록을 유사도 순으로 반환"""
+        with self._lock:
+            self.stats['searches'] += 1
+        # 이 메서드는 이름과 달리 코사인 거리를 반환한다 (유사도 = 1 - 거리)
+        results = self.get_store().similarity_search_by_vector_with_relevance_scores(
+            self._query_vector(query), k=k, filter=build_filter(category, min_price, max_price)
+        )
+        return [(int(doc.id), 1.0 - float(distance)) for doc, distance in results]
+
+    def metrics(self):
+        with self._lock:
+            return dict(self.stats, pending=self._queue.qsize())
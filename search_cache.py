@@ -0,0 +1,179 @@
+# search_cache.py
+"""자연어 상품 검색 결과(LLM이 만든 검증된 SQL) 캐시
+
+같은 의미의 질의("노트북 검색", "노트북 검색해줘")가 같은 키를 갖도록 정규화한 뒤
+LRU + TTL로 보관한다. persist_path를 주면 JSON 파일로 저장해서 재시작 후에도 재사용한다.
+파일 저장은 요청 처리 중에 하지 않고 백그라운드 스레드가 persist_interval마다 (바뀐 게 있을 때만),
+그리고 프로세스 종료 때 한 번 한다.
+"""
+import atexit
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# 질의에서 검색 의도만 나타내는 부가 문구 (단어 단위로 제거)
+FILLER_WORDS = {
+    '검색', '검색해줘', '검색해', '검색해주세요', '검색해줄래', '찾아줘', '찾아', '찾아주세요',
+    '보여줘', '보여주세요', '알려줘', '알려주세요', '추천해줘', '추천해주세요', '좀', '주세요',
+}
+# 단어 끝 조사 (어간이 두 글자 이상 남을 때만 제거. '옷을'처럼 한 글자 어간은 아래 조사만 제거)
+QUERY_PARTICLES = ('에서', '으로', '을', '를', '은', '는', '이', '가', '로', '에', '도')
+SINGLE_SYLLABLE_PARTICLES = ('을', '를', '은', '는')  # 한 글자 어간에도 붙는 목적격/보조사
+
+QUERY_TOKEN_PATTERN = re.compile(r'[가-힣]+|[a-z0-9]+(?:[가-힣]+)?')
+HANGUL_WORD = re.compile(r'^[가-힣]+$')
+
+
+def strip_particle(word):
+    """검색어 단어 끝의 조사 제거"""
+    if not HANGUL_WORD.match(word):
+        return word
+    for particle in QUERY_PARTICLES:
+        if word.endswith(particle):
+            stem = word[:-len(particle)]
+            if len(stem) >= 2 or (stem and particle in SINGLE_SYLLABLE_PARTICLES):
+                return stem
+    return word
+
+
+def normalize_search_query(query):
+    """캐시 키용 질의 정규화 (소문자, 공백/문장부호/조사/부가 문구 제거)"""
+    words = []
+    for word in QUERY_TOKEN_PATTERN.findall(query.lower()):
+        if word in FILLER_WORDS:
+            continue
+        word = strip_particle(word)
+        if word and word not in FILLER_WORDS:
+            words.append(word)
+    return ' '.join(words)
+
+
+class QueryCache:
+    """정규화된 질의 → 값 LRU 캐시 (항목별 TTL, 선택적 JSON 파일 저장)"""
+
+    def __init__(self, max_entries=1000, ttl=3600, persist_path=None, persist_interval=30):
+        self.max_entries = max_entries
+        self.ttl = ttl  # 초
+        self.persist_path = persist_path
+        self.persist_interval = persist_interval  # 초
+        self._entries = OrderedDict()  # key -> (저장 시각, 값)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # 주기 저장과 종료 시 저장이 겹치지 않도록
+        self._dirty = False  # 마지막 파일 저장 이후 바뀐 항목이 있는지
+        self._worker = None
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        if persist_path:
+            self.load()
+
+    def get(self, query):
+        """캐시된 값 반환 (없거나 만료되면 None)"""
+        key = normalize_search_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[1]
+
+    def put(self, query, value):
+        """값 저장 (JSON으로 직렬화 가능한 값만)"""
+        key = normalize_search_query(query)
+        if not key:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+            self._dirty = True
+        if self.persist_path:
+            self._ensure_worker()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+        if self.persist_path:
+            self._ensure_worker()
+
+    def metrics(self):
+        """적중/실패 수, 적중률, 현재 항목 수"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(
+                self.stats,
+                size=len(self._entries),
+                max_entries=self.max_entries,
+                ttl=self.ttl,
+                hit_rate=round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+            )
+
+    def save(self):
+        """캐시를 JSON 파일로 저장 (같은 디렉터리의 고유한 임시 파일에 쓴 뒤 교체)"""
+        with self._save_lock:
+            with self._lock:
+                rows = [[key, saved_at, value] for key, (saved_at, value) in self._entries.items()]
+                self._dirty = False
+            tmp_path = None
+            try:
+                # 여러 gunicorn 워커가 동시에 저장해도 임시 파일이 겹치지 않는다
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.persist_path)),
+                                                prefix=f"{os.path.basename(self.persist_path)}.", suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(rows, f, ensure_ascii=False)
+                os.replace(tmp_path, self.persist_path)
+            except (OSError, TypeError, ValueError) as e:
+                with self._lock:
+                    self._dirty = True  # 다음 주기에 다시 저장
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                print(f"검색 캐시 저장 오류: {e}")
+
+    def _ensure_worker(self):
+        # gunicorn이 fork한 뒤 워커 프로세스에서 스레드를 만들도록 처음 저장할 때 시작
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                if self._worker is None:
+                    atexit.register(self._save_if_dirty)
+                self._worker = threading.Thread(target=self._run, name='search-cache-saver', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.persist_interval)
+            self._save_if_dirty()
+
+    def _save_if_dirty(self):
+        with self._lock:
+            dirty = self._dirty
+        if dirty:
+            self.save()
+
+    def load(self):
+        """JSON 파일에서 만료되지 않은 항목 복원"""
+        try:
+            with open(self.persist_path, encoding='utf-8') as f:
+                rows = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"검색 캐시 로드 오류: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            for key, saved_at, value in rows[-self.max_entries:]:
+                if now - saved_at <= self.ttl:
+                    self._entries[key] = (saved_at, value)
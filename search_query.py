@@ -0,0 +1,416 @@
+# search_query.py
+"""자연어 상품 검색 질의 해석과 파라미터화된 SQL 생성
+
+자주 들어오는 단순한 질의(카테고리 키워드, "5만원 이하" 같은 가격 조건, 배송 방법, 정렬)는
+규칙으로 바로 검색 조건(spec)을 만들고, 해석할 수 없는 질의만 LLM으로 넘긴다.
+LLM도 SQL 대신 같은 형식의 검색 조건 JSON을 반환하며, 스키마 검증을 거친 뒤
+build_search_query()가 정해진 형태의 파라미터화된 SQL로 바꾼다.
+
+검색 조건(spec) 형식:
+    {
+        'keywords': ['나이키', ...],      # 상품명/설명에 하나라도 포함 (OR)
+        'category': '의류' | '전자기기' | '기타' | None,
+        'min_price': int | None,
+        'max_price': int | None,
+        'delivery_method': 'CU편의점 택배' | ... | None,
+        'sort': 'latest' | 'price_asc' | 'price_desc',
+    }
+"""
+import re
+import threading
+from decimal import Decimal, InvalidOperation
+import jsonschema
+from search_cache import normalize_search_query
+
+CATEGORIES = ('의류', '전자기기', '기타')
+DELIVERY_METHODS = ('CU편의점 택배', 'GS편의점 택배', '7ELEVEN 택배', '우체국 택배')
+SORT_ORDERS = {
+    'latest': 'created_at DESC',
+    'price_asc': 'price ASC, created_at DESC',
+    'price_desc': 'price DESC, created_at DESC',
+}
+SEARCH_LIMIT = 50
+NGRAM_TOKEN_SIZE = 2  # MySQL ngram_token_size (기본값). 이보다 짧은 단어는 FULLTEXT로 찾을 수 없다
+FULLTEXT_COLUMNS = 'product_name, description'
+BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+MAX_KEYWORDS = 3  # 키워드 수를 제한해서 SQL 형태(statement shape)의 가짓수를 작게 유지
+MAX_KEYWORD_LENGTH = 30
+SEARCH_COLUMNS = ("PRODUCT_ID, product_name, price, description, image_url, "
+                  "delivery_method, category, created_at, is_sold")
+
+# 카테고리 일반 키워드 (LLM 프롬프트의 키워드 목록과 동일)
+CATEGORY_KEYWORDS = {
+    '신발': '의류', '옷': '의류', '의류': '의류', '가방': '의류',
+    '노트북': '전자기기', '컴퓨터': '전자기기', '스마트폰': '전자기기', '전자기기': '전자기기', '태블릿': '전자기기',
+    '기타': '기타',
+}
+# 브랜드/모델명 → 카테고리 (검색 키워드로도 사용)
+BRAND_KEYWORDS = {
+    '나이키': '의류', '컨버스': '의류', '아디다스': '의류', '푸마': '의류', '뉴발란스': '의류',
+    '에어포스': '의류', '코르테즈': '의류', '척테일러': '의류',
+    '아이폰': '전자기기', '갤럭시': '전자기기', '맥북': '전자기기', '삼성': '전자기기',
+}
+DELIVERY_KEYWORDS = {
+    'cu': 'CU편의점 택배', 'gs': 'GS편의점 택배', 'gs25': 'GS편의점 택배',
+    '7eleven': '7ELEVEN 택배', '세븐일레븐': '7ELEVEN 택배', '세븐': '7ELEVEN 택배',
+    '우체국': '우체국 택배',
+}
+# 배송 방법과 함께 쓰일 때만 의미 없는 단어
+DELIVERY_FILLER = {'택배', '편의점', '배송', '편의점택배', '배송으로', '거래'}
+# 검색 조건에 영향이 없는 단어
+STOP_WORDS = {'상품', '물건', '제품', '중고', '판매', '판매중', '매물', '있나', '있어', '있나요', '팔아', '목록'}
+
+# '비싼순'이 '싼순'으로 잡히지 않도록 내림차순을 먼저 검사
+SORT_PATTERNS = [
+    (re.compile(r'(?:가격\s*)?(?:비싼|높은)\s*(?:가격\s*)?순(?:으로|로)?'), 'price_desc'),
+    (re.compile(r'(?:(?:가격\s*)?(?:싼|저렴한|낮은)\s*(?:가격\s*)?순|가격\s*순)(?:으로|로)?'), 'price_asc'),
+    (re.compile(r'(?:최신|최근)(?:\s*순)?(?:으로|로)?'), 'latest'),
+]
+
+# 금액 표현: 숫자/한글 수사 + 단위 (예: 5만원, 1만5천원, 15만, 오만원, 50,000원, 1.5만원)
+KOREAN_DIGITS = {'일': 1, '이': 2, '삼': 3, '사': 4, '오': 5, '육': 6, '칠': 7, '팔': 8, '구': 9}
+SMALL_UNITS = {'십': 10, '백': 100, '천': 1000}
+LARGE_UNITS = {'만': 10000, '억': 100000000}
+AMOUNT = r'(?:\d[\d,]*(?:\.\d+)?|[일이삼사오육칠팔구십백천만억])+'
+PRICE_PATTERN = re.compile(
+    rf'(?<![가-힣a-z0-9])(?P<low>{AMOUNT})\s*(?:원\s*)?(?:~|-|에서|부터)\s*(?P<high>{AMOUNT})\s*원?\s*(?:사이|까지)?'
+    rf'|(?<![가-힣a-z0-9])(?P<amount>{AMOUNT})(?P<won>\s*원)?\s*(?P<bound>이하|미만|까지|안쪽|아래|이내|이상|초과|넘는|넘게|부터|대)?'
+)
+MAX_BOUNDS = {'이하', '미만', '까지', '안쪽', '아래', '이내'}
+MIN_BOUNDS = {'이상', '초과', '넘는', '넘게', '부터'}
+
+
+def parse_korean_amount(text):
+    """금액 문자열을 원 단위 정수로 변환 (해석할 수 없으면 None)"""
+    text = text.replace(',', '').replace('원', '').strip()
+    if not text or not re.search(r'[\d만천억]', text):
+        return None
+    total = 0
+    section = 0  # 만 단위 아래 부분
+    number = None
+    for token in re.findall(r'\d+(?:\.\d+)?|[일이삼사오육칠팔구십백천만억]', text):
+        if token[0].isdigit():
+            if number is not None:
+                return None
+            number = float(token)
+        elif token in KOREAN_DIGITS:
+            if number is not None:
+                return None
+            number = KOREAN_DIGITS[token]
+        elif token in SMALL_UNITS:
+            section += (1 if number is None else number) * SMALL_UNITS[token]
+            number = None
+        else:
+            section += 0 if number is None else number
+            total += (section or 1) * LARGE_UNITS[token]
+            section = 0
+            number = None
+    total += section + (number or 0)
+    return int(total) if total > 0 else None
+
+
+def _unit_suffix(text):
+    match = re.search(r'[십백천만억]+$', text.replace('원', '').strip())
+    return match.group(0) if match else ''
+
+
+def extract_price(text):
+    """질의에서 가격 조건을 찾아 (min_price, max_price, 가격 표현을 지운 나머지 문자열) 반환
+
+    가격 표현이 있지만 해석할 수 없으면 (None, None, None)을 반환한다.
+    """
+    min_price = max_price = None
+    rest = text
+    for match in PRICE_PATTERN.finditer(text):
+        if match.group('low'):
+            low_text, high_text = match.group('low'), match.group('high')
+            # "5~10만원"처럼 앞 금액에 단위가 없으면 뒤 금액의 단위를 붙인다
+            if not _unit_suffix(low_text):
+                low_text += _unit_suffix(high_text)
+            low, high = parse_korean_amount(low_text), parse_korean_amount(high_text)
+            if low is None or high is None or low > high:
+                return None, None, None
+            min_price, max_price = low, high
+        else:
+            amount_text = match.group('amount')
+            bound = match.group('bound')
+            # 단위나 '원'이 없는 한글 수사('이', '삼' 등)는 금액으로 보지 않는다
+            if not re.search(r'\d|[십백천만억]', amount_text) or \
+                    (not match.group('won') and not bound and not _unit_suffix(amount_text)):
+                continue
+            amount = parse_korean_amount(amount_text)
+            if amount is None:
+                return None, None, None
+            if bound in MAX_BOUNDS:
+                max_price = amount
+            elif bound in MIN_BOUNDS:
+                min_price = amount
+            elif bound == '대':
+                # "10만원대" → 100,000 ~ 199,999
+                step = 10 ** (len(str(amount)) - 1)
+                min_price, max_price = amount, amount + step - 1
+            else:
+                # 범위 없이 금액만 있는 질의("5만원 노트북")는 규칙으로 해석하지 않는다
+                return None, None, None
+        rest = rest.replace(match.group(0), ' ', 1)
+    return min_price, max_price, rest
+
+
+def extract_sort(text):
+    """정렬 표현을 찾아 (정렬, 나머지 문자열) 반환"""
+    for pattern, sort in SORT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return sort, text.replace(match.group(0), ' ', 1)
+    return 'latest', text
+
+
+def parse_search_query(query):
+    """규칙으로 해석할 수 있는 질의면 검색 조건(spec), 아니면 None 반환"""
+    text = query.lower()
+    sort, text = extract_sort(text)
+    min_price, max_price, text = extract_price(text)
+    if text is None:
+        return None
+
+    category = None
+    category_words = []
+    brands = []
+    delivery_method = None
+    fillers = []
+    for word in normalize_search_query(text).split():
+        if word in STOP_WORDS:
+            continue
+        if word in DELIVERY_FILLER:
+            fillers.append(word)
+            continue
+        if word in DELIVERY_KEYWORDS:
+            if delivery_method and delivery_method != DELIVERY_KEYWORDS[word]:
+                return None
+            delivery_method = DELIVERY_KEYWORDS[word]
+            continue
+        word_category = CATEGORY_KEYWORDS.get(word) or BRAND_KEYWORDS.get(word)
+        if not word_category:
+            return None  # 모르는 단어가 있으면 LLM에게 맡긴다
+        if category and category != word_category:
+            return None
+        category = word_category
+        if word in BRAND_KEYWORDS:
+            brands.append(word)
+        elif word not in CATEGORIES:
+            category_words.append(word)
+
+    if fillers and not delivery_method:
+        return None  # "편의점 택배"처럼 어느 배송 방법인지 모르는 경우
+    has_condition = min_price is not None or max_price is not None or delivery_method
+    if not (category or has_condition):
+        return None
+
+    # 브랜드/모델명은 OR 키워드로, 카테고리 키워드는 다른 조건과 함께일 때만 키워드로 사용
+    keywords = brands or (category_words if has_condition else [])
+    return {
+        'keywords': keywords,
+        'category': category,
+        'min_price': min_price,
+        'max_price': max_price,
+        'delivery_method': delivery_method,
+        'sort': sort,
+    }
+
+
+# LLM이 반환하는 검색 조건 JSON 스키마
+SEARCH_SPEC_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'keywords': {
+            'type': 'array',
+            'items': {'type': 'string', 'minLength': 1, 'maxLength': MAX_KEYWORD_LENGTH},
+            'maxItems': MAX_KEYWORDS,
+        },
+        'category': {'enum': list(CATEGORIES) + [None]},
+        'min_price': {'type': ['integer', 'null'], 'minimum': 0},
+        'max_price': {'type': ['integer', 'null'], 'minimum': 0},
+        'delivery_method': {'enum': list(DELIVERY_METHODS) + [None]},
+        'sort': {'enum': list(SORT_ORDERS)},
+    },
+    'additionalProperties': False,
+}
+
+
+def validate_search_spec(spec):
+    """검색 조건을 스키마로 검증하고 빠진 값을 채워서 반환 (잘못되면 ValueError)"""
+    try:
+        jsonschema.validate(spec, SEARCH_SPEC_SCHEMA)
+    except jsonschema.ValidationError as e:
+        raise ValueError(f"검색 조건 형식 오류: {e.message}")
+    keywords = []
+    for keyword in spec.get('keywords') or []:
+        keyword = keyword.strip()
+        if keyword and keyword not in keywords:
+            keywords.append(keyword)
+    validated = {
+        'keywords': keywords,
+        'category': spec.get('category'),
+        'min_price': spec.get('min_price'),
+        'max_price': spec.get('max_price'),
+        'delivery_method': spec.get('delivery_method'),
+        'sort': spec.get('sort') or 'latest',
+    }
+    if validated['min_price'] is not None and validated['max_price'] is not None \
+            and validated['min_price'] > validated['max_price']:
+        raise ValueError("검색 조건 형식 오류: min_price가 max_price보다 큽니다.")
+    return validated
+
+
+def escape_like(keyword):
+    """LIKE 패턴 특수문자 이스케이프"""
+    return keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def build_search_query(spec, limit=SEARCH_LIMIT):
+    """검색 조건으로 (파라미터화된 SQL, 파라미터) 생성
+
+    조건은 항상 같은 순서로 붙기 때문에 SQL 형태는 (조건 조합 × 키워드 수 × 정렬)로 한정된다.
+    """
+    conditions = ['is_sold = 0']
+    params = []
+    if spec.get('category'):
+        conditions.append('category = %s')
+        params.append(spec['category'])
+    if spec.get('min_price') is not None:
+        conditions.append('price >= %s')
+        params.append(spec['min_price'])
+    if spec.get('max_price') is not None:
+        conditions.append('price <= %s')
+        params.append(spec['max_price'])
+    if spec.get('delivery_method'):
+        conditions.append('delivery_method = %s')
+        params.append(spec['delivery_method'])
+    keywords = [BOOLEAN_OPERATORS.sub(' ', keyword).strip() for keyword in spec.get('keywords') or []]
+    keywords = [keyword for keyword in keywords[:MAX_KEYWORDS] if keyword]
+    if keywords:
+        # 키워드 중 하나라도 포함: FULLTEXT 색인으로 찾고, ngram보다 짧은 키워드만 LIKE로 찾는다
+        indexed = [keyword for keyword in keywords if len(keyword) >= NGRAM_TOKEN_SIZE]
+        short = [keyword for keyword in keywords if len(keyword) < NGRAM_TOKEN_SIZE]
+        keyword_conditions = []
+        if indexed:
+            keyword_conditions.append(f'MATCH({FULLTEXT_COLUMNS}) AGAINST (%s IN BOOLEAN MODE)')
+            params.append(' '.join(f'"{keyword}"' for keyword in indexed))
+        for keyword in short:
+            keyword_conditions.append('(product_name LIKE %s OR description LIKE %s)')
+            pattern = f'%{escape_like(keyword)}%'
+            params.extend([pattern, pattern])
+        conditions.append('(' + ' OR '.join(keyword_conditions) + ')')
+    order_by = SORT_ORDERS.get(spec.get('sort'), SORT_ORDERS['latest'])
+    sql = (f"SELECT {SEARCH_COLUMNS} FROM PRODUCT WHERE {' AND '.join(conditions)} "
+           f"ORDER BY {order_by} LIMIT %s")
+    params.append(limit)
+    return sql, tuple(params)
+
+
+def build_boolean_query(text):
+    """검색어를 FULLTEXT boolean mode 질의로 변환. (boolean 질의, ngram보다 짧은 단어 목록) 반환
+
+    모든 단어가 포함되어야 하도록(+) 만들고, 사용자가 입력한 boolean 연산자는 지운다.
+    """
+    words, short_words = [], []
+    for word in BOOLEAN_OPERATORS.sub(' ', text).split():
+        if len(word) < NGRAM_TOKEN_SIZE:
+            short_words.append(word)
+        elif word not in words:
+            words.append(word)
+    return ' '.join(f'+{word}' for word in words), short_words
+
+
+def has_search_terms(text):
+    """FULLTEXT 또는 LIKE 검색 조건이 만들어지는 검색어인지 ('+++'처럼 연산자뿐이면 False)"""
+    boolean_query, short_words = build_boolean_query(text)
+    return bool(boolean_query or short_words)
+
+
+def fulltext_score_sql(match_sql):
+    """관련도 점수를 고정소수점(DECIMAL)으로 바꾼 SQL 식
+
+    MATCH 관련도는 부동소수점이라 커서로 주고받으며 '점수 = 커서 값'을 비교하면 같은 점수의 행을
+    건너뛰거나 반복할 수 있다. 정렬과 커서 비교 모두 소수 6자리 DECIMAL 값을 써서 정확히 비교한다.
+    """
+    return f'CAST({match_sql} AS DECIMAL(20,6))'
+
+
+def format_search_cursor(score, item_id):
+    """'점수:ID' 형식의 다음 페이지 커서 (점수는 DB가 돌려준 DECIMAL 값 그대로)"""
+    return f"{score if score is not None else 0}:{item_id}"
+
+
+def parse_search_cursor(cursor):
+    """'점수:상품ID' 형식의 다음 페이지 커서 해석 (잘못되면 ValueError)"""
+    score, product_id = cursor.split(':')
+    try:
+        score = Decimal(score)
+    except InvalidOperation:
+        raise ValueError(f"잘못된 커서 점수: {score}")
+    if not score.is_finite():
+        raise ValueError(f"잘못된 커서 점수: {score}")
+    return score, int(product_id)
+
+
+def build_fulltext_query(text, category=None, min_price=None, max_price=None, cursor=None,
+                         limit=SEARCH_LIMIT):
+    """FULLTEXT(ngram) 관련도순 검색 SQL과 파라미터 생성
+
+    결과 행의 마지막 컬럼은 관련도 점수(DECIMAL)이며, (점수, PRODUCT_ID) 내림차순 keyset 페이지네이션을 쓴다.
+    """
+    boolean_query, short_words = build_boolean_query(text)
+    conditions = ['is_sold = 0']
+    params = []
+    if boolean_query:
+        match_sql = f'MATCH({FULLTEXT_COLUMNS}) AGAINST (%s IN BOOLEAN MODE)'
+        score_sql = fulltext_score_sql(match_sql)
+        score_params = [boolean_query]
+        conditions.append(match_sql)
+        params.extend(score_params)
+    else:
+        score_sql, score_params = '0', []
+    for word in short_words:
+        # 한 글자 단어('옷')는 ngram 색인에 없으므로 상품명에서 찾는다
+        conditions.append('product_name LIKE %s')
+        params.append(f'%{escape_like(word)}%')
+    if category:
+        conditions.append('category = %s')
+        params.append(category)
+    if min_price is not None:
+        conditions.append('price >= %s')
+        params.append(min_price)
+    if max_price is not None:
+        conditions.append('price <= %s')
+        params.append(max_price)
+    if cursor:
+        last_score, last_id = parse_search_cursor(cursor)
+        conditions.append(f'({score_sql} < %s OR ({score_sql} = %s AND PRODUCT_ID < %s))')
+        params.extend(score_params + [last_score] + score_params + [last_score, last_id])
+    sql = (f"SELECT {SEARCH_COLUMNS}, {score_sql} AS score FROM PRODUCT "
+           f"WHERE {' AND '.join(conditions)} ORDER BY score DESC, PRODUCT_ID DESC LIMIT %s")
+    return sql, tuple(score_params + params + [limit])
+
+
+class SearchRouteStats:
+    """자연어 검색이 어떤 경로(규칙/캐시/LLM/폴백)로 처리됐는지 집계"""
+
+    ROUTES = ('fast_path', 'cache', 'llm', 'fallback')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(self.ROUTES, 0)
+
+    def record(self, route):
+        with self._lock:
+            self.counts[route] += 1
+
+    def metrics(self):
+        with self._lock:
+            total = sum(self.counts.values())
+            return dict(
+                self.counts,
+                total=total,
+                fast_path_ratio=round(self.counts['fast_path'] / total, 4) if total else 0.0,
+            )
@@ -0,0 +1,186 @@
+# similar_products.py
+"""비슷한 상품 추천 (상품명/설명 TF-IDF 벡터의 코사인 유사도)
+
+배치 작업('flask compute-similar-products')이 판매중 상품 전체의 TF-IDF 벡터를 만들고
+같은/인접 카테고리 후보와의 코사인 유사도를 NumPy 행렬 곱으로 한꺼번에 계산해서
+상품별 상위 k개를 PRODUCT_SIMILAR에 저장한다. 상세 페이지 조회 때는 저장된 목록을 읽고
+판매중인 상품만 남겨서 상품별로 캐시하므로 조회마다 무거운 계산을 하지 않는다.
+
+scipy 없이 메모리를 일정하게 쓰도록 단어 벡터는 feature hashing으로 HASH_DIMENSIONS 차원에
+부호를 섞어 접어 넣는다 (내적이 원래 TF-IDF 내적의 근사가 된다).
+"""
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+import numpy as np
+
+HASH_DIMENSIONS = 512  # 상품당 512 × 4바이트 (10만 개에 약 200MB, 배치 작업 중에만 사용)
+TOP_K = 20  # 상품별로 저장할 후보 수 (조회 시 판매된 상품을 빼고 limit개 반환)
+TITLE_WEIGHT = 3  # 상품명 토큰 가중치 (설명 토큰 = 1)
+DESCRIPTION_CHARS = 1000
+BLOCK_SIZE = 1024  # 한 번에 유사도를 계산할 상품 수 (BLOCK_SIZE × 후보 수 행렬)
+ADJACENT_PENALTY = 0.8  # 인접 카테고리 상품 점수 배율 (같은 카테고리를 우선)
+
+# 카테고리별로 함께 추천할 인접 카테고리
+ADJACENT_CATEGORIES = {
+    '의류': ('기타',),
+    '전자기기': ('기타',),
+    '기타': ('의류', '전자기기'),
+}
+
+WORD_PATTERN = re.compile(r'[가-힣]+|[a-z0-9]+')
+
+
+def tokenize(text):
+    """한글은 두 글자 단위(FULLTEXT ngram과 같은 방식), 영문/숫자는 단어 단위 토큰"""
+    tokens = []
+    for word in WORD_PATTERN.findall((text or '').lower()):
+        if word[0] >= '가' and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def product_terms(title, description):
+    """상품의 토큰별 가중 빈도"""
+    terms = Counter()
+    for token in tokenize(title):
+        terms[token] += TITLE_WEIGHT
+    terms.update(tokenize((description or '')[:DESCRIPTION_CHARS]))
+    return terms
+
+
+def _hash_token(token):
+    digest = hashlib.md5(token.encode('utf-8')).digest()
+    value = int.from_bytes(digest[:4], 'little')
+    return value % HASH_DIMENSIONS, 1.0 if digest[4] & 1 else -1.0
+
+
+class HashedTfidf:
+    """feature hashing TF-IDF (fit으로 문서 빈도를 기억해서 새 문서도 같은 공간으로 변환)"""
+
+    def __init__(self):
+        self.document_frequency = Counter()
+        self.count = 0
+        self._hashed = {}  # fit한 문서의 토큰 -> (차원, 부호)
+
+    def _vector(self, terms):
+        vector = np.zeros(HASH_DIMENSIONS, dtype=np.float32)
+        for token, frequency in terms.items():
+            # transform()으로 들어오는 처음 보는 토큰은 캐시하지 않는다 (사용자 입력으로 메모리가 늘지 않도록)
+            index, sign = self._hashed.get(token) or _hash_token(token)
+            idf = math.log((1 + self.count) / (1 + self.document_frequency.get(token, 0))) + 1
+            vector[index] += sign * (1 + math.log(frequency)) * idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def fit_transform(self, documents):
+        """[(상품명, 설명)] → L2 정규화된 (상품 수 × HASH_DIMENSIONS) float32 행렬"""
+        term_lists = [product_terms(title, description) for title, description in documents]
+        self.document_frequency = Counter()
+        for terms in term_lists:
+            self.document_frequency.update(terms.keys())
+        self.count = len(term_lists)
+        self._hashed = {token: _hash_token(token) for token in self.document_frequency}
+        vectors = np.zeros((self.count, HASH_DIMENSIONS), dtype=np.float32)
+        for row, terms in enumerate(term_lists):
+            vectors[row] = self._vector(terms)
+        return vectors
+
+    def transform(self, title, description=''):
+        """새 문서 하나를 fit한 문서들과 같은 공간의 벡터로 변환"""
+        return self._vector(product_terms(title, description))
+
+
+def build_vectors(documents):
+    """[(상품명, 설명)] → L2 정규화된 (상품 수 × HASH_DIMENSIONS) float32 TF-IDF 행렬"""
+    return HashedTfidf().fit_transform(documents)
+
+
+def compute_similar_products(products, top_k=TOP_K):
+    """판매중 상품 목록으로 상품별 비슷한 상품 계산
+
+    products: [(PRODUCT_ID, 상품명, 설명, 카테고리)]
+    반환: {PRODUCT_ID: [(비슷한 PRODUCT_ID, 점수), ...]} (점수 내림차순)
+    """
+    if not products:
+        return {}
+    ids = np.array([product[0] for product in products], dtype=np.int64)
+    categories = [product[3] or '기타' for product in products]
+    vectors = build_vectors([(product[1], product[2]) for product in products])
+
+    by_category = {}
+    for row, category in enumerate(categories):
+        by_category.setdefault(category, []).append(row)
+    by_category = {category: np.array(rows) for category, rows in by_category.items()}
+
+    results = {}
+    for category, rows in by_category.items():
+        # 후보 = 같은 카테고리 + 인접 카테고리 (인접 카테고리는 점수에 배율 적용)
+        neighbor_rows = [by_category[name] for name in ADJACENT_CATEGORIES.get(category, ()) if name in by_category]
+        candidates = np.concatenate([rows] + neighbor_rows)
+        weights = np.ones(len(candidates), dtype=np.float32)
+        weights[len(rows):] = ADJACENT_PENALTY
+        candidate_vectors = vectors[candidates]
+        k = min(top_k, len(candidates) - 1)
+        if k <= 0:
+            continue
+
+        for start in range(0, len(rows), BLOCK_SIZE):
+            block = rows[start:start + BLOCK_SIZE]
+            scores = (vectors[block] @ candidate_vectors.T) * weights
+            # 자기 자신 제외 (같은 카테고리 후보의 앞부분에 같은 순서로 들어 있다)
+            scores[np.arange(len(block)), np.arange(start, start + len(block))] = -np.inf
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            for offset, row in enumerate(block):
+                results[int(ids[row])] = [
+                    (int(ids[candidates[column]]), round(float(score), 4))
+                    for column, score in zip(top[offset], top_scores[offset]) if score > 0
+                ]
+    return results
+
+
+class SimilarProductsCache:
+    """상품별 추천 결과 LRU 캐시 (TTL이 지나면 다시 조회해서 판매된 상품을 뺀다)"""
+
+    def __init__(self, max_entries=5000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl  # 초
+        self._entries = OrderedDict()  # PRODUCT_ID -> (저장 시각, 결과)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, product_id):
+        with self._lock:
+            entry = self._entries.get(product_id)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(product_id)
+            self.stats['hits'] += 1
+            return entry[1]
+
+    def put(self, product_id, value):
+        with self._lock:
+            self._entries[product_id] = (time.time(), value)
+            self._entries.move_to_end(product_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        with self._lock:
+            total = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats, size=len(self._entries),
+                        hit_rate=round(self.stats['hits'] / total, 3) if total else 0.0)
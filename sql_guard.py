@@ -0,0 +1,166 @@
+# sql_guard.py
+"""자연어 검색 SQL 실행 전 비용 검사
+
+실행 전에 EXPLAIN으로 예상 검사 행 수를 확인해서
+  - rewrite_rows를 넘으면 LONGBLOB(image_url) 등 넓은 컬럼을 마지막에 읽도록
+    (PRODUCT_ID만 먼저 고르고 기본키로 다시 조인) 쿼리를 바꾸고
+  - max_rows를 넘으면 실행하지 않고 QueryRejectedError를 발생시킨다 (LLM이 만든 SQL만).
+모든 쿼리에는 /*+ MAX_EXECUTION_TIME(ms) */ 힌트를 붙여 문장 단위로 실행 시간을 제한한다.
+"""
+import re
+import threading
+from collections import deque
+
+MAX_EXECUTION_TIME_ERRNO = 3024  # ER_QUERY_TIMEOUT (MAX_EXECUTION_TIME 초과)
+
+SIMPLE_PRODUCT_SELECT = re.compile(
+    r'^\s*SELECT\s+(?P<columns>.+?)\s+FROM\s+PRODUCT\b(?P<rest>.*)$', re.IGNORECASE | re.DOTALL
+)
+ORDER_BY_CLAUSE = re.compile(r'\bORDER\s+BY\s+(?P<order>.+?)(?=\s+LIMIT\b|\s*$)', re.IGNORECASE | re.DOTALL)
+UNALIASED_REST = re.compile(r'^(?:WHERE|ORDER|LIMIT)\b', re.IGNORECASE)
+NESTED_OR_JOINED = re.compile(r'\bJOIN\b|\bSELECT\b|\bUNION\b', re.IGNORECASE)
+ALIASED_COLUMN = re.compile(r'^(?P<expression>.+?)\s+AS\s+(?P<alias>\w+)$', re.IGNORECASE | re.DOTALL)
+
+
+class QueryRejectedError(Exception):
+    """예상 비용이 너무 커서 실행하지 않은 쿼리"""
+
+    def __init__(self, message, plan):
+        super().__init__(message)
+        self.plan = plan
+
+
+def with_execution_time_limit(sql, timeout_ms):
+    """SELECT 문에 MAX_EXECUTION_TIME 옵티마이저 힌트 추가"""
+    if 'MAX_EXECUTION_TIME' in sql.upper():
+        return sql
+    return re.sub(r'^\s*SELECT\b', f'SELECT /*+ MAX_EXECUTION_TIME({int(timeout_ms)}) */', sql,
+                  count=1, flags=re.IGNORECASE)
+
+
+def explain(cursor, sql, params=None):
+    """EXPLAIN 결과를 행별 dict 목록으로 반환"""
+    cursor.execute(f"EXPLAIN {sql}", params)
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def estimate_rows(plan):
+    """실행 계획의 예상 검사 행 수 (같은 SELECT 안의 테이블은 중첩 루프로 보고 곱한다)"""
+    per_select = {}
+    for row in plan:
+        rows = int(row.get('rows') or 1)
+        per_select[row.get('id')] = per_select.get(row.get('id'), 1) * max(rows, 1)
+    return max(per_select.values()) if per_select else 0
+
+
+def format_plan(plan):
+    """로그용 실행 계획 요약"""
+    return ' | '.join(
+        f"{row.get('table')}:type={row.get('type')} key={row.get('key')} rows={row.get('rows')} "
+        f"extra={row.get('Extra')}"
+        for row in plan
+    )
+
+
+def split_columns(columns):
+    """SELECT 목록을 최상위 쉼표로 나눈다 (MATCH(a, b) 같은 괄호 안 쉼표는 그대로)"""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(columns):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(columns[start:i].strip())
+            start = i + 1
+    parts.append(columns[start:].strip())
+    return parts
+
+
+def defer_wide_columns(sql):
+    """PRODUCT 단일 테이블 조회를 '기본키만 먼저 고르고 나중에 조인'하는 형태로 변경
+
+    스캔/정렬 단계에서는 PRODUCT_ID만 다루므로 off-page에 저장된 LONGBLOB/TEXT 페이지를
+    LIMIT로 고른 행에 대해서만 읽는다. 'MATCH(...) AS score'처럼 별칭을 붙인 식은 안쪽 SELECT로 옮겨
+    ORDER BY score가 안쪽에서도 해석되게 하고, 바깥에서는 picked.score로 읽는다.
+    식이 안쪽으로 옮겨져도 %s 자리표시자의 순서는 그대로다. 바꿀 수 없는 형태면 None 반환.
+    """
+    match = SIMPLE_PRODUCT_SELECT.match(sql)
+    if not match or NESTED_OR_JOINED.search(match.group('rest')):
+        return None
+    rest = match.group('rest').strip()
+    if rest and not UNALIASED_REST.match(rest):
+        return None  # 'FROM PRODUCT p'처럼 별칭을 쓰면 바깥 SELECT의 컬럼을 해석할 수 없다
+
+    outer_columns, picked_columns = [], ['PRODUCT_ID']
+    for column in split_columns(match.group('columns')):
+        aliased = ALIASED_COLUMN.match(column)
+        if aliased:
+            picked_columns.append(column)
+            outer_columns.append(f"picked.{aliased.group('alias')} AS {aliased.group('alias')}")
+        elif '%s' in column:
+            return None  # 별칭 없는 식의 파라미터는 옮기면 순서가 바뀐다
+        else:
+            outer_columns.append(column)
+    if len(picked_columns) > 1 and any('%s' in column for column in outer_columns):
+        return None
+
+    order = ORDER_BY_CLAUSE.search(rest)
+    order_by = f" ORDER BY {order.group('order').strip()}" if order else ''
+    return (f"SELECT {', '.join(outer_columns)} FROM PRODUCT "
+            f"JOIN (SELECT {', '.join(picked_columns)} FROM PRODUCT {rest}) AS picked USING (PRODUCT_ID){order_by}")
+
+
+class SqlGuard:
+    def __init__(self, max_rows=100000, rewrite_rows=5000, timeout_ms=2000, recent_size=20):
+        self.max_rows = max_rows
+        self.rewrite_rows = rewrite_rows
+        self.timeout_ms = timeout_ms
+        self.rejected = deque(maxlen=recent_size)  # 최근 거절된 쿼리와 실행 계획
+        self._lock = threading.Lock()
+        self.stats = {'checked': 0, 'rewritten': 0, 'rejected': 0, 'timeouts': 0}
+
+    def prepare(self, cursor, sql, params=None, reject=True):
+        """EXPLAIN으로 비용을 검사하고 실제로 실행할 SQL 반환 (너무 크면 QueryRejectedError)
+
+        EXPLAIN의 rows는 인덱스 범위 추정치라 LIMIT를 반영하지 않는다. 서버가 정해진 형태로 만든 SQL은
+        인덱스 순서대로 읽다가 LIMIT에서 멈추므로 reject=False로 거절 없이 실행 시간 제한과 넓은 컬럼
+        지연 조회만 적용한다. 거절 검사는 LLM이 직접 만든 SQL에만 쓴다.
+        """
+        plan = explain(cursor, sql, params)
+        rows = estimate_rows(plan)
+        with self._lock:
+            self.stats['checked'] += 1
+
+        if reject and rows > self.max_rows:
+            with self._lock:
+                self.stats['rejected'] += 1
+                self.rejected.append({'sql': sql, 'estimated_rows': rows, 'plan': format_plan(plan)})
+            print(f"[SQL-GUARD] 거절 (예상 {rows}행 > {self.max_rows}): {sql}")
+            print(f"[SQL-GUARD] 실행 계획: {format_plan(plan)}")
+            raise QueryRejectedError(f"검색 범위가 너무 넓습니다 (예상 {rows}행).", plan)
+
+        if rows > self.rewrite_rows:
+            rewritten = defer_wide_columns(sql)
+            if rewritten:
+                with self._lock:
+                    self.stats['rewritten'] += 1
+                print(f"[SQL-GUARD] 넓은 컬럼 지연 조회로 변경 (예상 {rows}행): {format_plan(plan)}")
+                sql = rewritten
+
+        return with_execution_time_limit(sql, self.timeout_ms)
+
+    def record_timeout(self):
+        with self._lock:
+            self.stats['timeouts'] += 1
+
+    def metrics(self):
+        with self._lock:
+            return dict(
+                self.stats,
+                max_rows=self.max_rows,
+                rewrite_rows=self.rewrite_rows,
+                timeout_ms=self.timeout_ms,
+                recent_rejected=list(self.rejected),
+            )
@@ -1,24 +1,54 @@
 // 게시판 JavaScript
 let currentPage = 1;
 const perPage = 10;
+let pageCursors = [null]; // 페이지별 시작 커서 (pageCursors[i] = i+1페이지)
+let boardSearchQuery = ''; // 검색 중이면 검색어
 
 // 페이지 로드 시 초기화
 document.addEventListener('DOMContentLoaded', function() {
     loadBoardPosts();
+    setupBoardSearch();
     setupWriteForm();
     setupAnswerForm();
     // global.js에서 이미 세션을 확인하므로 중복 호출 제거
     // checkSessionStatus();
 });
 
-// 게시글 목록 로드
+// 게시판 검색 설정
+function setupBoardSearch() {
+    const form = document.getElementById('boardSearchForm');
+    if (!form) return;
+    form.addEventListener('submit', function(e) {
+        e.preventDefault();
+        boardSearchQuery = document.getElementById('boardSearchInput').value.trim();
+        pageCursors = [null];
+        loadBoardPosts(1);
+    });
+}
+
+// 게시글 목록 로드 (커서로 다음 페이지를 읽고, 지나온 페이지 커서를 기억)
 async function loadBoardPosts(page = 1) {
+    if (page > pageCursors.length) page = 1;
     try {
-        const response = await fetch(`/api/board?page=${page}&per_page=${perPage}`);
+        const params = new URLSearchParams();
+        const cursor = pageCursors[page - 1];
+        if (cursor) params.append('cursor', cursor);
+        let url;
+        if (boardSearchQuery) {
+            params.append('q', boardSearchQuery);
+            params.append('limit', perPage);
+            url = `/api/board/search?${params.toString()}`;
+        } else {
+            params.append('per_page', perPage);
+            url = `/api/board?${params.toString()}`;
+        }
+        const response = await fetch(url);
         if (response.ok) {
             const result = await response.json();
+            pageCursors = pageCursors.slice(0, page);
+            if (result.next_cursor) pageCursors.push(result.next_cursor);
             displayBoardPosts(result.posts);
-            displayBoardPagination(result);
+            displayBoardPagination(page, result);
             currentPage = page;
         } else {
             console.error('게시글 로드 실패');
@@ -37,7 +67,7 @@ function displayBoardPosts(posts) {
     if (!posts || posts.length === 0) {
         boardList.innerHTML = `
             <div class="board-row empty-row">
-                <div class="board-col-full">등록된 게시글이 없습니다.</div>
+                <div class="board-col-full">${boardSearchQuery ? '검색 결과가 없습니다.' : '등록된 게시글이 없습니다.'}</div>
             </div>
         `;
         return;
@@ -368,13 +398,12 @@ function setupAnswerForm() {
     });
 }
 
-// 페이징 표시
-function displayBoardPagination(result) {
+// 페이징 표시 (커서 방식이라 지나온 페이지와 바로 다음 페이지까지 이동 가능)
+function displayBoardPagination(page, result) {
     const pagination = document.getElementById('boardPagination');
-    const totalPages = result.total_pages;
-    const currentPageNum = result.page;
+    const lastPage = pageCursors.length;
     
-    if (totalPages <= 1) {
+    if (lastPage <= 1) {
         pagination.innerHTML = '';
         return;
     }
@@ -382,22 +411,26 @@ function displayBoardPagination(result) {
     let paginationHTML = '';
     
     // 이전 페이지 버튼
-    if (currentPageNum > 1) {
-        paginationHTML += `<button class="pagination-btn" onclick="loadBoardPosts(${currentPageNum - 1})">이전</button>`;
+    if (page > 1) {
+        paginationHTML += `<button class="pagination-btn" onclick="loadBoardPosts(${page - 1})">이전</button>`;
     }
     
     // 페이지 번호들
-    const startPage = Math.max(1, currentPageNum - 2);
-    const endPage = Math.min(totalPages, currentPageNum + 2);
+    const startPage = Math.max(1, page - 2);
+    const endPage = Math.min(lastPage, page + 2);
     
     for (let i = startPage; i <= endPage; i++) {
-        const activeClass = i === currentPageNum ? 'active' : '';
+        const activeClass = i === page ? 'active' : '';
         paginationHTML += `<button class="pagination-btn ${activeClass}" onclick="loadBoardPosts(${i})">${i}</button>`;
     }
     
     // 다음 페이지 버튼
-    if (currentPageNum < totalPages) {
-        paginationHTML += `<button class="pagination-btn" onclick="loadBoardPosts(${currentPageNum + 1})">다음</button>`;
+    if (result.has_more) {
+        paginationHTML += `<button class="pagination-btn" onclick="loadBoardPosts(${page + 1})">다음</button>`;
+    }
+    
+    if (!boardSearchQuery && result.total_pages) {
+        paginationHTML += `<span class="pagination-total">전체 ${result.total_pages}페이지</span>`;
     }
     
     pagination.innerHTML = paginationHTML;
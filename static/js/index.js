@@ -11,6 +11,7 @@ document.addEventListener('DOMContentLoaded', function() {
 // 앱 초기화
 function initializeApp() {
     setupMainSearchBar();
+    setupSearchSuggestions();
     // URL에 search 파라미터가 있으면 자연어 검색 결과 표시
     const params = new URLSearchParams(window.location.search);
     const nlQuery = params.get('search');
@@ -42,6 +43,99 @@ function setupMainSearchBar() {
     }
 }
 
+// 검색어 자동완성
+const SUGGEST_DELAY = 120; // ms (입력이 멈춘 뒤 요청)
+const SUGGEST_MAX_LENGTH = 40; // 긴 문장 검색은 자동완성하지 않음
+let suggestTimer = null;
+let suggestController = null;
+let activeSuggestion = -1;
+
+function setupSearchSuggestions() {
+    const searchInput = document.getElementById('mainSearchInput');
+    const list = document.getElementById('searchSuggestions');
+    if (!searchInput || !list) return;
+
+    searchInput.addEventListener('input', function() {
+        clearTimeout(suggestTimer);
+        suggestTimer = setTimeout(() => loadSearchSuggestions(searchInput.value), SUGGEST_DELAY);
+    });
+
+    searchInput.addEventListener('keydown', function(e) {
+        const items = list.querySelectorAll('.search-suggestion-item');
+        if (list.style.display === 'none' || items.length === 0) return;
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            const step = e.key === 'ArrowDown' ? 1 : -1;
+            activeSuggestion = (activeSuggestion + step + items.length) % items.length;
+            items.forEach((item, index) => item.classList.toggle('active', index === activeSuggestion));
+        } else if (e.key === 'Enter' && activeSuggestion >= 0) {
+            e.preventDefault();
+            selectSuggestion(items[activeSuggestion].textContent);
+        } else if (e.key === 'Escape') {
+            hideSearchSuggestions();
+        }
+    });
+
+    // 항목 클릭 (blur보다 먼저 처리되도록 mousedown 사용)
+    list.addEventListener('mousedown', function(e) {
+        const item = e.target.closest('.search-suggestion-item');
+        if (item) {
+            e.preventDefault();
+            selectSuggestion(item.textContent);
+        }
+    });
+    searchInput.addEventListener('blur', hideSearchSuggestions);
+}
+
+async function loadSearchSuggestions(value) {
+    const query = value.trim();
+    if (!query || query.length > SUGGEST_MAX_LENGTH || query.includes('\n')) {
+        hideSearchSuggestions();
+        return;
+    }
+    // 이전 요청은 취소 (늦게 도착한 응답이 최신 입력을 덮어쓰지 않도록)
+    if (suggestController) suggestController.abort();
+    suggestController = new AbortController();
+    try {
+        const res = await fetch(`/api/search/suggest?q=${encodeURIComponent(query)}`, { signal: suggestController.signal });
+        if (!res.ok) return;
+        const data = await res.json();
+        showSearchSuggestions(data.suggestions || []);
+    } catch (e) {
+        if (e.name !== 'AbortError') console.error('자동완성 오류:', e);
+    }
+}
+
+function showSearchSuggestions(suggestions) {
+    const list = document.getElementById('searchSuggestions');
+    if (!list) return;
+    activeSuggestion = -1;
+    if (suggestions.length === 0) {
+        hideSearchSuggestions();
+        return;
+    }
+    list.innerHTML = '';
+    suggestions.forEach(text => {
+        const item = document.createElement('li');
+        item.className = 'search-suggestion-item';
+        item.textContent = text;
+        list.appendChild(item);
+    });
+    list.style.display = 'block';
+}
+
+function hideSearchSuggestions() {
+    const list = document.getElementById('searchSuggestions');
+    if (list) list.style.display = 'none';
+    activeSuggestion = -1;
+}
+
+function selectSuggestion(text) {
+    document.getElementById('mainSearchInput').value = text;
+    hideSearchSuggestions();
+    performMainSearch();
+}
+
 // 메인 검색 실행
 function performMainSearch() {
     const searchTerm = document.getElementById('mainSearchInput').value.trim();
@@ -51,6 +145,8 @@ function performMainSearch() {
         return;
     }
     
+    hideSearchSuggestions();
+    clearTimeout(suggestTimer);
     console.log('검색어:', searchTerm);
     // 메인에서 바로 자연어 검색 결과 표시
     const url = new URL(window.location.href);
@@ -199,6 +199,7 @@ function displayMyProducts(products) {
                     <th>상품명</th>
                     <th>가격</th>
                     <th>상태</th>
+                    <th>조회</th>
                     <th>등록일</th>
                     <th>관리</th>
                 </tr>
@@ -223,6 +224,10 @@ function displayMyProducts(products) {
                                 ${product.is_sold ? '판매완료' : '판매중'}
                             </span>
                         </td>
+                        <td class="product-views-cell">
+                            <div>${(product.view_count || 0).toLocaleString()}회</div>
+                            <div class="product-viewers">방문자 약 ${(product.unique_viewers || 0).toLocaleString()}명</div>
+                        </td>
                         <td class="product-date-cell">
                             ${new Date(product.created_at).toLocaleDateString('ko-KR')}
                         </td>
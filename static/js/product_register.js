@@ -5,9 +5,70 @@ document.addEventListener('DOMContentLoaded', function() {
     setupImagePreview();
     setupFormSubmission();
     setupAddressHandlers();
+    setupPriceSuggestion();
     waitForKakaoMaps(initializeMap);
 });
 
+// 가격 추천 (상품명/카테고리 입력이 멈추면 조회)
+let priceSuggestionTimer = null;
+
+function setupPriceSuggestion() {
+    const titleInput = document.getElementById('productTitle');
+    const categorySelect = document.getElementById('productCategory');
+    const schedule = () => {
+        clearTimeout(priceSuggestionTimer);
+        priceSuggestionTimer = setTimeout(loadPriceSuggestion, 400);
+    };
+    if (titleInput) titleInput.addEventListener('input', schedule);
+    if (categorySelect) categorySelect.addEventListener('change', schedule);
+}
+
+async function loadPriceSuggestion() {
+    const box = document.getElementById('priceSuggestion');
+    const title = document.getElementById('productTitle').value.trim();
+    const category = document.getElementById('productCategory').value;
+    if (!box) return;
+    if (title.length < 2 && !category) {
+        box.style.display = 'none';
+        return;
+    }
+
+    try {
+        const params = new URLSearchParams({ title });
+        if (category) params.append('category', category);
+        const response = await fetch(`/api/products/price-suggestion?${params.toString()}`);
+        if (!response.ok) {
+            box.style.display = 'none';
+            return;
+        }
+        const result = await response.json();
+        const suggestion = result.suggestion;
+        if (!suggestion) {
+            box.style.display = 'none';
+            return;
+        }
+
+        const basis = suggestion.basis === 'similar'
+            ? `비슷한 판매 완료 상품 ${suggestion.comparable_count}개 기준`
+            : '같은 카테고리 판매 완료 상품 기준';
+        box.innerHTML = '';
+        const text = document.createElement('span');
+        text.textContent = `추천 가격 ${suggestion.low.toLocaleString()}원 ~ ${suggestion.high.toLocaleString()}원 ` +
+            `(중간값 ${suggestion.suggested_price.toLocaleString()}원, ${basis})`;
+        const apply = document.createElement('button');
+        apply.type = 'button';
+        apply.className = 'btn btn-outline';
+        apply.textContent = '적용';
+        apply.addEventListener('click', () => {
+            document.getElementById('productPrice').value = suggestion.suggested_price;
+        });
+        box.append(text, apply);
+        box.style.display = 'flex';
+    } catch (error) {
+        console.error('가격 추천 조회 오류:', error);
+    }
+}
+
 function waitForKakaoMaps(callback, retries = 20) {
     const kakaoReady = typeof kakao !== 'undefined' && kakao.maps;
 
@@ -228,6 +289,10 @@ window.openAddressSearch = function() {
 function updateMapByAddress(address, detail) {
     if (!address || !mapGeocoder) return;
     
+    // 새 주소의 좌표를 찾기 전까지 이전 좌표를 보내지 않도록 비움 (못 찾으면 서버가 우편번호로 정한다)
+    document.getElementById('meetingLat').value = '';
+    document.getElementById('meetingLng').value = '';
+
     const fullAddress = detail ? `${address} ${detail}` : address;
     mapGeocoder.addressSearch(fullAddress, function(result, status) {
         if (status === kakao.maps.services.Status.OK) {
@@ -247,4 +312,10 @@ function setMapPosition(lat, lng) {
     const coords = new kakao.maps.LatLng(lat, lng);
     mapInstance.setCenter(coords);
     mapMarker.setPosition(coords);
+
+    // 내 주변 상품 검색용 거래 장소 좌표
+    const latInput = document.getElementById('meetingLat');
+    const lngInput = document.getElementById('meetingLng');
+    if (latInput) latInput.value = lat;
+    if (lngInput) lngInput.value = lng;
 }
\ No newline at end of file
@@ -3,6 +3,9 @@ let currentCategory = 'all';
 let currentPage = 1;
 let currentSoldPage = 1;
 const perPage = 5;
+const selectedPrices = new Set();
+const selectedDeliveries = new Set();
+let nearbyLocation = null; // 내 주변 모드일 때 { lat, lng }
 
 // 상품 페이지 초기화
 document.addEventListener('DOMContentLoaded', function() {
@@ -24,6 +27,7 @@ async function initializeProductsPage() {
             await loadProductsByCategory('all', 1);
             await loadSoldProducts(1);
             setupCategoryNavigation();
+            setupNearbySearch();
         }
         
     } catch (error) {
@@ -70,6 +74,55 @@ async function loadCategoryStats() {
     }
 }
 
+// 필터별 상품 수 표시 (다른 필터는 유지한 채 해당 항목을 선택하면 나오는 상품 수)
+function updateFacets(facets) {
+    if (!facets) return;
+    const categoryCounts = facets.category || {};
+    const stats = { all: Object.values(categoryCounts).reduce((sum, count) => sum + count, 0) };
+    Object.assign(stats, categoryCounts);
+    updateCategoryCounts(stats);
+
+    renderFilterOptions('priceFilters', (facets.price_bucket || []).map(bucket => ({
+        value: bucket.key, label: bucket.label, count: bucket.count
+    })), selectedPrices);
+
+    const deliveryCounts = facets.delivery_method || {};
+    const deliveries = Object.keys(deliveryCounts).filter(method => method);
+    selectedDeliveries.forEach(method => { if (!deliveries.includes(method)) deliveries.push(method); });
+    renderFilterOptions('deliveryFilters', deliveries.sort().map(method => ({
+        value: method, label: method, count: deliveryCounts[method] || 0
+    })), selectedDeliveries);
+}
+
+// 필터 체크박스 표시
+function renderFilterOptions(containerId, options, selected) {
+    const container = document.getElementById(containerId);
+    if (!container) return;
+    container.innerHTML = '';
+    options.forEach(option => {
+        const label = document.createElement('label');
+        label.className = 'filter-option';
+        const checkbox = document.createElement('input');
+        checkbox.type = 'checkbox';
+        checkbox.checked = selected.has(option.value);
+        checkbox.addEventListener('change', function() {
+            if (this.checked) {
+                selected.add(option.value);
+            } else {
+                selected.delete(option.value);
+            }
+            loadProductsByCategory(currentCategory, 1);
+        });
+        const text = document.createElement('span');
+        text.textContent = option.label;
+        const count = document.createElement('span');
+        count.className = 'count';
+        count.textContent = option.count;
+        label.append(checkbox, text, count);
+        container.appendChild(label);
+    });
+}
+
 // 카테고리별 상품 수 업데이트
 function updateCategoryCounts(stats) {
     // 전체 상품 수
@@ -88,15 +141,21 @@ function updateCategoryCounts(stats) {
     });
 }
 
-// 카테고리별 상품 로드
+// 카테고리별 상품 로드 (가격대/배송방법 필터 포함)
 async function loadProductsByCategory(category, page = 1) {
     try {
-        const response = await fetch(`/api/products/category/${category}?page=${page}&per_page=${perPage}`);
+        const params = new URLSearchParams({ page, per_page: perPage });
+        if (category !== 'all') params.append('category', category);
+        selectedPrices.forEach(price => params.append('price', price));
+        selectedDeliveries.forEach(delivery => params.append('delivery', delivery));
+
+        const response = await fetch(`/api/products/catalog?${params.toString()}`);
         if (response.ok) {
             const result = await response.json();
             displayProducts(result.products);
             updateProductsHeader(category, result.total);
             displayPagination('productsPagination', result);
+            updateFacets(result.facets);
             currentCategory = category;
             currentPage = page;
         } else {
@@ -109,6 +168,57 @@ async function loadProductsByCategory(category, page = 1) {
     }
 }
 
+// 내 주변 상품 검색 설정 (브라우저 위치 사용)
+function setupNearbySearch() {
+    const button = document.getElementById('nearbyButton');
+    const radiusSelect = document.getElementById('nearbyRadius');
+    if (!button) return;
+
+    button.addEventListener('click', () => {
+        if (!navigator.geolocation) {
+            alert('이 브라우저에서는 위치 정보를 사용할 수 없습니다.');
+            return;
+        }
+        navigator.geolocation.getCurrentPosition(position => {
+            nearbyLocation = { lat: position.coords.latitude, lng: position.coords.longitude };
+            document.querySelectorAll('.category-item').forEach(cat => cat.classList.remove('active'));
+            loadNearbyProducts(1);
+        }, () => {
+            alert('현재 위치를 가져올 수 없습니다. 위치 권한을 확인해주세요.');
+        });
+    });
+    if (radiusSelect) {
+        radiusSelect.addEventListener('change', () => {
+            if (nearbyLocation) loadNearbyProducts(1);
+        });
+    }
+}
+
+// 내 주변 상품 로드 (가까운 순)
+async function loadNearbyProducts(page = 1) {
+    if (!nearbyLocation) return;
+    const radius = document.getElementById('nearbyRadius')?.value || '3';
+    try {
+        const params = new URLSearchParams({
+            lat: nearbyLocation.lat, lng: nearbyLocation.lng, radius, page, per_page: perPage
+        });
+        const response = await fetch(`/api/products/nearby?${params.toString()}`);
+        if (response.ok) {
+            const result = await response.json();
+            displayProducts(result.products);
+            updateProductsHeader(`내 주변 ${radius}km`, result.total);
+            displayPagination('productsPagination', result);
+            currentPage = page;
+        } else {
+            console.error('내 주변 상품 로드 실패');
+            displayProducts([]);
+        }
+    } catch (error) {
+        console.error('내 주변 상품 로드 오류:', error);
+        displayProducts([]);
+    }
+}
+
 // 거래완료 상품 로드
 async function loadSoldProducts(page = 1) {
     try {
@@ -174,7 +284,7 @@ function displayProducts(products) {
 
         return `
             <tr class="product-row" onclick="goToProductDetail(${product.id})">
-                <td class="product-title">${productTitle}</td>
+                <td class="product-title">${productTitle}${product.distance_km !== undefined ? ` <span class="product-distance">${product.distance_km}km</span>` : ''}</td>
                 <td class="product-price">${product.price ? product.price.toLocaleString() : '0'}원</td>
                 <td class="product-category">${product.category || '기타'}</td>
                 <td class="product-delivery">${product.delivery_method || '배송 정보 없음'}</td>
@@ -209,7 +319,7 @@ function displaySoldProducts(products) {
 
         return `
             <tr class="product-row" onclick="goToProductDetail(${product.id})">
-                <td class="product-title">${productTitle}</td>
+                <td class="product-title">${productTitle}${product.distance_km !== undefined ? ` <span class="product-distance">${product.distance_km}km</span>` : ''}</td>
                 <td class="product-price">${product.price ? product.price.toLocaleString() : '0'}원</td>
                 <td class="product-category">${product.category || '기타'}</td>
                 <td class="product-delivery">${product.delivery_method || '배송 정보 없음'}</td>
@@ -307,7 +417,9 @@ function displayPagination(containerId, paginationData) {
 
 // 페이지 변경
 function changePage(page, containerId) {
-    if (containerId === 'productsPagination') {
+    if (containerId === 'productsPagination' && nearbyLocation) {
+        loadNearbyProducts(page);
+    } else if (containerId === 'productsPagination') {
         loadProductsByCategory(currentCategory, page);
     } else if (containerId === 'soldProductsPagination') {
         loadSoldProducts(page);
@@ -329,8 +441,9 @@ function setupCategoryNavigation() {
             // 클릭된 카테고리에 active 클래스 추가
             this.classList.add('active');
             
-            // 현재 카테고리 업데이트
+            // 현재 카테고리 업데이트 (내 주변 모드 해제)
             currentCategory = category;
+            nearbyLocation = null;
             
             // 해당 카테고리 상품 로드 (첫 페이지로)
             loadProductsByCategory(category, 1);
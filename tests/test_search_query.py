@@ -0,0 +1,61 @@
+# tests/test_search_query.py
+"""상품/게시판 FULLTEXT 검색 SQL (검색 조건, 관련도 keyset 커서) 검사"""
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board_search import build_board_search_query
+from search_query import build_fulltext_query, format_search_cursor, has_search_terms, parse_search_cursor
+
+
+def test_cursor_round_trips_decimal_score_exactly():
+    cursor = format_search_cursor(Decimal('0.123457'), 42)
+
+    assert cursor == '0.123457:42'
+    assert parse_search_cursor(cursor) == (Decimal('0.123457'), 42)
+
+
+@pytest.mark.parametrize('cursor', ['nan:1', 'inf:1', 'abc:1', '1.5', '1.5:x'])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        parse_search_cursor(cursor)
+
+
+def test_fulltext_order_and_cursor_use_decimal_score():
+    sql, params = build_fulltext_query('나이키 운동화', cursor='0.123457:42')
+
+    score_sql = 'CAST(MATCH(product_name, description) AGAINST (%s IN BOOLEAN MODE) AS DECIMAL(20,6))'
+    assert f'{score_sql} AS score' in sql
+    assert f'({score_sql} < %s OR ({score_sql} = %s AND PRODUCT_ID < %s))' in sql
+    assert Decimal('0.123457') in params
+    assert sql.count('%s') == len(params)
+
+
+def test_board_search_cursor_uses_decimal_score():
+    sql, params = build_board_search_query('환불 문의', cursor='1.000000:7')
+
+    assert 'AS DECIMAL(20,6)) = %s AND q.QNA_ID < %s' in sql
+    assert params.count(Decimal('1.000000')) == 2
+    assert sql.count('%s') == len(params)
+
+
+@pytest.mark.parametrize('text', ['+++', '', '  ', '"()~*'])
+def test_operator_only_query_has_no_search_terms(text):
+    assert not has_search_terms(text)
+
+
+@pytest.mark.parametrize('text', ['나이키', '옷', '+나이키 -운동화'])
+def test_query_with_words_has_search_terms(text):
+    assert has_search_terms(text)
+
+
+def test_board_search_without_terms_is_rejected_by_route():
+    from app import app
+
+    response = app.test_client().get('/api/board/search', query_string={'q': '+++'})
+
+    assert response.status_code == 400
@@ -0,0 +1,98 @@
+# tests/test_sql_guard.py
+"""넓은 컬럼 지연 조회 변환(defer_wide_columns)과 FULLTEXT 검색 SQL 조합 검사"""
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_query import build_fulltext_query, build_search_query
+from sql_guard import QueryRejectedError, SqlGuard, defer_wide_columns
+
+
+def picked_subquery(sql):
+    return re.search(r'JOIN \((SELECT .+)\) AS picked', sql).group(1)
+
+
+def test_fulltext_rewrite_keeps_score_in_subquery():
+    sql, params = build_fulltext_query('나이키 운동화')
+    rewritten = defer_wide_columns(sql)
+
+    inner = picked_subquery(rewritten)
+    # 안쪽 ORDER BY score가 가리키는 컬럼이 안쪽 SELECT에 있어야 한다 (없으면 MySQL 1054)
+    assert re.match(r'SELECT PRODUCT_ID, CAST\(MATCH\(.+\) AS DECIMAL\(20,6\)\) AS score FROM PRODUCT WHERE', inner)
+    assert 'ORDER BY score DESC, PRODUCT_ID DESC LIMIT %s' in inner
+    assert 'picked.score AS score' in rewritten
+    # 자리표시자 개수와 순서가 그대로여야 같은 파라미터로 실행할 수 있다
+    assert rewritten.count('%s') == sql.count('%s') == len(params)
+    assert 'image_url' not in inner
+
+
+def test_fulltext_rewrite_with_cursor_and_filters():
+    sql, params = build_fulltext_query('나이키 옷', category='의류', max_price=50000, cursor='1.250000:42')
+    rewritten = defer_wide_columns(sql)
+
+    assert rewritten.count('%s') == len(params)
+    inner = picked_subquery(rewritten)
+    assert ' AS score FROM PRODUCT WHERE' in inner
+    assert 'PRODUCT_ID < %s' in inner
+
+
+def test_search_query_rewrite_without_alias():
+    sql, params = build_search_query({'keywords': ['나이키'], 'category': '의류', 'sort': 'latest'})
+    rewritten = defer_wide_columns(sql)
+
+    assert picked_subquery(rewritten).startswith('SELECT PRODUCT_ID FROM PRODUCT WHERE')
+    assert rewritten.count('%s') == len(params)
+
+
+def test_unaliased_parameter_column_is_not_rewritten():
+    assert defer_wide_columns('SELECT PRODUCT_ID, price > %s FROM PRODUCT WHERE is_sold = 0 LIMIT %s') is None
+
+
+class PlanCursor:
+    def __init__(self, rows, key='ft_product_name_description', access_type='fulltext'):
+        self.rows = rows
+        self.key = key
+        self.access_type = access_type
+        self.description = [('id',), ('table',), ('type',), ('key',), ('rows',), ('Extra',)]
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return [(1, 'PRODUCT', self.access_type, self.key, self.rows, 'Using where')]
+
+
+def test_guard_rewrites_broad_fulltext_query():
+    guard = SqlGuard(rewrite_rows=5000)
+    sql, params = build_fulltext_query('나이키 운동화')
+
+    guarded = guard.prepare(PlanCursor(20000), sql, params)
+
+    assert guard.stats['rewritten'] == 1
+    assert 'AS score FROM PRODUCT WHERE' in picked_subquery(guarded)
+    assert guarded.count('%s') == len(params)
+
+
+def test_limited_index_ordered_category_query_is_not_rejected():
+    # "의류 최신순": idx_product_sold_category_created 순서대로 읽다가 LIMIT 50에서 멈춘다
+    guard = SqlGuard(max_rows=100000)
+    sql, params = build_search_query({'keywords': [], 'category': '의류', 'sort': 'latest'})
+    cursor = PlanCursor(300000, key='idx_product_sold_category_created', access_type='ref')
+
+    guarded = guard.prepare(cursor, sql, params, reject=False)
+
+    assert 'MAX_EXECUTION_TIME' in guarded
+    assert guard.stats['rejected'] == 0
+
+
+def test_llm_sql_over_max_rows_is_rejected():
+    guard = SqlGuard(max_rows=100000)
+    sql = "SELECT PRODUCT_ID, product_name FROM PRODUCT WHERE is_sold = 0 AND description LIKE '%급처%' LIMIT 50"
+
+    with pytest.raises(QueryRejectedError):
+        guard.prepare(PlanCursor(300000, key=None, access_type='ALL'), sql)
+    assert guard.stats['rejected'] == 1
@@ -0,0 +1,160 @@
+# trending.py
+"""인기 상품 (조회/채팅/댓글 이벤트의 시간 감쇠 점수)
+
+상품 조회, 채팅방 생성, 댓글 등록을 이벤트로 받아 반감기 HALF_LIFE_HOURS인 지수 감쇠 점수로 합친다.
+점수는 기준 시각(base)에서의 가치로 환산해서 더한다 (w × e^((t - base)/τ)).
+모든 상품이 같은 비율로 감쇠하므로 감쇠 계산 없이 저장된 값 그대로 순위를 매길 수 있고,
+이벤트 하나에 덧셈 한 번이면 된다. 값이 커지면 기준 시각을 옮겨 다시 맞춘다.
+
+이벤트는 PRODUCT에 쓰지 않고 프로세스 메모리에만 쌓는다. snapshot_interval마다 아직 저장하지 않은
+증가분을 PRODUCT_TREND_SCORE에 감쇠를 반영해 합치고(saver), 전체 워커의 합산 점수를 다시 읽어서(loader)
+다른 워커의 이벤트와 재시작 전 점수도 따라간다.
+"""
+import heapq
+import math
+import threading
+import time
+
+HALF_LIFE_HOURS = 24
+EVENT_WEIGHTS = {'view': 1.0, 'comment': 3.0, 'chat': 5.0}
+REBASE_AFTER = 30  # (현재 - 기준 시각)/τ 가 이보다 커지면 기준 시각을 옮긴다 (e^30 ≈ 1e13, float 정밀도 여유)
+MIN_SCORE = 0.05  # 이보다 작아진 점수는 정리
+
+
+class TrendingScores:
+    def __init__(self, saver, loader, half_life_hours=HALF_LIFE_HOURS, snapshot_interval=60):
+        self.saver = saver  # ([(PRODUCT_ID, 지금 시각 기준 증가분)], 지금 시각) -> None
+        self.loader = loader  # () -> [(PRODUCT_ID, 카테고리, 지금 시각 기준 점수)] 판매중 상품
+        self.tau = half_life_hours * 3600 / math.log(2)  # 감쇠 시간 상수 (초)
+        self.snapshot_interval = snapshot_interval  # 초
+        self._base = time.time()
+        self._scores = {}  # PRODUCT_ID -> 기준 시각 환산 점수
+        self._categories = {}  # PRODUCT_ID -> 카테고리 (모르면 없음)
+        self._unsaved = {}  # PRODUCT_ID -> 아직 저장하지 않은 기준 시각 환산 증가분
+        self._lock = threading.Lock()
+        self._worker = None
+        self.snapshot_at = None
+        self.stats = {'events': 0, 'snapshots': 0, 'snapshot_seconds': 0.0}
+
+    # 기준 시각 환산 (self._lock을 잡은 상태에서 호출)
+    def _growth(self, now):
+        return math.exp((now - self._base) / self.tau)
+
+    def _rebase(self, now):
+        factor = 1 / self._growth(now)
+        self._scores = {product_id: score * factor for product_id, score in self._scores.items()
+                        if score * factor >= MIN_SCORE}
+        self._unsaved = {product_id: score * factor for product_id, score in self._unsaved.items()}
+        self._base = now
+
+    # 이벤트
+    def record(self, product_id, event, category=None):
+        """이벤트 기록 (view/comment/chat)"""
+        self.start()
+        now = time.time()
+        with self._lock:
+            if (now - self._base) / self.tau > REBASE_AFTER:
+                self._rebase(now)
+            value = EVENT_WEIGHTS[event] * self._growth(now)
+            self._scores[product_id] = self._scores.get(product_id, 0.0) + value
+            self._unsaved[product_id] = self._unsaved.get(product_id, 0.0) + value
+            if category:
+                self._categories[product_id] = category
+            self.stats['events'] += 1
+
+    def handle_event(self, event, product):
+        """product_events 구독 함수 (판매/삭제된 상품은 순위에서 뺀다)"""
+        if event in ('sold', 'deleted'):
+            with self._lock:
+                self._scores.pop(product['id'], None)
+                self._categories.pop(product['id'], None)
+
+    def learn_categories(self, categories):
+        """조회하면서 알게 된 상품 카테고리 기록 ({PRODUCT_ID: 카테고리})"""
+        with self._lock:
+            for product_id, category in categories.items():
+                if product_id in self._scores:
+                    self._categories[product_id] = category
+
+    # 스냅샷
+    def snapshot(self):
+        """저장하지 않은 증가분을 DB에 합치고 전체 워커의 점수를 다시 읽는다"""
+        start = time.perf_counter()
+        now = time.time()
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+            factor = 1 / self._growth(now)
+        rows = [(product_id, value * factor) for product_id, value in unsaved.items()]
+        try:
+            if rows:
+                self.saver(rows, now)
+        except Exception:
+            with self._lock:  # 다음 스냅샷 때 다시 저장 (그사이 기준 시각이 바뀌었을 수 있어 다시 환산)
+                restore = factor * self._growth(now)
+                for product_id, value in unsaved.items():
+                    self._unsaved[product_id] = self._unsaved.get(product_id, 0.0) + value * restore
+            raise
+        # 저장은 이미 커밋됐으므로 읽기에 실패해도 증가분을 되돌리지 않는다 (다음 스냅샷 때 다시 읽는다)
+        loaded = self.loader()
+
+        with self._lock:
+            growth = self._growth(now)
+            scores = {}
+            categories = {}
+            for product_id, category, score in loaded:
+                scores[product_id] = float(score) * growth
+                if category:
+                    categories[product_id] = category
+            # 저장 이후(스냅샷 도중) 들어온 이벤트는 DB 점수에 아직 없으므로 더한다
+            for product_id, value in self._unsaved.items():
+                scores[product_id] = scores.get(product_id, 0.0) + value
+                if product_id in self._categories:
+                    categories.setdefault(product_id, self._categories[product_id])
+            self._scores = scores
+            self._categories = categories
+            self.snapshot_at = now
+            self.stats['snapshots'] += 1
+            self.stats['snapshot_seconds'] = round(time.perf_counter() - start, 3)
+
+    def start(self):
+        """백그라운드 스냅샷 스레드 시작 (첫 스냅샷이 끝나야 True)"""
+        # gunicorn이 fork한 뒤 워커 프로세스에서 스레드를 만들도록 처음 사용할 때(record/top 전) 호출
+        if self._worker is not None and self._worker.is_alive():
+            return self.snapshot_at is not None
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='trending-snapshot', daemon=True)
+                self._worker.start()
+        return self.snapshot_at is not None
+
+    def _run(self):
+        while True:
+            try:
+                self.snapshot()
+            except Exception as e:
+                print(f"인기 상품 점수 스냅샷 오류: {e}")
+            time.sleep(self.snapshot_interval)
+
+    # 조회
+    def top(self, category=None, limit=20):
+        """점수 상위 [(PRODUCT_ID, 지금 시각 기준 점수)] (카테고리를 모르는 상품도 후보에 포함)"""
+        now = time.time()
+        with self._lock:
+            if category:
+                candidates = ((product_id, score) for product_id, score in self._scores.items()
+                              if self._categories.get(product_id, category) == category)
+            else:
+                candidates = self._scores.items()
+            ranked = heapq.nlargest(limit, candidates, key=lambda item: item[1])
+            factor = 1 / self._growth(now)
+        return [(product_id, score * factor) for product_id, score in ranked]
+
+    def metrics(self):
+        with self._lock:
+            return dict(
+                self.stats,
+                products=len(self._scores),
+                unsaved=len(self._unsaved),
+                snapshot_at=self.snapshot_at,
+                half_life_hours=round(self.tau * math.log(2) / 3600, 2),
+            )
@@ -0,0 +1,260 @@
+# typeahead.py
+"""검색어 자동완성 인덱스 (메모리 내 정렬 배열 + bisect)
+
+판매중인 상품 제목과 자주 검색된 질의를 자모 단위로 분해한 키로 정렬해 두고,
+입력 중인 접두어도 같은 방식으로 분해해서 bisect로 범위를 찾는다.
+자모로 비교하므로 '나잌'·'낫'처럼 조합 중인 글자로도 '나이키'·'나시'가 검색된다.
+
+상품 등록/판매/삭제 이벤트로 바로 갱신하고, 다른 워커에서 생긴 변경은
+rebuild_interval마다 DB에서 다시 읽어 재구성해서 따라간다.
+검색어 횟수는 재구성 주기와 상관없이 반감기 query_half_life_hours인 지수 감쇠
+(재구성 때 지난 시간만큼 e^(-Δt/τ)를 곱한다)로 줄여서 최근 검색어가 우선하게 한다.
+"""
+import heapq
+import math
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ('', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+             'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ')
+# 겹받침/이중모음은 키보드로 입력하는 순서대로 나눈다 ('닭' 입력 중의 '달'도 접두어가 되도록)
+COMPOUND_JAMO = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+
+
+def _build_jamo_table():
+    table = {ord(jamo): parts for jamo, parts in COMPOUND_JAMO.items()}
+    for code in range(0xAC00, 0xD7A4):
+        offset = code - 0xAC00
+        cho, jung, jong = offset // 588, (offset % 588) // 28, offset % 28
+        table[code] = ''.join(COMPOUND_JAMO.get(jamo, jamo)
+                              for jamo in (CHOSEONG[cho], JUNGSEONG[jung], JONGSEONG[jong]))
+    return table
+
+
+JAMO_TABLE = _build_jamo_table()
+SPACES = re.compile(r'\s+')
+
+MAX_TEXT_LENGTH = 40  # 제안 문구 최대 길이 (더 긴 질의는 기록하지 않는다)
+WORD_KEYS = 3  # 제목의 앞 단어 몇 개부터 시작하는 키를 만들지 ('나이키 에어포스'를 '에어'로도 찾도록)
+QUERY_WEIGHT = 3  # 검색 1회의 가중치 (상품 1개 = 1)
+MIN_QUERY_COUNT = 2  # 한 사람만 검색한 질의는 다른 사용자에게 제안하지 않는다
+KEEP_QUERY_COUNT = 0.5  # 제안 목록에 오른 검색어는 감쇠된 횟수가 이보다 작아질 때 뺀다 (재구성마다 들락거리지 않도록)
+MIN_RETAINED_COUNT = 0.05  # 이보다 작아진 검색어 횟수는 정리
+QUERY_HALF_LIFE_HOURS = 72
+MAX_SCAN = 200  # 접두어당 검사할 최대 후보 수
+SHORT_PREFIX = 3  # 자모 길이가 이 이하인 접두어는 전체 범위를 보고 재구성 때까지 결과를 캐시
+
+
+def normalize_text(text):
+    """표시용 문구 정규화 (앞뒤/연속 공백 정리)"""
+    return SPACES.sub(' ', (text or '').strip())[:MAX_TEXT_LENGTH]
+
+
+def to_jamo(text):
+    """소문자화 + 한글 음절을 자모로 분해한 비교 키"""
+    return normalize_text(text).lower().translate(JAMO_TABLE)
+
+
+def text_keys(text):
+    """문구 전체와 2번째~WORD_KEYS번째 단어부터 시작하는 부분의 키"""
+    words = text.split(' ')
+    return {to_jamo(' '.join(words[start:])) for start in range(min(len(words), WORD_KEYS))}
+
+
+class TypeaheadIndex:
+    def __init__(self, loader, rebuild_interval=300, max_queries=5000, limit=8,
+                 query_half_life_hours=QUERY_HALF_LIFE_HOURS):
+        self.loader = loader  # () -> [(PRODUCT_ID, 상품명)] 판매중인 상품 전체
+        self.rebuild_interval = rebuild_interval  # 초
+        self.query_tau = query_half_life_hours * 3600 / math.log(2)  # 검색어 횟수 감쇠 시간 상수 (초)
+        self.max_queries = max_queries
+        self.limit = limit
+        self._keys = []  # 정렬된 (자모 키, 문구)
+        self._titles = {}  # PRODUCT_ID -> 문구
+        self._title_counts = {}  # 문구 -> 판매중인 상품 수
+        self._query_counts = {}  # 문구 -> 감쇠된 검색 횟수
+        self._listed_queries = set()  # 제안 목록에 오른 검색어
+        self._decayed_at = time.time()  # 검색어 횟수를 마지막으로 감쇠한 시각
+        self._short_cache = {}  # 짧은 접두어 -> 결과
+        self._pending = None  # 재구성 중에 들어온 변경 (재구성 뒤 다시 적용)
+        self._lock = threading.Lock()
+        self._worker = None
+        self.built_at = None
+        self.stats = {'suggests': 0, 'short_cache_hits': 0, 'rebuilds': 0, 'rebuild_seconds': 0.0}
+
+    # 내부 갱신 (self._lock을 잡은 상태에서 호출)
+    def _add_text(self, text):
+        for key in text_keys(text):
+            insort(self._keys, (key, text))
+
+    def _remove_text(self, text):
+        for key in text_keys(text):
+            position = bisect_left(self._keys, (key, text))
+            if position < len(self._keys) and self._keys[position] == (key, text):
+                del self._keys[position]
+
+    def _is_listed(self, text):
+        return self._title_counts.get(text, 0) > 0 or text in self._listed_queries
+
+    def _add_product(self, product_id, title):
+        text = normalize_text(title)
+        if not text or product_id in self._titles:
+            return
+        listed = self._is_listed(text)
+        self._titles[product_id] = text
+        self._title_counts[text] = self._title_counts.get(text, 0) + 1
+        if not listed:
+            self._add_text(text)
+
+    def _remove_product(self, product_id):
+        text = self._titles.pop(product_id, None)
+        if text is None:
+            return
+        self._title_counts[text] -= 1
+        if not self._title_counts[text]:
+            del self._title_counts[text]
+        if not self._is_listed(text):
+            self._remove_text(text)
+
+    def _apply(self, change):
+        if change[0] == 'add':
+            self._add_product(change[1], change[2])
+        else:
+            self._remove_product(change[1])
+        if self._pending is not None:
+            self._pending.append(change)
+
+    # 이벤트/기록
+    def handle_event(self, event, product):
+        """product_events 구독 함수"""
+        with self._lock:
+            if event == 'created':
+                self._apply(('add', product['id'], product.get('title')))
+            else:
+                self._apply(('remove', product['id']))
+
+    def record_query(self, query):
+        """결과가 있었던 검색어 기록 (MIN_QUERY_COUNT회 이상이면 제안 대상)"""
+        text = normalize_text(query)
+        if not text or len(query.strip()) > MAX_TEXT_LENGTH:
+            return
+        with self._lock:
+            listed = self._is_listed(text)
+            self._query_counts[text] = self._query_counts.get(text, 0) + 1
+            if self._query_counts[text] >= MIN_QUERY_COUNT:
+                self._listed_queries.add(text)
+            if not listed and self._is_listed(text):
+                self._add_text(text)
+
+    # 재구성
+    def rebuild(self):
+        """DB의 판매중 상품으로 제목 인덱스를 다시 만든다 (검색어 기록은 지난 시간만큼 감쇠해서 유지)"""
+        start = time.perf_counter()
+        with self._lock:
+            self._pending = []
+        try:
+            rows = self.loader()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        titles = {}
+        title_counts = {}
+        for product_id, title in rows:
+            text = normalize_text(title)
+            if text:
+                titles[product_id] = text
+                title_counts[text] = title_counts.get(text, 0) + 1
+        # 정렬은 잠금 밖에서 해서 재구성 중에도 조회가 막히지 않게 한다
+        keys = sorted((key, text) for text in title_counts for key in text_keys(text))
+
+        with self._lock:
+            # 최근 검색어가 우선하도록 지난 시간만큼 횟수를 줄이고 상위 max_queries개만 남긴다
+            now = time.time()
+            factor = math.exp(-(now - self._decayed_at) / self.query_tau)
+            decayed = {text: count * factor for text, count in self._query_counts.items()
+                       if count * factor >= MIN_RETAINED_COUNT}
+            query_counts = dict(heapq.nlargest(self.max_queries, decayed.items(), key=lambda item: item[1]))
+            listed_queries = {text for text, count in query_counts.items()
+                              if count >= MIN_QUERY_COUNT or (count >= KEEP_QUERY_COUNT and text in self._listed_queries)}
+            keys.extend((key, text) for text in listed_queries if text not in title_counts for key in text_keys(text))
+            keys.sort()  # 정렬된 목록 뒤에 검색어 몇 개를 붙인 것이라 거의 선형 시간
+            pending, self._pending = self._pending, None
+            self._titles = titles
+            self._title_counts = title_counts
+            self._query_counts = query_counts
+            self._listed_queries = listed_queries
+            self._decayed_at = now
+            self._keys = keys
+            self._short_cache = {}
+            for change in pending:
+                self._apply(change)
+            self.built_at = time.time()
+            self.stats['rebuilds'] += 1
+            self.stats['rebuild_seconds'] = round(time.perf_counter() - start, 3)
+
+    def _ensure_worker(self):
+        # gunicorn이 fork한 뒤 워커 프로세스에서 스레드를 만들도록 처음 사용할 때 시작
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='typeahead-rebuild', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"자동완성 인덱스 재구성 오류: {e}")
+            time.sleep(self.rebuild_interval)
+
+    # 조회
+    def suggest(self, prefix, limit=None):
+        """접두어로 시작하는 문구를 (상품 수 + 검색 횟수) 가중치 순으로 반환"""
+        self._ensure_worker()
+        limit = limit or self.limit
+        key = to_jamo(prefix)
+        if not key:
+            return []
+        with self._lock:
+            self.stats['suggests'] += 1
+            short = len(key) <= SHORT_PREFIX
+            if short and key in self._short_cache:
+                self.stats['short_cache_hits'] += 1
+                # 새로 추가된 문구는 재구성 때 반영되고, 빠진 문구(판매 완료 등)는 여기서 거른다
+                return [text for text in self._short_cache[key] if self._is_listed(text)][:limit]
+
+            weights = {}
+            position = bisect_left(self._keys, (key,))
+            while position < len(self._keys) and (short or len(weights) < MAX_SCAN):
+                entry_key, text = self._keys[position]
+                if not entry_key.startswith(key):
+                    break
+                if text not in weights:
+                    weights[text] = self._title_counts.get(text, 0) + self._query_counts.get(text, 0) * QUERY_WEIGHT
+                position += 1
+            result = heapq.nlargest(max(limit, self.limit) * 2, weights, key=lambda text: (weights[text], -len(text)))
+            if short:
+                self._short_cache[key] = result
+            return result[:limit]
+
+    def metrics(self):
+        with self._lock:
+            return dict(
+                self.stats,
+                keys=len(self._keys),
+                products=len(self._titles),
+                queries=len(self._query_counts),
+                listed_queries=len(self._listed_queries),
+                query_half_life_hours=round(self.query_tau * math.log(2) / 3600, 2),
+                built_at=self.built_at,
+            )
@@ -0,0 +1,125 @@
+# vector_index.py
+"""오프라인에서 한 번 만들고 워커들이 읽기 전용으로 공유하는 벡터 인덱스
+
+디렉터리 구조:
+    <index_root>/CURRENT                  현재 버전 이름 (원자적으로 교체)
+    <index_root>/<version>/manifest.json  버전/임베딩 모델/차원/청크 수
+    <index_root>/<version>/embeddings.npy 정규화된 float32 임베딩 행렬
+    <index_root>/<version>/chunks.jsonl   청크 텍스트와 metadata
+
+임베딩 행렬은 np.load(mmap_mode='r')로 열기 때문에 여러 gunicorn 워커가
+같은 파일을 열어도 OS 페이지 캐시를 공유하고, 워커마다 인덱스를 다시 만들지 않는다.
+"""
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+CURRENT_FILE = 'CURRENT'
+EMBED_BATCH_SIZE = 256
+
+
+def build_vector_index(chunks, embedding, index_root, batch_size=EMBED_BATCH_SIZE):
+    """청크를 임베딩해서 새 버전의 인덱스를 쓰고 CURRENT를 교체. 버전 이름 반환"""
+    texts = [chunk.page_content for chunk in chunks]
+    digest = hashlib.sha1('\x00'.join(texts).encode('utf-8')).hexdigest()[:8]
+    version = f"{time.strftime('%Y%m%d%H%M%S')}-{digest}"
+    version_dir = os.path.join(index_root, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(embedding.embed_documents(texts[start:start + batch_size]))
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+    np.save(os.path.join(version_dir, 'embeddings.npy'), matrix)
+
+    with open(os.path.join(version_dir, 'chunks.jsonl'), 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(json.dumps({'text': chunk.page_content, 'metadata': chunk.metadata}, ensure_ascii=False))
+            f.write('\n')
+
+    manifest = {
+        'version': version,
+        'embedding_model': getattr(embedding, 'model', type(embedding).__name__),
+        'dimension': int(matrix.shape[1]) if len(texts) else 0,
+        'count': len(texts),
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    with open(os.path.join(version_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    # 읽는 쪽이 쓰다 만 버전을 보지 않도록 모든 파일을 쓴 다음 CURRENT를 교체
+    tmp_path = os.path.join(index_root, f"{CURRENT_FILE}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(index_root, CURRENT_FILE))
+    return version
+
+
+def current_version(index_root):
+    """CURRENT가 가리키는 버전 이름 (없으면 None)"""
+    try:
+        with open(os.path.join(index_root, CURRENT_FILE), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class MmapVectorStore(VectorStore):
+    """메모리 매핑된 임베딩 행렬에 대한 읽기 전용 코사인 유사도 검색"""
+
+    def __init__(self, version_dir, embedding):
+        self.version_dir = version_dir
+        self.embedding = embedding
+        with open(os.path.join(version_dir, 'manifest.json'), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.matrix = np.load(os.path.join(version_dir, 'embeddings.npy'), mmap_mode='r')
+        self.documents = []
+        with open(os.path.join(version_dir, 'chunks.jsonl'), encoding='utf-8') as f:
+            for line in f:
+                row = json.loads(line)
+                self.documents.append(Document(page_content=row['text'], metadata=row['metadata']))
+
+    @classmethod
+    def open_current(cls, index_root, embedding):
+        """CURRENT 버전 인덱스 열기"""
+        version = current_version(index_root)
+        if not version:
+            raise FileNotFoundError(f"벡터 인덱스가 없습니다. 먼저 'flask ingest-guide'를 실행하세요: {index_root}")
+        return cls(os.path.join(index_root, version), embedding)
+
+    @property
+    def embeddings(self):
+        return self.embedding
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        """(문서, 코사인 거리) 목록 반환. 거리 = 1 - 코사인 유사도"""
+        if not self.documents:
+            return []
+        query_vector = np.asarray(self.embedding.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm:
+            query_vector /= norm
+        similarities = self.matrix @ query_vector
+        k = min(k, len(self.documents))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [(self.documents[i], float(1.0 - similarities[i])) for i in top]
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return self._cosine_relevance_score_fn
+
+    def add_texts(self, texts, metadatas=None, **kwargs):
+        raise NotImplementedError("읽기 전용 인덱스입니다. 'flask ingest-guide'로 새 버전을 만드세요.")
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, **kwargs):
+        raise NotImplementedError("build_vector_index()로 인덱스를 만든 뒤 open_current()로 여세요.")
@@ -0,0 +1,147 @@
+# view_counter.py
+"""조회수 버퍼링 (메모리에 모았다가 주기적으로 일괄 저장) + HyperLogLog 순 방문자 추정
+
+조회 요청마다 UPDATE ... + 1을 실행하지 않고 프로세스 메모리에 항목별 증가분을 모은 뒤
+flush_interval마다 saver로 한꺼번에 저장한다 (프로세스 종료 때도 남은 증가분을 저장).
+순 방문자는 항목별 HyperLogLog 스케치(1KB, 오차 약 3%)에 방문자 키를 넣어 추정한다.
+저장 전 증가분은 pending()으로 읽어 화면의 조회수에 더한다.
+"""
+import atexit
+import hashlib
+import threading
+import time
+import numpy as np
+
+HLL_PRECISION = 10  # 레지스터 2^10 = 1024개 (1KB), 표준 오차 1.04/√1024 ≈ 3.3%
+HLL_REGISTERS = 1 << HLL_PRECISION
+HLL_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+
+
+class HyperLogLog:
+    """순 방문자 수 추정 스케치 (레지스터별 최댓값으로 합칠 수 있다)"""
+
+    def __init__(self, registers=None):
+        if registers:
+            self.registers = np.frombuffer(registers, dtype=np.uint8).copy()
+        else:
+            self.registers = np.zeros(HLL_REGISTERS, dtype=np.uint8)
+
+    def add(self, value):
+        hashed = int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+        index = hashed >> (64 - HLL_PRECISION)
+        rest = hashed & ((1 << (64 - HLL_PRECISION)) - 1)
+        rank = (64 - HLL_PRECISION) - rest.bit_length() + 1  # 남은 비트의 앞쪽 0 개수 + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """다른 스케치(HyperLogLog 또는 저장된 bytes)를 합친다"""
+        registers = other.registers if isinstance(other, HyperLogLog) else np.frombuffer(other, dtype=np.uint8)
+        np.maximum(self.registers, registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        harmonic = np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        estimate = HLL_ALPHA * HLL_REGISTERS * HLL_REGISTERS / harmonic
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * HLL_REGISTERS and zeros:  # 적은 수는 linear counting이 더 정확하다
+            estimate = HLL_REGISTERS * np.log(HLL_REGISTERS / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self):
+        return self.registers.tobytes()
+
+
+class ViewCounter:
+    def __init__(self, saver, flush_interval=30, track_unique=True, name='view-counter'):
+        self.saver = saver  # ({항목 ID: 증가분}, {항목 ID: HyperLogLog}) -> None
+        self.flush_interval = flush_interval  # 초
+        self.track_unique = track_unique
+        self.name = name
+        self._counts = {}  # 항목 ID -> 저장 전 증가분
+        self._sketches = {}  # 항목 ID -> 저장 전 방문자 스케치
+        self._flushing = {}  # 저장 중인 증가분 (저장이 끝날 때까지 pending에 포함)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # 주기 저장과 종료 시 저장이 겹치지 않도록
+        self._worker = None
+        self.stats = {'views': 0, 'flushes': 0, 'flushed_rows': 0, 'flush_errors': 0, 'flush_seconds': 0.0}
+
+    def record(self, item_id, viewer=None):
+        """조회 1회 기록 (viewer: 순 방문자 판별 키)"""
+        self._ensure_worker()
+        with self._lock:
+            self._counts[item_id] = self._counts.get(item_id, 0) + 1
+            if self.track_unique and viewer is not None:
+                sketch = self._sketches.get(item_id)
+                if sketch is None:
+                    sketch = self._sketches[item_id] = HyperLogLog()
+                sketch.add(viewer)
+            self.stats['views'] += 1
+
+    def pending(self, item_ids):
+        """저장 전 증가분 {항목 ID: 증가분} (화면 표시용)"""
+        with self._lock:
+            result = {}
+            for item_id in item_ids:
+                count = self._counts.get(item_id, 0) + self._flushing.get(item_id, 0)
+                if count:
+                    result[item_id] = count
+            return result
+
+    def flush(self):
+        """모인 증가분을 저장 (실패하면 다음 저장 때 다시 시도)"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._counts:
+                    return
+                counts, self._counts = self._counts, {}
+                sketches, self._sketches = self._sketches, {}
+                self._flushing = counts
+            start = time.perf_counter()
+            try:
+                self.saver(counts, sketches)
+            except Exception:
+                with self._lock:
+                    for item_id, count in counts.items():
+                        self._counts[item_id] = self._counts.get(item_id, 0) + count
+                    for item_id, sketch in sketches.items():
+                        if item_id in self._sketches:
+                            sketch.merge(self._sketches[item_id])
+                        self._sketches[item_id] = sketch
+                    self._flushing = {}
+                    self.stats['flush_errors'] += 1
+                raise
+            with self._lock:
+                self._flushing = {}
+                self.stats['flushes'] += 1
+                self.stats['flushed_rows'] += len(counts)
+                self.stats['flush_seconds'] = round(time.perf_counter() - start, 3)
+
+    def _ensure_worker(self):
+        # gunicorn이 fork한 뒤 워커 프로세스에서 스레드를 만들도록 처음 사용할 때 시작
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                if self._worker is None:
+                    atexit.register(self._flush_at_exit)
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"조회수 저장 오류 ({self.name}): {e}")
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"종료 시 조회수 저장 오류 ({self.name}): {e}")
+
+    def metrics(self):
+        with self._lock:
+            return dict(self.stats, pending_items=len(self._counts) + len(self._flushing))